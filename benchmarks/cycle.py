@@ -0,0 +1,111 @@
+"""Time full ParentkeyMonitor cycles against a local stand-in node, without network access.
+
+Sizes are given as validators x subnets x edges. Run from the repository root:
+
+    python -m benchmarks.cycle --sizes 64x4x256 256x16x4096 1024x32x32768 --latency 0.005
+
+To benchmark on real data, record the storage the monitor reads from a node once and
+replay it:
+
+    python -m benchmarks.cycle --record finney.json --endpoint wss://entrypoint-finney.opentensor.ai:443
+    python -m benchmarks.cycle --dataset finney.json
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import List, Tuple
+import django
+from django.db import connections
+from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor
+from validators.tests.fake_node import FULL_PROPORTION, ChainState, FakeSubstrateNode
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings')
+django.setup()
+
+
+def parse_size(size: str) -> Tuple[int, int, int]:
+    """Parse a validators x subnets x edges size such as ``64x4x256``."""
+    validators, subnets, edges = (int(part) for part in size.lower().split('x'))
+    return validators, subnets, edges
+
+
+def run_cycles(chain: ChainState, args) -> Tuple[List[float], int, int]:
+    """Run cycles on a fresh database, each at a new block; return their times, RPC requests per cycle and failures."""
+    with tempfile.TemporaryDirectory() as directory, FakeSubstrateNode(
+        chain, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+    ) as node:
+        connections.close_all()
+        connections['default'].settings_dict['NAME'] = os.path.join(directory, 'db.sqlite3')
+        monitor = ParentkeyMonitor({
+            'CHAIN_ENDPOINT': node.endpoint,
+            'FULL_PROPORTION': FULL_PROPORTION,
+            'DATABASE_DIR': directory,
+            'DB_REFRESH_MODE': args.mode,
+            'PARENTKEYS_SWEEP': args.sweep,
+            'QUERY_CHUNK_SIZE': args.chunk_size,
+            'MAX_CONCURRENCY': args.concurrency,
+            'METAGRAPH_MAX_FAILURES': 1 << 16 if args.error_rate else 0,
+        })
+        times = []
+        failures = 0
+        for _ in range(args.cycles):
+            start = time.perf_counter()
+            try:
+                monitor.monitor_parentkeys()
+                times.append(time.perf_counter() - start)
+            except Exception as e:
+                # Only expected with --error-rate; the next cycle starts over
+                logging.warning(f"Cycle failed: {e}")
+                failures += 1
+            chain.update({})
+        connections.close_all()
+        return times, sum(node.requests.values()) // args.cycles, failures
+
+
+def report(label: str, chain: ChainState, times: List[float], requests: int, failures: int) -> None:
+    """Print one result row."""
+    cold = times[0] if times else float('nan')
+    warm = statistics.median(times[1:]) if len(times) > 1 else float('nan')
+    print(f"{label:<20} {len(chain.storage):>9} {requests:>9} {cold:9.2f} s {warm:9.2f} s {failures:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs='+', default=["64x4x256", "256x16x4096"],
+                        help="Synthetic chains as validators x subnets x edges.")
+    parser.add_argument("--miners", type=int, default=64, help="Hotkeys below the validator threshold per subnet.")
+    parser.add_argument("--dataset", help="Replay a recorded dataset instead of synthetic chains.")
+    parser.add_argument("--record", help="Record the storage the monitor reads from --endpoint to this file and exit.")
+    parser.add_argument("--endpoint", default="wss://entrypoint-finney.opentensor.ai:443", help="Node to record from.")
+    parser.add_argument("--cycles", type=int, default=3, help="Cycles per size; the first one is cold.")
+    parser.add_argument("--mode", default="rebuild", choices=["rebuild", "incremental"], help="DB_REFRESH_MODE.")
+    parser.add_argument("--sweep", action="store_true", help="Enable PARENTKEYS_SWEEP.")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="QUERY_CHUNK_SIZE.")
+    parser.add_argument("--concurrency", type=int, default=16, help="MAX_CONCURRENCY.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every RPC response is delayed by.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum extra random delay per response.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of RPC requests that fail.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.record:
+        ChainState.record(args.endpoint).save(args.record)
+        print(f"Recorded {args.endpoint} to {args.record}")
+        return
+
+    print(f"{'chain':<20} {'keys':>9} {'requests':>9} {'cold':>11} {'warm':>11} {'failed':>8}")
+    if args.dataset:
+        chain = ChainState.load(args.dataset)
+        report(os.path.basename(args.dataset), chain, *run_cycles(chain, args))
+        return
+    for size in args.sizes:
+        validators, subnets, edges = parse_size(size)
+        chain = ChainState.synthetic(validators, subnets, edges, args.miners)
+        report(size, chain, *run_cycles(chain, args))
+
+
+if __name__ == "__main__":
+    main()
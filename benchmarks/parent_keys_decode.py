@@ -0,0 +1,71 @@
+"""Compare the hex-slicing ParentKeys parser with the binary SCALE decoder.
+
+Run from the repository root:
+
+    python -m benchmarks.parent_keys_decode --values 20000
+"""
+import os
+import time
+import argparse
+from substrateinterface import Keypair
+from find_parentkeys.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.scale_decode import decode_parent_keys_many
+
+FULL_PROPORTION = 18446744073709551615
+
+
+def legacy_decode_parent_keys(parent_hex: str, net_uid: int):
+    """The previous parser: 80 hex characters per entry after a fixed 4 character prefix."""
+    parent_keys = []
+    for i in range(4, len(parent_hex), 80):
+        parent_hotkey_hex = parent_hex[i:i + 80]
+        public_key = bytes.fromhex(parent_hotkey_hex[-64:])
+        parent_hotkey = Keypair(public_key=public_key, ss58_format=42).ss58_address
+        proportion = int(bytes.fromhex(parent_hotkey_hex[:16])[::-1].hex(), 16)
+        parent_keys.append({
+            'hotkey': parent_hotkey,
+            'proportion': round(proportion / FULL_PROPORTION, 4),
+            'net_uid': net_uid,
+        })
+    return parent_keys
+
+
+def make_values(count: int, accounts: int):
+    """Build ParentKeys values with one to three parents drawn from a pool of accounts."""
+    pool = [os.urandom(32) for _ in range(accounts)]
+    values = []
+    for i in range(count):
+        parents = [pool[(i * 7 + j) % accounts] for j in range(i % 3 + 1)]
+        entries = b''.join(int.from_bytes(os.urandom(8), 'little').to_bytes(8, 'little') + parent for parent in parents)
+        values.append('0x' + bytes([len(parents) << 2]).hex() + entries.hex())
+    return values
+
+
+def timed(label: str, function, *args):
+    """Run a function once and print how long it took."""
+    start = time.perf_counter()
+    result = function(*args)
+    print(f"{label:<40} {(time.perf_counter() - start) * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=20000, help="Number of ParentKeys values to decode.")
+    parser.add_argument("--accounts", type=int, default=2000, help="Number of distinct parent accounts.")
+    args = parser.parse_args()
+
+    values = make_values(args.values, args.accounts)
+    rpc_request = RPCRequest("ws://127.0.0.1:9944", FULL_PROPORTION)
+    print(f"Decoding {len(values)} ParentKeys values")
+    legacy = timed("hex slicing + Keypair (previous)", lambda: [legacy_decode_parent_keys(v, 1) for v in values])
+    current = timed("RPCRequest.decode_parent_keys", lambda: [rpc_request.decode_parent_keys(v, 1) for v in values])
+    keyed = {(i, 1): value for i, value in enumerate(values)}
+    bulk = timed("RPCRequest.decode_parent_keys_values", rpc_request.decode_parent_keys_values, keyed)
+    records, counts = timed("decode_parent_keys_many (records only)", decode_parent_keys_many, values)
+    assert legacy == current == list(bulk.values()), "decoders disagree"
+    assert len(records) == sum(len(entries) for entries in current) == counts.sum()
+
+
+if __name__ == "__main__":
+    main()
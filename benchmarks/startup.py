@@ -0,0 +1,68 @@
+"""Measure the cold-start time of the entry point, the monitor and the database layer.
+
+Every step runs in a fresh interpreter, so nothing is already imported. Run from the
+repository root:
+
+    python -m benchmarks.startup --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SETUP = (
+    "import os;"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings');"
+    "from django.db import connections;"
+    "from find_parentkeys.database_manage.db_manage import DataBaseManager;"
+    "connections['default'].settings_dict['NAME'] = {path!r};"
+    "DataBaseManager().migrate_db()"
+)
+
+STEPS = [
+    ("python main.py --help", [sys.executable, "main.py", "--help"]),
+    ("import the monitor", [sys.executable, "-c", "import find_parentkeys.parentkey_monitor.monitor_parentkey"]),
+    ("create a ParentkeyMonitor", [
+        sys.executable, "-c",
+        "from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor;"
+        "ParentkeyMonitor({{'DATABASE_DIR': {directory!r}, 'ARCHIVE_SNAPSHOTS': False}})"
+    ]),
+    ("set up Django", [sys.executable, "-c", "import find_parentkeys.database_manage.db_manage"]),
+    ("migrate_db on a current database", [sys.executable, "-c", SETUP]),
+]
+
+
+def run(command, repeat: int):
+    """Run a command in fresh interpreters and return the wall time of each run in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per step; the median and minimum are reported.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'db.sqlite3')
+        # Bring the scratch database up to date once, so the last step measures the skipped check
+        subprocess.run([sys.executable, "-c", SETUP.format(path=path)], check=True, stderr=subprocess.DEVNULL)
+        baseline = run([sys.executable, "-c", "pass"], args.repeat)
+        print(f"{'step':<40} {'median':>10} {'min':>10}")
+        print(f"{'python -c pass (interpreter only)':<40} {statistics.median(baseline) * 1000:7.0f} ms "
+              f"{min(baseline) * 1000:7.0f} ms")
+        for label, command in STEPS:
+            command = [part.format(path=path, directory=directory) for part in command]
+            times = run(command, args.repeat)
+            print(f"{label:<40} {statistics.median(times) * 1000:7.0f} ms {min(times) * 1000:7.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,18 @@ import os
 import sys
 import logging
 import json
+import asyncio
 import django
 from django.core.management import call_command
 from django.db import connection
 import bittensor as bt
 from dotenv import load_dotenv
 from find_childkey.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils import get_parentkey as storage_reads
+from find_parentkeys.utils.metagraph_loader import MetagraphLoader
+from find_parentkeys.utils.runtime_metadata import RuntimeResolver
+from find_parentkeys.utils.subnet_fetcher import SubnetFetcher
+from find_parentkeys.utils.validator_selection import ValidatorSelector
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings')
 django.setup()
@@ -41,6 +47,12 @@ if not chain_endpoint:
 # Initialize Subtensor
 subtensor = bt.Subtensor(network=chain_endpoint)
 
+# Metagraph columns are read directly from storage instead of through subtensor.metagraph
+loader = MetagraphLoader(
+    storage_reads.RPCRequest(chain_endpoint, 18446744073709551615),
+    RuntimeResolver(os.getenv("RUNTIME_METADATA_CACHE", 'runtime_metadata.json'))
+)
+
 def delete_database_file():
     print("Deleting database file")
     # db_path = os.path.join(os.path.dirname(__file__), 'db.sqlite3')
@@ -53,31 +65,38 @@ def delete_database_file():
         print("Database file does not exist, skipping deletion")
 
 def recreate_validators_table():
-    call_command('makemigrations')
     call_command('migrate')
     print("Recreated validators_validators table")
 
-def get_subnet_validators(netuid, subtensor):
+selector = ValidatorSelector()
+
+async def get_subnet_validators(netuid):
     big_validators = {}
-    metagraph = subtensor.metagraph(netuid)
-    neuron_uids = metagraph.uids.tolist()
-    stakes = metagraph.S.tolist()
-    hotkeys = metagraph.hotkeys
-    coldkeys = metagraph.coldkeys
-    for i in range(len(neuron_uids)):
-        if stakes[i] > 1000:
-            validator = Validators(coldkey=coldkeys[i], hotkey=hotkeys[i], stake=stakes[i])
-            parentkey_netuids = validator.get_parentkey_netuids()  # Deserialize JSON to list
-            parentkey_netuids.append(netuid)
-            validator.parentkey_netuids = json.dumps(parentkey_netuids)  # Serialize back to JSON
-            big_validators[validator] = validator
+    metagraph = await loader.load_async(netuid, coldkeys=True)
+    stakes = metagraph.stakes.tolist()
+    hotkeys = metagraph.hotkeys.tolist()
+    coldkeys = metagraph.coldkeys.tolist()
+    for i in selector.select(metagraph.stakes).tolist():
+        validator = Validators(coldkey=coldkeys[i], hotkey=hotkeys[i], stake=stakes[i])
+        parentkey_netuids = validator.get_parentkey_netuids()  # Deserialize JSON to list
+        parentkey_netuids.append(netuid)
+        validator.parentkey_netuids = json.dumps(parentkey_netuids)  # Serialize back to JSON
+        big_validators[validator] = validator
     return list(big_validators.values())
 
-def get_all_validators(subnet_net_uids, subtensor):
+def get_all_validators(subnet_net_uids, workers=8, timeout=120, max_failures=0):
+    # Fetch the subnet metagraphs concurrently; failed subnets are logged and too many abort the run
+    fetcher = SubnetFetcher(workers, timeout, max_failures)
+
+    async def load_subnets():
+        # The loader's storage prefixes come from the runtime metadata
+        await loader.runtime.resolve_async(loader.sdk_call)
+        return await fetcher.fetch_async(subnet_net_uids, get_subnet_validators)
+
+    subnet_validators = asyncio.run(load_subnets())
     all_validators = {}
-    for netuid in subnet_net_uids:
-        subnet_validators = get_subnet_validators(netuid, subtensor)
-        for validator in subnet_validators:
+    for validators in subnet_validators.values():
+        for validator in validators:
             if validator not in all_validators:
                 all_validators[validator] = validator
     return list(all_validators.values())
@@ -99,10 +118,9 @@ if __name__ == "__main__":
     recreate_validators_table()
 
     print("Hello")
-    subnet_uids = get_subnet_uids(subtensor)
-    subnet_uids.remove(0)    
+    subnet_uids = selector.select_subnets(get_subnet_uids(subtensor))
     # subnet_uids = [31, 33, 37]
-    all_validators = get_all_validators(subnet_uids, subtensor)
+    all_validators = get_all_validators(subnet_uids)
     for validator in all_validators:
         logging.info(f"Validator: {validator.__dict__}")
 
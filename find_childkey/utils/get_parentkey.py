@@ -1,11 +1,10 @@
-from substrateinterface.utils.ss58 import ss58_encode, ss58_decode
-from substrateinterface import Keypair
-import hashlib
 import websockets
 import asyncio
 import json
 from dotenv import load_dotenv
 import os
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.storage_keys import get_storage_key_index, u16_key, u16_from_key
 
 load_dotenv()
 
@@ -19,55 +18,28 @@ class RPCRequest:
         self.fullProportion = fullProportion
         self.call_module = call_module
         self.call_function = call_function
+        self.key_index = get_storage_key_index()
             
     def convert_hex_to_ss58(self, hex_string: str, ss58_format: int = 42) -> str:
-        # Extract the first 64 characters (32 bytes) for the public key
-        public_key_hex = hex_string[-64:]
-        
-        # Convert hex string to bytes
-        public_key = bytes.fromhex(public_key_hex)
-        
-        # Check if the public key is 32 bytes long
-        if len(public_key) != 32:
-            raise ValueError('Public key should be 32 bytes long')
-        
-        # Convert to SS58 address with specified ss58_format
-        keypair = Keypair(public_key=public_key, ss58_format=ss58_format)
-        return keypair.ss58_address
+        # The public key is the last 64 characters (32 bytes)
+        return address_codec.hex_to_ss58(hex_string, ss58_format)
 
     def convert_ss58_to_hex(self, ss58_address):
-        # Decode SS58 address to bytes
-        address_str = ss58_decode(ss58_address)
-        
-        address_bytes = bytes(address_str, 'utf-8')
-        
-        # Convert bytes to hex string and add '0x' prefix
-        hex_address = '0x' + address_bytes.hex()
-        
-        return hex_address
+        # Public key of the address as a '0x' prefixed hex string
+        return '0x' + address_codec.ss58_to_hex(ss58_address)
 
     def ss58_to_blake2_128concat(self, ss58_address: str) -> bytes:
-        # Decode the SS58 address to get the raw account ID
-        keypair = Keypair(ss58_address=ss58_address)
-        account_id = keypair.public_key
-
-        # Create a Blake2b hash object with a digest size of 16 bytes (128 bits)
-        blake2b_hash = hashlib.blake2b(account_id, digest_size=16)
-        # Get the digest
-        hash_digest = blake2b_hash.digest()
-        # Concatenate the hash with the original account ID
-        result = hash_digest + account_id
-        return result
+        # Blake2b 128-bit hash of the raw account ID followed by the account ID
+        return address_codec.ss58_to_blake2_128concat(ss58_address)
 
     def decimal_to_hex(self, decimal_num):
         """
         Convert a decimal number to a hexadecimal string.
         
-        :param decimal_num: Decimal number (e.g., 612345678901234567)
-        :return: Hexadecimal string
+        :param decimal_num: Net UID (e.g., 18)
+        :return: Little-endian u16 hex string as used in storage keys (e.g., '1200')
         """
-        hex_str = hex(decimal_num)[2:] + '00'  # Remove the '0x' prefix
-        return hex_str.zfill(4) # Fill with leading zeros to ensure 4 digits
+        return u16_key(decimal_num)
 
     async def call_rpc(self, call_params):
         async with websockets.connect(
@@ -88,21 +60,6 @@ class RPCRequest:
             # print(changes)
             return changes
 
-    def convert_hex_to_ss58(self, hex_string: str, ss58_format: int = 42) -> str:
-        # Extract the first 64 characters (32 bytes) for the public key
-        public_key_hex = hex_string[-64:]
-        
-        # Convert hex string to bytes
-        public_key = bytes.fromhex(public_key_hex)
-        
-        # Check if the public key is 32 bytes long
-        if len(public_key) != 32:
-            raise ValueError('Public key should be 32 bytes long')
-        
-        # Convert to SS58 address with specified ss58_format
-        keypair = Keypair(public_key=public_key, ss58_format=ss58_format)
-        return keypair.ss58_address
-
     def reverse_hex(self, hex_string):
         # Ensure the string is exactly 16 characters long
         if len(hex_string) != 16:
@@ -123,8 +80,8 @@ class RPCRequest:
         return int(hex_str, 16)
 
     def extract_net_uid(self, net_uid_info):
-        net_uid = self.hex_to_decimal(net_uid_info[-4 : -2])
-        return net_uid
+        # The net UID is the little-endian u16 at the end of the storage key
+        return u16_from_key(net_uid_info)
 
     def get_num_results(self, results):
         num_results = self.hex_to_decimal(results[:4])
@@ -132,12 +89,8 @@ class RPCRequest:
 
     def get_parent_keys(self, hotkey, net_uids):
         print("hotkey = ", hotkey, net_uids)
-        blake2_128concat = self.ss58_to_blake2_128concat(hotkey).hex()
-        call_params = []
-        for net_uid in net_uids:
-            net_uid_hex = self.decimal_to_hex(net_uid)
-            call_hex = '0x' + self.call_module + self.call_function + blake2_128concat + net_uid_hex
-            call_params.append(call_hex)
+        prefix = '0x' + self.call_module + self.call_function
+        call_params = [self.key_index.double_map_key(prefix, hotkey, net_uid) for net_uid in net_uids]
 
         call_results = asyncio.run(self.call_rpc(call_params))
         # result = call_parse(call_result)
@@ -146,7 +99,7 @@ class RPCRequest:
 
         for call_result in call_results:
             if call_result[1] is not None:
-                net_uid = self.extract_net_uid(call_result[0])
+                _, net_uid = self.key_index.decode_double_map_key(prefix, call_result[0])
                 parent_hex = call_result[1]
                 parent_hotkey_hexs = []
                 # print(parent_hotkey_hexs)
@@ -0,0 +1,124 @@
+import io
+import logging
+from typing import Dict, Iterable, Tuple
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from validators.models import HotkeyModel, ChildHotkeyModel
+from find_parentkeys.utils.graph_snapshot import EdgeKey, GraphSnapshot
+from find_parentkeys.database_manage.graph_writer import GraphWriter
+
+HOTKEY_TABLE = HotkeyModel._meta.db_table
+EDGE_TABLE = ChildHotkeyModel._meta.db_table
+
+# One statement turns the tables into the staged graph: hotkeys and edges are upserted,
+# rows missing from the stage are deleted, and rows that did not change are left alone.
+MERGE_SQL = f"""
+WITH upserted_hotkeys AS (
+    INSERT INTO {HOTKEY_TABLE} AS h (hotkey, stake)
+    SELECT hotkey, stake FROM staging_hotkeys
+    ON CONFLICT (hotkey) DO UPDATE SET stake = EXCLUDED.stake
+    WHERE h.stake IS DISTINCT FROM EXCLUDED.stake
+    RETURNING h.id, h.hotkey
+),
+hotkey_ids AS (
+    SELECT id, hotkey FROM upserted_hotkeys
+    UNION
+    SELECT h.id, h.hotkey FROM {HOTKEY_TABLE} h JOIN staging_hotkeys s ON s.hotkey = h.hotkey
+),
+removed_hotkeys AS (
+    DELETE FROM {HOTKEY_TABLE} h
+    WHERE NOT EXISTS (SELECT 1 FROM staging_hotkeys s WHERE s.hotkey = h.hotkey)
+    RETURNING h.id
+),
+staged_edges AS (
+    SELECT p.id AS parent_id, c.id AS child_id, e.netuid, e.proportion
+    FROM staging_edges e
+    JOIN hotkey_ids p ON p.hotkey = e.parent
+    JOIN hotkey_ids c ON c.hotkey = e.child
+),
+updated_edges AS (
+    UPDATE {EDGE_TABLE} m SET proportion = e.proportion
+    FROM staged_edges e
+    WHERE m.parent_id = e.parent_id AND m.child_id = e.child_id AND m.netuid = e.netuid
+      AND m.proportion IS DISTINCT FROM e.proportion
+    RETURNING m.id
+),
+removed_edges AS (
+    DELETE FROM {EDGE_TABLE} m
+    WHERE NOT EXISTS (
+        SELECT 1 FROM staged_edges e
+        WHERE e.parent_id = m.parent_id AND e.child_id = m.child_id AND e.netuid = m.netuid
+    )
+    RETURNING m.id
+),
+inserted_edges AS (
+    INSERT INTO {EDGE_TABLE} (parent_id, child_id, netuid, proportion)
+    SELECT e.parent_id, e.child_id, e.netuid, e.proportion FROM staged_edges e
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {EDGE_TABLE} m
+        WHERE m.parent_id = e.parent_id AND m.child_id = e.child_id AND m.netuid = e.netuid
+    )
+    RETURNING id
+)
+SELECT
+    (SELECT count(*) FROM upserted_hotkeys),
+    (SELECT count(*) FROM removed_hotkeys),
+    (SELECT count(*) FROM inserted_edges),
+    (SELECT count(*) FROM updated_edges),
+    (SELECT count(*) FROM removed_edges)
+"""
+
+
+class CopyGraphWriter(GraphWriter):
+    """Loads a cycle into PostgreSQL with ``COPY`` into staging tables and one merge statement.
+
+    Readers keep seeing the previous cycle until the merge commits, and rows that did not
+    change are not rewritten, so their primary keys stay stable across cycles.
+    """
+
+    def merge_snapshot(self, snapshot: GraphSnapshot) -> Tuple[int, int, int, int, int]:
+        """Stage the snapshot with COPY and merge it into the tables in one transaction.
+
+        Returns the number of upserted hotkeys, removed hotkeys, inserted edges, updated
+        edges and removed edges.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE staging_hotkeys (hotkey varchar(255) PRIMARY KEY, stake double precision) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                "CREATE TEMP TABLE staging_edges "
+                "(parent varchar(255), child varchar(255), netuid integer, proportion double precision) "
+                "ON COMMIT DROP"
+            )
+            self._copy(cursor, "staging_hotkeys (hotkey, stake)", snapshot.stakes.items())
+            self._copy(cursor, "staging_edges (parent, child, netuid, proportion)", self._edge_rows(snapshot.edges))
+            # Temporary tables have no statistics until analyzed
+            cursor.execute("ANALYZE staging_hotkeys")
+            cursor.execute("ANALYZE staging_edges")
+            cursor.execute(MERGE_SQL)
+            counts = cursor.fetchone()
+            # ON COMMIT DROP only fires at the outermost commit; drop them now so a caller's
+            # surrounding transaction can merge again
+            cursor.execute("DROP TABLE staging_hotkeys, staging_edges")
+            self.record_snapshot(snapshot)
+        # Primary keys of merged hotkeys are not tracked here
+        self.hotkey_index.clear()
+        logging.info(f"Merged {len(snapshot.stakes)} hotkeys and {len(snapshot.edges)} edges: "
+                     f"hotkeys upserted {counts[0]} -{counts[1]}, edges +{counts[2]} ~{counts[3]} -{counts[4]}")
+        return counts
+
+    def _edge_rows(self, edges: Dict[EdgeKey, float]) -> Iterable[Tuple]:
+        """Flatten edges into (parent, child, netuid, proportion) rows."""
+        return ((parent, child, netuid, proportion) for (parent, child, netuid), proportion in edges.items())
+
+    def _copy(self, cursor, table: str, rows: Iterable[Tuple]) -> None:
+        """Stream rows into a table with COPY in text format."""
+        if not hasattr(cursor.cursor, 'copy_expert'):
+            raise ImproperlyConfigured("CopyGraphWriter needs the psycopg2 driver (psycopg2-binary in requirements.txt)")
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write('\t'.join(map(str, row)) + '\n')
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} FROM STDIN", buffer)
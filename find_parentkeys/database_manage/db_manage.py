@@ -1,44 +1,190 @@
+import hashlib
 import logging
 import os
-from typing import List
+import pkgutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from importlib import import_module
+from typing import Iterable, Iterator, List, Optional, Tuple, Type
+from django.apps import apps
 from django.core.management import call_command
+from django.db import connections
+from django.db.models import Model
+from django.db.migrations.loader import MigrationLoader
 import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings')
 django.setup()
 
+
+def schema_fingerprint(migrations: Iterable[Tuple[str, str]]) -> str:
+    """Hash a set of (app label, migration name) pairs independently of their order."""
+    return hashlib.sha256('\n'.join(f"{app}.{name}" for app, name in sorted(migrations)).encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_schema_fingerprint() -> str:
+    """Fingerprint the migration files shipped with the installed apps, without importing them."""
+    migrations = []
+    for app_config in apps.get_app_configs():
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        if module_name is None:
+            continue
+        try:
+            module = import_module(module_name)
+        except ImportError:
+            continue
+        if not hasattr(module, '__path__'):
+            continue
+        migrations.extend(
+            (app_config.label, name) for _, name, is_package in pkgutil.iter_modules(module.__path__)
+            if not is_package and name[0] not in '_~'
+        )
+    return schema_fingerprint(migrations)
+
+
 class DataBaseManager:
     """
-    Manages database operations such as setting up database path, migration, deletion.
+    Manages database operations on the default connection: migration, rebuilding and history pruning.
+    The database itself is the one the default connection is configured with.
     """
 
-    def __init__(self, db_path: str) -> None:
+    def applied_schema_fingerprint(self) -> Optional[str]:
         """
-        Initialize the database manager with the path to the database file.
-        :param db_path: Path to the SQLite database file.
+        Fingerprint the migrations recorded as applied in the database, or None if none are recorded.
         """
-        self.db_path = db_path
-
-    def delete_database_file(self) -> None:
-        """
-        Deletes the database file if it exists.
-        """
-        print("here5")
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-            logging.info("Deleted database file.")
-            print("removed")
-        else:
-            logging.info("Database file does not exist, skipping deletion.")
+        connection = connections['default']
+        if 'django_migrations' not in connection.introspection.table_names():
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT app, name FROM django_migrations")
+            return schema_fingerprint(cursor.fetchall())
 
     def migrate_db(self) -> None:
         """
         Applies Django migrations to set up or update the database schema.
+        Migrations are shipped with the code, so nothing is generated at runtime, and ``migrate``
+        only runs when the applied migrations differ from the ones on disk.
         """
         try:
-            call_command('makemigrations', verbosity=0)
+            fingerprint = code_schema_fingerprint()
+            if self.applied_schema_fingerprint() == fingerprint:
+                logging.info(f"Database schema is current ({fingerprint[:12]}), skipping migrations.")
+                return
             call_command('migrate', verbosity=0)
-            print("migrated")
             logging.info("Database migrated successfully.")
         except Exception as e:
             logging.error(f"Error migrating database: {e}")
+
+    @contextmanager
+    def build_and_swap(
+        self, cache_size_mb: int = 256, keep: Iterable[Type[Model]] = (), keep_since: Optional[datetime] = None
+    ) -> Iterator[None]:
+        """
+        Point the default connection at a temporary database file for a full rebuild, then swap it in.
+        The file is built with WAL, synchronous=OFF and a large page cache, checkpointed back into a
+        single file, flushed to disk and renamed over the live database (the default connection's
+        ``NAME``), so readers see the old data until the new data is complete. If the build fails,
+        the live database is left untouched.
+        The new file is migrated and the rows of the ``keep`` models are copied into it from the live
+        database before the caller writes, so tables that hold history survive the rebuild.
+        :param cache_size_mb: SQLite page cache used while building, in MiB.
+        :param keep: Models whose rows are carried over from the live database.
+        :param keep_since: If set, only rows created at or after this time are carried over.
+        """
+        settings_dict = connections['default'].settings_dict
+        live_name = settings_dict['NAME']
+        # Built next to the live file, so the rename stays on one filesystem
+        build_path = str(live_name) + '.build'
+        self._remove_sqlite_files(build_path)
+        connections.close_all()
+        settings_dict['NAME'] = build_path
+        start = time.perf_counter()
+        try:
+            with connections['default'].cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=OFF")
+                cursor.execute(f"PRAGMA cache_size=-{cache_size_mb * 1024}")
+            self.migrate_db()
+            self._copy_rows(str(live_name), keep, keep_since)
+            yield
+            with connections['default'].cursor() as cursor:
+                cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                cursor.execute("PRAGMA journal_mode=DELETE")
+            connections.close_all()
+            # The file was written with synchronous=OFF; it must be on disk before it replaces the
+            # live one, and the rename must be on disk before the old data is gone for good
+            self._fsync(build_path)
+            os.replace(build_path, live_name)
+            self._fsync(os.path.dirname(os.path.abspath(live_name)))
+            logging.info(f"Swapped in the rebuilt database after {time.perf_counter() - start:.1f}s")
+        except BaseException:
+            connections.close_all()
+            self._remove_sqlite_files(build_path)
+            raise
+        finally:
+            settings_dict['NAME'] = live_name
+            connections.close_all()
+
+    def prune_history(self, models: Iterable[Type[Model]], since: datetime) -> None:
+        """
+        Delete the rows of the given models created before ``since``.
+        """
+        for model in models:
+            deleted, _ = model.objects.filter(created_at__lt=since).delete()
+            if deleted:
+                logging.info(f"Pruned {deleted} {model._meta.db_table} rows created before {since:%Y-%m-%d %H:%M}")
+
+    def _copy_rows(self, source_path: str, models: Iterable[Type[Model]], since: Optional[datetime] = None) -> None:
+        """
+        Copy the rows of the given models from another SQLite file into the current database,
+        only those created at or after ``since`` if it is set.
+        Tables missing from the source or lacking a column of the model are left empty.
+        """
+        models = list(models)
+        if not models or not os.path.exists(source_path):
+            return
+        connection = connections['default']
+        with connection.cursor() as cursor:
+            cursor.execute("ATTACH DATABASE %s AS source", [source_path])
+            try:
+                for model in models:
+                    table = model._meta.db_table
+                    columns = [field.column for field in model._meta.concrete_fields]
+                    cursor.execute(f"PRAGMA source.table_info({connection.ops.quote_name(table)})")
+                    if not set(columns) <= {row[1] for row in cursor.fetchall()}:
+                        logging.warning(f"Not carrying {table} over: the live database has a different schema")
+                        continue
+                    column_list = ', '.join(connection.ops.quote_name(column) for column in columns)
+                    where, params = '', []
+                    if since is not None:
+                        where = f" WHERE {connection.ops.quote_name(model._meta.get_field('created_at').column)} >= %s"
+                        params = [connection.ops.adapt_datetimefield_value(since)]
+                    cursor.execute(
+                        f"INSERT INTO main.{connection.ops.quote_name(table)} ({column_list}) "
+                        f"SELECT {column_list} FROM source.{connection.ops.quote_name(table)}{where}",
+                        params
+                    )
+                    logging.info(f"Carried {cursor.rowcount} {table} rows over")
+            finally:
+                cursor.execute("DETACH DATABASE source")
+
+    def _fsync(self, path: str) -> None:
+        """
+        Flush a file, or the entries of a directory, to disk.
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _remove_sqlite_files(self, path: str) -> None:
+        """
+        Delete a SQLite database file together with its WAL and shared-memory files.
+        """
+        for file_path in (path, path + '-wal', path + '-shm'):
+            if os.path.exists(file_path):
+                os.remove(file_path)
@@ -0,0 +1,120 @@
+import logging
+from typing import Dict, List, Optional, Set
+from django.db import transaction
+from validators.models import HotkeyModel, ChildHotkeyModel
+from find_parentkeys.utils.graph_snapshot import EdgeKey, GraphSnapshot
+from find_parentkeys.database_manage.graph_writer import GraphWriter
+
+
+class GraphDelta:
+    """Inserts, updates and deletes that turn one graph snapshot into another."""
+
+    def __init__(self) -> None:
+        """Initialize an empty delta."""
+        self.hotkeys_to_create: Dict[str, float] = {}
+        self.hotkeys_to_update: Dict[str, float] = {}
+        self.hotkeys_to_delete: Set[str] = set()
+        self.edges_to_create: Dict[EdgeKey, float] = {}
+        self.edges_to_update: Dict[EdgeKey, float] = {}
+        self.edges_to_delete: Set[EdgeKey] = set()
+
+    def __len__(self) -> int:
+        """Return the number of row changes in the delta."""
+        return (len(self.hotkeys_to_create) + len(self.hotkeys_to_update) + len(self.hotkeys_to_delete)
+                + len(self.edges_to_create) + len(self.edges_to_update) + len(self.edges_to_delete))
+
+    def __str__(self) -> str:
+        """Summarize the delta as per-table insert/update/delete counts."""
+        return (f"hotkeys +{len(self.hotkeys_to_create)} ~{len(self.hotkeys_to_update)} "
+                f"-{len(self.hotkeys_to_delete)}, edges +{len(self.edges_to_create)} "
+                f"~{len(self.edges_to_update)} -{len(self.edges_to_delete)}")
+
+
+def compute_graph_delta(previous: GraphSnapshot, current: GraphSnapshot) -> GraphDelta:
+    """Compute the changes needed to go from the previous snapshot to the current one."""
+    delta = GraphDelta()
+    for hotkey, stake in current.stakes.items():
+        if hotkey not in previous.stakes:
+            delta.hotkeys_to_create[hotkey] = stake
+        elif previous.stakes[hotkey] != stake:
+            delta.hotkeys_to_update[hotkey] = stake
+    delta.hotkeys_to_delete = previous.stakes.keys() - current.stakes.keys()
+
+    for edge, proportion in current.edges.items():
+        if edge not in previous.edges:
+            delta.edges_to_create[edge] = proportion
+        elif previous.edges[edge] != proportion:
+            delta.edges_to_update[edge] = proportion
+    delta.edges_to_delete = previous.edges.keys() - current.edges.keys()
+    return delta
+
+
+class GraphSync:
+    """Keeps the HotkeyModel/ChildHotkeyModel tables in sync with the chain incrementally."""
+
+    def __init__(self, writer: GraphWriter = None) -> None:
+        """Initialize the synchronizer with the writer used to apply deltas."""
+        self.writer = writer if writer is not None else GraphWriter()
+        self._edge_ids: Dict[EdgeKey, int] = {}
+        self._duplicate_edge_ids: List[int] = []
+        self._graph: Optional[GraphSnapshot] = None
+
+    def load_graph(self) -> GraphSnapshot:
+        """Load the graph currently stored in the database."""
+        stakes: Dict[str, float] = {}
+        hotkey_ids: Dict[str, int] = {}
+        for hotkey_id, hotkey, stake in HotkeyModel.objects.values_list('id', 'hotkey', 'stake'):
+            stakes[hotkey] = stake
+            hotkey_ids[hotkey] = hotkey_id
+        self.writer.hotkey_index.clear()
+        self.writer.hotkey_index.add(hotkey_ids)
+        edges: Dict[EdgeKey, float] = {}
+        self._edge_ids = {}
+        self._duplicate_edge_ids = []
+        rows = ChildHotkeyModel.objects.values_list('id', 'parent__hotkey', 'child__hotkey', 'netuid', 'proportion')
+        for edge_id, parent, child, netuid, proportion in rows.order_by('id'):
+            edge = (parent, child, netuid)
+            if edge in edges:
+                self._duplicate_edge_ids.append(edge_id)
+            else:
+                edges[edge] = proportion
+                self._edge_ids[edge] = edge_id
+        self._graph = GraphSnapshot(stakes, edges)
+        return self._graph
+
+    def sync(self, current: GraphSnapshot) -> GraphDelta:
+        """Diff the stored graph against the current one and apply only the delta."""
+        delta = compute_graph_delta(self.load_graph(), current)
+        with transaction.atomic():
+            self.apply_delta(delta)
+            self.writer.record_snapshot(current)
+        self._graph = current
+        logging.info(f"Applied graph delta: {delta}")
+        return delta
+
+    def update(self, current: GraphSnapshot) -> GraphDelta:
+        """Apply the delta against the last synced graph without reloading it from the database."""
+        if self._graph is None:
+            return self.sync(current)
+        delta = compute_graph_delta(self._graph, current)
+        if len(delta):
+            with transaction.atomic():
+                self.apply_delta(delta)
+                self.writer.record_snapshot(current)
+        self._graph = current
+        return delta
+
+    def apply_delta(self, delta: GraphDelta) -> None:
+        """Apply a delta computed against the last loaded graph in one transaction."""
+        with transaction.atomic():
+            self.writer.delete_edges(
+                self._duplicate_edge_ids + [self._edge_ids[edge] for edge in delta.edges_to_delete]
+            )
+            self.writer.delete_hotkeys(delta.hotkeys_to_delete)
+            self.writer.update_hotkeys(delta.hotkeys_to_update)
+            self.writer.create_hotkeys(delta.hotkeys_to_create)
+            self.writer.update_edges(delta.edges_to_update, self._edge_ids)
+            self._edge_ids.update(self.writer.create_edges(delta.edges_to_create))
+        for edge in delta.edges_to_delete:
+            self._edge_ids.pop(edge, None)
+        self._duplicate_edge_ids = []
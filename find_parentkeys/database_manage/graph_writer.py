@@ -0,0 +1,104 @@
+import logging
+from typing import Dict, Iterable, List
+from django.db import transaction
+from validators.models import HotkeyModel, ChildHotkeyModel, SnapshotModel, ChangeModel
+from find_parentkeys.utils.graph_snapshot import EdgeKey, GraphSnapshot
+from find_parentkeys.utils.change_set import ChangeSet
+from find_parentkeys.database_manage.hotkey_index import HotkeyIndex
+
+
+class GraphWriter:
+    """Writes a cycle's hotkeys and edges with bulk ORM operations inside one transaction."""
+
+    def __init__(self, batch_size: int = 1000, hotkey_index: HotkeyIndex = None) -> None:
+        """
+        Initialize the writer.
+        :param batch_size: Rows per bulk INSERT/UPDATE/DELETE statement.
+        :param hotkey_index: Hotkey -> primary key map kept current as hotkeys are written.
+        """
+        self.batch_size = batch_size
+        self.hotkey_index = hotkey_index if hotkey_index is not None else HotkeyIndex()
+
+    def write_snapshot(self, snapshot: GraphSnapshot) -> None:
+        """Insert a full snapshot into empty tables."""
+        self.hotkey_index.clear()
+        with transaction.atomic():
+            self.create_hotkeys(snapshot.stakes)
+            self.create_edges(snapshot.edges)
+            self.record_snapshot(snapshot)
+        logging.info(f"Wrote {len(snapshot.stakes)} hotkeys and {len(snapshot.edges)} edges")
+
+    def record_snapshot(self, snapshot: GraphSnapshot) -> None:
+        """Store the block the snapshot was read at."""
+        if snapshot.block_hash is not None:
+            SnapshotModel.objects.create(block_number=snapshot.block_number, block_hash=snapshot.block_hash)
+
+    def record_changes(self, changes: ChangeSet) -> None:
+        """Bulk insert the rows of a change set."""
+        rows = [
+            ChangeModel(
+                block_number=changes.block_number, kind=kind, hotkey=hotkey, child=child,
+                netuid=netuid, old_value=old_value, new_value=new_value
+            )
+            for kind, hotkey, child, netuid, old_value, new_value in changes.rows()
+        ]
+        ChangeModel.objects.bulk_create(rows, batch_size=self.batch_size)
+
+    def create_hotkeys(self, stakes: Dict[str, float]) -> None:
+        """Bulk insert hotkeys and record their primary keys in the hotkey index."""
+        hotkeys = [HotkeyModel(hotkey=hotkey, stake=stake) for hotkey, stake in stakes.items()]
+        hotkeys = HotkeyModel.objects.bulk_create(hotkeys, batch_size=self.batch_size)
+        hotkey_ids = {hotkey.hotkey: hotkey.pk for hotkey in hotkeys if hotkey.pk is not None}
+        if len(hotkey_ids) < len(hotkeys):
+            # The backend could not return primary keys from the bulk insert
+            hotkey_ids = self._load_hotkey_ids(list(stakes))
+        self.hotkey_index.add(hotkey_ids)
+
+    def _load_hotkey_ids(self, hotkeys: List[str]) -> Dict[str, int]:
+        """Look up primary keys of stored hotkeys in batches."""
+        hotkey_ids: Dict[str, int] = {}
+        for i in range(0, len(hotkeys), self.batch_size):
+            batch = hotkeys[i:i + self.batch_size]
+            hotkey_ids.update(HotkeyModel.objects.filter(hotkey__in=batch).values_list('hotkey', 'id'))
+        return hotkey_ids
+
+    def create_edges(self, edges: Dict[EdgeKey, float]) -> Dict[EdgeKey, int]:
+        """Bulk insert parent/child edges between hotkeys already in the hotkey index."""
+        edge_keys = list(edges)
+        edge_models = [
+            ChildHotkeyModel(
+                parent_id=self.hotkey_index[parent],
+                child_id=self.hotkey_index[child],
+                netuid=netuid,
+                proportion=edges[(parent, child, netuid)]
+            )
+            for parent, child, netuid in edge_keys
+        ]
+        edge_models = ChildHotkeyModel.objects.bulk_create(edge_models, batch_size=self.batch_size)
+        return {edge: model.pk for edge, model in zip(edge_keys, edge_models) if model.pk is not None}
+
+    def update_hotkeys(self, stakes: Dict[str, float]) -> None:
+        """Bulk update the stake of stored hotkeys."""
+        hotkeys = [
+            HotkeyModel(id=self.hotkey_index[hotkey], hotkey=hotkey, stake=stake)
+            for hotkey, stake in stakes.items()
+        ]
+        HotkeyModel.objects.bulk_update(hotkeys, ['stake'], batch_size=self.batch_size)
+
+    def update_edges(self, edges: Dict[EdgeKey, float], edge_ids: Dict[EdgeKey, int]) -> None:
+        """Bulk update the proportion of stored edges."""
+        edge_models = [ChildHotkeyModel(id=edge_ids[edge], proportion=proportion) for edge, proportion in edges.items()]
+        ChildHotkeyModel.objects.bulk_update(edge_models, ['proportion'], batch_size=self.batch_size)
+
+    def delete_hotkeys(self, hotkeys: Iterable[str]) -> None:
+        """Delete hotkeys (and their edges) in batches and drop them from the hotkey index."""
+        hotkeys = list(hotkeys)
+        ids = [self.hotkey_index[hotkey] for hotkey in hotkeys]
+        for i in range(0, len(ids), self.batch_size):
+            HotkeyModel.objects.filter(id__in=ids[i:i + self.batch_size]).delete()
+        self.hotkey_index.remove(hotkeys)
+
+    def delete_edges(self, ids: List[int]) -> None:
+        """Delete edges by primary key in batches."""
+        for i in range(0, len(ids), self.batch_size):
+            ChildHotkeyModel.objects.filter(id__in=ids[i:i + self.batch_size]).delete()
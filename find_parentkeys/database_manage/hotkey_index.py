@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, Iterator, Optional
+
+
+class HotkeyIndex:
+    """In-process hotkey -> HotkeyModel primary key map.
+
+    The writers fill it from the rows they insert or read and keep it current as rows are
+    inserted or deleted, so resolving the parent and child of an edge never needs a query.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._ids: Dict[str, int] = {}
+
+    def clear(self) -> None:
+        """Forget all hotkeys, e.g. after the database has been recreated."""
+        self._ids = {}
+
+    def add(self, hotkey_ids: Dict[str, int]) -> None:
+        """Record primary keys of newly inserted hotkeys."""
+        self._ids.update(hotkey_ids)
+
+    def remove(self, hotkeys: Iterable[str]) -> None:
+        """Forget deleted hotkeys."""
+        for hotkey in hotkeys:
+            self._ids.pop(hotkey, None)
+
+    def get(self, hotkey: str) -> Optional[int]:
+        """Return the primary key of a hotkey, or None if it is not stored."""
+        return self._ids.get(hotkey)
+
+    def __getitem__(self, hotkey: str) -> int:
+        return self._ids[hotkey]
+
+    def __contains__(self, hotkey: str) -> bool:
+        return hotkey in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
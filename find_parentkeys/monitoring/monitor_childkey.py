@@ -8,6 +8,7 @@ from django.db import connection
 import bittensor as bt
 from dotenv import load_dotenv
 from find_childkey.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.validator_selection import ValidatorSelector
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings')
 
@@ -44,24 +45,23 @@ def delete_database_file():
         print("Database file does not exist, skipping deletion")
 
 def recreate_validators_table():
-    call_command('makemigrations')
     call_command('migrate')
     print("Recreated validators_validators table")
 
+selector = ValidatorSelector()
+
 def get_subnet_validators(netuid, subtensor):
     big_validators = {}
     metagraph = subtensor.metagraph(netuid)
-    neuron_uids = metagraph.uids.tolist()
     stakes = metagraph.S.tolist()
     hotkeys = metagraph.hotkeys
     coldkeys = metagraph.coldkeys
-    for i in range(len(neuron_uids)):
-        if stakes[i] > 1000:
-            validator = Validators(coldkey=coldkeys[i], hotkey=hotkeys[i], stake=stakes[i])
-            parentkey_netuids = validator.get_parentkey_netuids()  # Deserialize JSON to list
-            parentkey_netuids.append(netuid)
-            validator.parentkey_netuids = json.dumps(parentkey_netuids)  # Serialize back to JSON
-            big_validators[validator] = validator
+    for i in selector.select(metagraph.S).tolist():
+        validator = Validators(coldkey=coldkeys[i], hotkey=hotkeys[i], stake=stakes[i])
+        parentkey_netuids = validator.get_parentkey_netuids()  # Deserialize JSON to list
+        parentkey_netuids.append(netuid)
+        validator.parentkey_netuids = json.dumps(parentkey_netuids)  # Serialize back to JSON
+        big_validators[validator] = validator
     return list(big_validators.values())
 
 def get_all_validators(subnet_net_uids, subtensor):
@@ -108,9 +108,7 @@ if __name__ == "__main__":
 
     recreate_validators_table()
 
-    subnet_uids = get_subnet_uids(subtensor)
-    
-    subnet_uids.remove(0)    
+    subnet_uids = selector.select_subnets(get_subnet_uids(subtensor))
     # subnet_uids = [49, 50]
     all_validators = get_all_validators(subnet_uids, subtensor)
     for validator in all_validators:
@@ -151,6 +149,5 @@ if __name__ == "__main__":
     create_validator_childkey_tables(all_validators)
 
     # Run migrations after creating entries
-    call_command('makemigrations')
     call_command('migrate')
     print("Migrations completed")
\ No newline at end of file
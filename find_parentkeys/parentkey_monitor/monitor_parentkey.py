@@ -1,14 +1,26 @@
 import os
+import asyncio
 import logging
-import django
-from typing import List, Tuple, Dict
-import bittensor as bt
+import threading
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional
 from find_parentkeys.utils.get_parentkey import RPCRequest
-from find_parentkeys.database_manage.db_manage import DataBaseManager
-from validators.models import HotkeyModel, ChildHotkeyModel
+from find_parentkeys.database_manage.hotkey_index import HotkeyIndex
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+from find_parentkeys.utils.stake_cache import StakeCache
+from find_parentkeys.utils.metagraph_loader import MetagraphLoader
+from find_parentkeys.utils.subnet_fetcher import SubnetFetcher
+from find_parentkeys.utils.validator_selection import ValidatorSelector
+from find_parentkeys.utils.registration_index import RegistrationIndex
+from find_parentkeys.utils.storage_keys import get_storage_key_index
+from find_parentkeys.utils.runtime_metadata import RuntimeResolver
+from find_parentkeys.utils.stake_graph import StakeGraph
+from find_parentkeys.utils.change_set import ChangeDetector, ChangeSet
+from find_parentkeys.utils.snapshot_archive import SnapshotArchive
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bt_childkey_monitor.settings')
-django.setup()
+if TYPE_CHECKING:
+    from find_parentkeys.database_manage.graph_writer import GraphWriter
 
 class ParentkeyMonitor:
     """Monitors and manages parent keys in the blockchain network."""
@@ -16,130 +28,302 @@ class ParentkeyMonitor:
     def __init__(self, config: Dict) -> None:
         """Initialize the ParentkeyMonitor class."""
         self.config = config
+        self.hotkey_index = HotkeyIndex()
+        self.stake_cache = StakeCache(config.get("STAKE_CACHE_TTL", 600), config.get("STAKE_CACHE_SIZE", 100000))
+        self.selector = ValidatorSelector(
+            config.get("STAKE_THRESHOLD", 1000),
+            config.get("SUBNET_INCLUDE"),
+            config.get("SUBNET_EXCLUDE"),
+            config.get("TOP_N_PER_SUBNET")
+        )
+        self.registrations = RegistrationIndex()
+        self.stake_graph: Optional[StakeGraph] = None
+        self.change_detector = ChangeDetector(config.get("STAKE_CHANGE_THRESHOLD", 1.0))
+        self.archive: Optional[SnapshotArchive] = None
+        if config.get("ARCHIVE_SNAPSHOTS", True):
+            self.archive = SnapshotArchive(
+                config.get("ARCHIVE_DIR") or os.path.join(config.get("DATABASE_DIR", "db"), 'archive'),
+                config.get("ARCHIVE_RETENTION_DAYS", 30),
+                config.get("ARCHIVE_COMPACT_SEGMENTS", 24)
+            )
+        self._worker_state = threading.local()
+        self.key_index = get_storage_key_index()
+        self.key_index_path = config.get("STORAGE_KEY_INDEX_PATH") or os.path.join(
+            config.get("DATABASE_DIR", "db"), 'storage_keys.json'
+        )
+        self.key_index.load(self.key_index_path)
+        self.runtime = RuntimeResolver(
+            config.get("RUNTIME_METADATA_CACHE") or os.path.join(config.get("DATABASE_DIR", "db"), 'runtime_metadata.json')
+        )
 
-    def get_subnet_uids(self, subtensor) -> List[int]:
+    def get_subnet_uids(self, subtensor, block: Optional[int] = None) -> List[int]:
         """Retrieve subnet UIDs from the subtensor."""
         try:
-            subnet_uids = subtensor.get_subnets()
+            subnet_uids = subtensor.get_subnets(block=block)
             logging.info(f"Subnet UIDs: {subnet_uids}")
             return subnet_uids
         except Exception as e:
             logging.error(f"Error retrieving subnet UIDs: {e}")
             return []
 
-    def get_subnet_validators(self, netuid: int, subtensor) -> List[HotkeyModel]:
-        """Retrieve validators for a specific subnet."""
-        big_validators: Dict[HotkeyModel, HotkeyModel] = {}
-        try:
-            metagraph = subtensor.metagraph(netuid)
-            neuron_uids = metagraph.uids.tolist()
-            stakes = metagraph.S.tolist()
-            hotkeys = metagraph.hotkeys
-
-            for i in range(len(neuron_uids)):
-                if stakes[i] > 1000:
-                    hotkey = HotkeyModel(hotkey=hotkeys[i])
-                    big_validators[hotkey] = hotkey
-        except Exception as e:
-            logging.error(f"Error retrieving validators for subnet {netuid}: {e}")
+    def get_subnet_validators(self, netuid: int, subtensor, block: Optional[int] = None) -> np.ndarray:
+        """Retrieve validator hotkeys for a specific subnet."""
+        return self._load_subnet(netuid, subtensor, block)[0]
+
+    def _load_subnet(self, netuid: int, subtensor, block: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the validator hotkeys and all registered hotkeys of a subnet."""
+        metagraph = subtensor.metagraph(netuid, block=block)
+        hotkeys = np.asarray(metagraph.hotkeys, dtype=object)
+        return self.selector.select_hotkeys(hotkeys, metagraph.S), hotkeys
+
+    def _load_subnet_in_worker(self, netuid: int, block: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Load a subnet on the calling worker thread's own subtensor connection."""
+        subtensor = getattr(self._worker_state, "subtensor", None)
+        if subtensor is None:
+            subtensor = self._subtensor()
+            self._worker_state.subtensor = subtensor
+        return self._load_subnet(netuid, subtensor, block)
 
-        return list(big_validators.values())
+    def _subtensor(self):
+        """Connect to the configured chain with the bittensor SDK, which is only imported when it is used."""
+        import bittensor as bt
+        return bt.Subtensor(network=self.config.get("CHAIN_ENDPOINT"))
 
-    def get_all_validators_subnets(self, subtensor) -> Tuple[List[HotkeyModel], List[int]]:
-        """Retrieve all validators and their associated subnets."""
-        all_validators: Dict[HotkeyModel, HotkeyModel] = {}
-        subnet_net_uids = self.get_subnet_uids(subtensor)
-        subnet_net_uids.remove(0)  # Remove the root subnet
-        subnet_net_uids = [1, 3]  # Example: specify subnets of interest
-        
-        for netuid in subnet_net_uids:
-            subnet_validators = self.get_subnet_validators(netuid, subtensor)
-            for validator in subnet_validators:
-                all_validators.setdefault(validator, validator)
+    def get_all_validators_subnets(
+        self, subtensor, block: Optional[int] = None
+    ) -> Tuple[np.ndarray, List[int]]:
+        """Retrieve all validator hotkeys and their associated subnets, fetching subnet metagraphs concurrently."""
+        subnet_net_uids = self.selector.select_subnets(self.get_subnet_uids(subtensor, block))
+        subnets = asyncio.run(self._subnet_fetcher().fetch_async(
+            subnet_net_uids,
+            lambda netuid: asyncio.to_thread(self._load_subnet_in_worker, netuid, block)
+        ))
+        return self._merge_validators(subnets), subnet_net_uids
 
-        logging.info("Created entries for all parent validators")
-        return list(all_validators.values()), subnet_net_uids
+    async def get_all_validators_subnets_lite(
+        self, sdk_call: RPCRequest, block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Tuple[np.ndarray, List[int]]:
+        """Retrieve all validator hotkeys and their subnets with direct storage reads instead of full metagraphs."""
+        loader = MetagraphLoader(sdk_call, self.runtime)
+        subnet_net_uids = self.selector.select_subnets(await loader.get_subnets_async(block_hash, semaphore))
+        subnets = await self._subnet_fetcher().fetch_async(
+            subnet_net_uids,
+            lambda netuid: self._load_subnet_lite(loader, netuid, block_hash, semaphore)
+        )
+        return self._merge_validators(subnets), subnet_net_uids
+
+    async def _load_subnet_lite(
+        self, loader: MetagraphLoader, netuid: int, block_hash: Optional[str], semaphore: Optional[asyncio.Semaphore]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the validator hotkeys and all registered hotkeys of a subnet from its storage columns."""
+        metagraph = await loader.load_async(netuid, block_hash, semaphore)
+        if block_hash is not None:
+            # Stakes read at an unpinned head have no block to be cached under
+            self.stake_cache.put_many(dict(zip(metagraph.hotkeys.tolist(), metagraph.stakes.tolist())), block_hash)
+        return self.selector.select_hotkeys(metagraph.hotkeys, metagraph.stakes), metagraph.hotkeys
+
+    def _subnet_fetcher(self) -> SubnetFetcher:
+        """Create the per-subnet fetcher from the configured workers, timeout and failure budget."""
+        return SubnetFetcher(
+            self.config.get("METAGRAPH_WORKERS", 8),
+            self.config.get("METAGRAPH_TIMEOUT", 120),
+            self.config.get("METAGRAPH_MAX_FAILURES", 0)
+        )
+
+    def _merge_validators(self, subnets: Dict[int, Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Merge the validator hotkeys of all subnets and index where every hotkey is registered."""
+        self.registrations = RegistrationIndex()
+        for netuid, (_, hotkeys) in subnets.items():
+            self.registrations.add(netuid, hotkeys)
+        validators = self.selector.merge(validators for validators, _ in subnets.values())
+        logging.info(f"Selected {len(validators)} validators on {len(subnets)} subnets")
+        return validators
+
+    async def select_validators_async(
+        self, sdk_call: RPCRequest, block_number: Optional[int] = None, block_hash: Optional[str] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Tuple[np.ndarray, List[int]]:
+        """Retrieve validator hotkeys and subnets with the loader chosen by ``METAGRAPH_LOADER``."""
+        if self.config.get("METAGRAPH_LOADER", "lite") == "sdk":
+            subtensor = await asyncio.to_thread(self._subtensor)
+            return await asyncio.to_thread(self.get_all_validators_subnets, subtensor, block_number)
+        return await self.get_all_validators_subnets_lite(sdk_call, block_hash, semaphore)
 
     def monitor_parentkeys(self) -> None:
         """Monitors parent keys and updates the database with the latest information."""
-        print("here1")
-        full_proportion = self.config.get("FULL_PROPORTION")
-        subtensor_call_module = self.config.get("SUBTENSORMODULE")
-        parent_keys_call_function = self.config.get("PARENTKEYS_FUNCTION")
-        total_hotkey_stake_call_function = self.config.get("TOTALHOTKEYSTAKE_FUNCTION")
-        chain_endpoint = self.config.get("CHAIN_ENDPOINT")
-
-        subtensor = bt.Subtensor(network=chain_endpoint)
-        sdk_call = RPCRequest(chain_endpoint, full_proportion)
-        print(self.config)
-        db_path = os.path.join(self.config.get("DATABASE_DIR"), 'db.sqlite3')
-        db_manager = DataBaseManager(db_path)
-        print("here2")
-        db_manager.delete_database_file()
-        db_manager.migrate_db()
-
-        all_validators, subnet_uids = self.get_all_validators_subnets(subtensor)
-        print("here 6")
-        for validator in all_validators:
-            logging.info(f"Processing validator: {validator.hotkey}")
-            validator.stake = sdk_call.get_stake_from_hotkey(
-                subtensor_call_module,
-                total_hotkey_stake_call_function,
-                validator.hotkey
-            )
-            validator.save()
-        print("here3")
-        for validator in all_validators:
-            parent_keys = sdk_call.get_parent_keys(
-                subtensor_call_module,
-                parent_keys_call_function,
-                validator.hotkey,
-                subnet_uids
-            )
-            print("here4")
-            self._process_parent_keys(parent_keys, validator)
-
-    def _process_parent_keys(self, parent_keys: List[Dict], validator: HotkeyModel) -> None:
-        """Process and save parent keys for a given validator."""
-        for parent_key in parent_keys:
-            parent_validator = self._get_or_create_parent_validator(parent_key)
-            ChildHotkeyModel.objects.create(
-                parent=parent_validator,
-                child=validator,
-                netuid=parent_key['net_uid'],
-                proportion=parent_key['proportion']
-            )
+        # Importing the database layer sets up Django, so it waits until there is something to write
+        from django.db import connection
+        from find_parentkeys.database_manage.db_manage import DataBaseManager
+        from find_parentkeys.database_manage.graph_sync import GraphSync
+        from find_parentkeys.database_manage.graph_writer import GraphWriter
+        from find_parentkeys.database_manage.copy_writer import CopyGraphWriter
+        from validators.models import SnapshotModel, ChangeModel
+
+        snapshot = asyncio.run(self.collect_parentkeys_async())
+        changes = self.change_detector.detect(snapshot)
+
+        db_manager = DataBaseManager()
+        writer = GraphWriter(self.config.get("DB_BATCH_SIZE", 1000), self.hotkey_index)
+        history = (SnapshotModel, ChangeModel)
+        history_since = self.history_since()
+        if connection.vendor == "postgresql":
+            # Readers keep the previous cycle until the merge commits
+            db_manager.migrate_db()
+            CopyGraphWriter(writer.batch_size, self.hotkey_index).merge_snapshot(snapshot)
+            self._record_changes(writer, changes)
+            db_manager.prune_history(history, history_since)
+        elif self.config.get("DB_REFRESH_MODE", "rebuild") == "incremental":
+            db_manager.migrate_db()
+            GraphSync(writer).sync(snapshot)
+            self._record_changes(writer, changes)
+            db_manager.prune_history(history, history_since)
+        else:
+            # Build into a separate file and swap it in, so readers never see a partial database;
+            # the block and change history within the retention window is carried over from the live file
+            cache_size_mb = self.config.get("DB_BUILD_CACHE_MB", 256)
+            with db_manager.build_and_swap(cache_size_mb, keep=history, keep_since=history_since):
+                writer.write_snapshot(snapshot)
+                self._record_changes(writer, changes)
+        # Only a stored change set moves the baseline; after a failed write the next cycle reports it again
+        self.change_detector.commit()
+        self.archive_snapshot(snapshot)
+        self.key_index.retain(set(self.registrations).union(snapshot.stakes))
+        self.key_index.save(self.key_index_path)
+
+    def history_since(self) -> datetime:
+        """Return the creation time before which stored snapshots and changes are dropped."""
+        return datetime.now(timezone.utc) - timedelta(days=self.config.get("HISTORY_RETENTION_DAYS", 30))
+
+    def _record_changes(self, writer: "GraphWriter", changes: Optional[ChangeSet]) -> None:
+        """Store the cycle's change set, unless this is the first cycle."""
+        if changes is not None:
+            writer.record_changes(changes)
+            logging.info(f"Changes since the previous cycle: {changes}")
+
+    def archive_snapshot(self, snapshot: GraphSnapshot) -> None:
+        """Append the snapshot to the historical archive, if archiving is enabled."""
+        if self.archive is not None and self.archive.append(snapshot):
+            logging.info(f"Archived block {snapshot.block_number}: {len(self.archive)} snapshots, "
+                         f"{self.archive.size() / 2**20:.1f} MiB")
+
+    async def collect_parentkeys_async(self) -> GraphSnapshot:
+        """Fetch validators, stakes and parent keys at one pinned block, without touching the database."""
+        semaphore = asyncio.Semaphore(self.config.get("MAX_CONCURRENCY", 16))
+        sdk_call = self._rpc_request()
+        block_number, block_hash = await sdk_call.pin_block_async()
+        logging.info(f"Pinned cycle to block {block_number} ({block_hash})")
+        await self.runtime.resolve_async(sdk_call, block_hash)
+        subtensor_call_module, parent_keys_call_function = self.runtime.call_params("ParentKeys")
 
-    def _get_or_create_parent_validator(self, parent_key: Dict) -> HotkeyModel:
-        """Retrieve or create a parent validator."""
-        if HotkeyModel.objects.filter(hotkey=parent_key['hotkey']).exists():
-            return HotkeyModel.objects.get(hotkey=parent_key['hotkey'])
+        validators, subnet_uids = await self.select_validators_async(sdk_call, block_number, block_hash, semaphore)
+        validator_hotkeys = validators.tolist()
+
+        if self.config.get("PARENTKEYS_SWEEP", False):
+            parent_keys = await self._sweep_parent_keys(sdk_call, subnet_uids, block_hash, semaphore)
+            # Children below the metagraph stake filter are only found by the sweep
+            child_hotkeys = np.array([hotkey for hotkey, _ in parent_keys], dtype=object)
+            all_hotkeys = self.selector.merge([validators, child_hotkeys]).tolist()
+            logging.info(f"Fetching stakes for {len(all_hotkeys)} hotkeys")
+            stakes = await self.get_stakes_cached(sdk_call, all_hotkeys, block_hash, semaphore)
         else:
-            cur_stake = self._get_current_stake(parent_key['hotkey'])
-            return HotkeyModel.objects.create(
-                hotkey=parent_key['hotkey'],
-                stake=cur_stake,
+            logging.info(f"Fetching stakes and parent keys for {len(validator_hotkeys)} validators "
+                         f"on {len(subnet_uids)} subnets")
+            stakes, parent_keys = await asyncio.gather(
+                self.get_stakes_cached(sdk_call, validator_hotkeys, block_hash, semaphore),
+                sdk_call.get_parent_keys_pairs_async(
+                    subtensor_call_module,
+                    parent_keys_call_function,
+                    self.parent_key_pairs(validator_hotkeys, subnet_uids),
+                    block_hash,
+                    semaphore
+                ),
+            )
+
+        missing_parents = {
+            parent_key['hotkey']
+            for subnet_parent_keys in parent_keys.values()
+            for parent_key in subnet_parent_keys
+        } - stakes.keys()
+        logging.info(f"Fetching stakes for {len(missing_parents)} parents outside the validator set")
+        parent_stakes = await self.get_stakes_cached(sdk_call, list(missing_parents), block_hash, semaphore)
+        logging.info(f"Stake cache: {self.stake_cache}")
+        snapshot = self._build_snapshot(stakes, parent_keys, parent_stakes, block_number, block_hash)
+        snapshot.validators = set(validator_hotkeys)
+        snapshot.net_uids = subnet_uids
+        self.stake_graph = StakeGraph(snapshot)
+        logging.info(f"Stake graph: {self.stake_graph}")
+        return snapshot
+
+    def parent_key_pairs(self, hotkeys: List[str], subnet_uids: List[int]) -> List[Tuple[str, int]]:
+        """Return the (hotkey, net UID) ParentKeys entries to read, skipping subnets a hotkey is not registered on."""
+        if not self.config.get("PRUNE_PARENTKEYS", True):
+            return [(hotkey, net_uid) for hotkey in hotkeys for net_uid in subnet_uids]
+        pairs = self.registrations.pairs(hotkeys, subnet_uids)
+        total = len(hotkeys) * len(subnet_uids)
+        logging.info(f"Pruned {total - len(pairs)} of {total} ParentKeys keys to subnets the validators are registered on")
+        return pairs
+
+    async def _sweep_parent_keys(
+        self, sdk_call: RPCRequest, subnet_uids: List[int], block_hash: str, semaphore: asyncio.Semaphore
+    ) -> Dict[Tuple[str, int], List[Dict]]:
+        """Sweep every existing ParentKeys entry and keep those on the monitored subnets."""
+        all_parent_keys = await sdk_call.get_all_parent_keys_async(
+            *self.runtime.call_params("ParentKeys"),
+            self.config.get("KEYS_PAGE_SIZE", 1000),
+            block_hash,
+            semaphore
+        )
+        monitored_subnets = set(subnet_uids)
+        parent_keys = {
+            (hotkey, net_uid): subnet_parent_keys
+            for (hotkey, net_uid), subnet_parent_keys in all_parent_keys.items()
+            if net_uid in monitored_subnets
+        }
+        logging.info(f"Swept {len(all_parent_keys)} ParentKeys entries, {len(parent_keys)} on monitored subnets")
+        return parent_keys
+
+    def _build_snapshot(
+        self, validator_stakes: Dict[str, float], parent_keys: Dict[Tuple[str, int], List[Dict]],
+        parent_stakes: Dict[str, float], block_number: int, block_hash: str
+    ) -> GraphSnapshot:
+        """Collect the cycle's hotkey stakes and parent/child edges in memory."""
+        stakes = dict(parent_stakes)
+        stakes.update(validator_stakes)
+        edges = {
+            (parent_key['hotkey'], hotkey, net_uid): parent_key['proportion']
+            for (hotkey, net_uid), subnet_parent_keys in parent_keys.items()
+            for parent_key in subnet_parent_keys
+        }
+        return GraphSnapshot(stakes, edges, block_number, block_hash)
+
+    async def get_stakes_cached(
+        self, sdk_call: RPCRequest, hotkeys: List[str], block_hash: str, semaphore: asyncio.Semaphore
+    ) -> Dict[str, float]:
+        """Get stakes at the pinned block, fetching only hotkeys missing from the stake cache."""
+        stakes, missing = self.stake_cache.get_many(dict.fromkeys(hotkeys), block_hash)
+        if missing:
+            fetched = await sdk_call.get_stakes_bulk_async(
+                *self.runtime.call_params("TotalHotkeyStake"),
+                missing,
+                block_hash,
+                semaphore
             )
+            self.stake_cache.put_many(fetched, block_hash)
+            stakes.update(fetched)
+        return stakes
 
-    def _get_current_stake(self, hotkey: str) -> float:
-        """Get the current stake for a hotkey."""
-        subtensor_call_module = self.config.get("SUBTENSORMODULE")
-        total_hotkey_stake_call_function = self.config.get("TOTALHOTKEYSTAKE_FUNCTION")
-        sdk_call = RPCRequest(self.config.get("CHAIN_ENDPOINT"), self.config.get("FULL_PROPORTION"))
-        
-        return sdk_call.get_stake_from_hotkey(
-            subtensor_call_module,
-            total_hotkey_stake_call_function,
-            hotkey
+    def _rpc_request(self) -> RPCRequest:
+        """Create an RPC request helper on the shared connection for the configured endpoint."""
+        return RPCRequest(
+            self.config.get("CHAIN_ENDPOINT"),
+            self.config.get("FULL_PROPORTION"),
+            self.config.get("QUERY_CHUNK_SIZE", 1000)
         )
 
 # Example usage
 if __name__ == "__main__":
     config = {
         "FULL_PROPORTION": 18446744073709551615,
-        "SUBTENSORMODULE": '658faa385070e074c85bf6b568cf0555',
-        "PARENTKEYS_FUNCTION": 'de41ae13ae40a9d3c5fd9b3bdea86fe2',
-        "TOTALHOTKEYSTAKE_FUNCTION": '7b4e834c482cd6f103e108dacad0ab65',
         "CHAIN_ENDPOINT": "wss://entrypoint-finney.opentensor.ai:443",
         "DATABASE_DIR": "db"
     }
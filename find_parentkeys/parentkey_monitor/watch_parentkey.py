@@ -0,0 +1,268 @@
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from asgiref.sync import sync_to_async
+from django.db import connection
+from find_parentkeys.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+from find_parentkeys.utils.stake_graph import StakeGraph
+from find_parentkeys.utils.subnet_fetcher import SubnetFetchError
+from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor
+from find_parentkeys.database_manage.db_manage import DataBaseManager
+from find_parentkeys.database_manage.graph_sync import GraphSync
+from find_parentkeys.database_manage.graph_writer import GraphWriter
+from find_parentkeys.database_manage.copy_writer import CopyGraphWriter
+from validators.models import SnapshotModel, ChangeModel
+
+
+class ParentkeyWatcher:
+    """Keeps the database current from storage subscriptions instead of hourly polling.
+
+    After one full cycle the watcher subscribes to the ParentKeys and TotalHotkeyStake
+    keys it tracks and applies every change notification as a small delta. The
+    validator set and runtime version are re-checked every ``WATCH_REFRESH_INTERVAL``
+    seconds; when validators join or leave or the runtime is upgraded, the watcher runs
+    a full cycle again and resubscribes.
+
+    On PostgreSQL every write goes through the same ``CopyGraphWriter`` merge as the
+    monitor. On SQLite the watcher always updates the database in place with
+    ``GraphSync``, since rebuilding the file for every block is not practical, so
+    ``DB_REFRESH_MODE`` is not used.
+    """
+
+    def __init__(self, config: Dict) -> None:
+        """Initialize the watcher with the monitor configuration."""
+        self.config = config
+        self.monitor = ParentkeyMonitor(config)
+        self.sdk_call = RPCRequest(
+            config.get("CHAIN_ENDPOINT"),
+            config.get("FULL_PROPORTION"),
+            config.get("QUERY_CHUNK_SIZE", 1000)
+        )
+        self.db_manager = DataBaseManager()
+        writer = GraphWriter(config.get("DB_BATCH_SIZE", 1000), self.monitor.hotkey_index)
+        self.graph_sync = GraphSync(writer)
+        self.copy_writer: Optional[CopyGraphWriter] = None
+        if connection.vendor == "postgresql":
+            self.copy_writer = CopyGraphWriter(writer.batch_size, self.monitor.hotkey_index)
+        elif config.get("DB_REFRESH_MODE", "rebuild") != "incremental":
+            logging.info("The watcher updates the SQLite database in place; DB_REFRESH_MODE is not used")
+        self.snapshot: Optional[GraphSnapshot] = None
+        self.parent_keys: Dict[Tuple[str, int], Dict[str, float]] = {}
+        self.stake_keys: Dict[str, str] = {}
+        self.parent_keys_keys: Dict[str, Tuple[str, int]] = {}
+        self.validator_pairs: Set[Tuple[str, int]] = set()
+        self.subscriptions: List[str] = []
+        self.forwarders: List[asyncio.Task] = []
+
+    def run(self) -> None:
+        """Run the watcher until interrupted."""
+        self.db_manager.migrate_db()
+        asyncio.run(self.watch_async())
+
+    async def watch_async(self) -> None:
+        """Alternate between full resyncs and consuming storage change notifications."""
+        notifications: asyncio.Queue = asyncio.Queue()
+        while True:
+            try:
+                await self._resync()
+                await self._subscribe_tracked_keys(notifications)
+                await self._consume(notifications)
+            except ConnectionError as e:
+                logging.warning(f"Subscriptions lost, resyncing: {e}")
+                await asyncio.sleep(self.config.get("WATCH_RETRY_DELAY", 10))
+            except SubnetFetchError as e:
+                logging.error(f"Full resync failed, retrying: {e}")
+                await asyncio.sleep(self.config.get("WATCH_RETRY_DELAY", 10))
+            finally:
+                await self._unsubscribe_all()
+                notifications = asyncio.Queue()
+
+    async def _resync(self) -> None:
+        """Run a full cycle and rebuild the tracked key set from it."""
+        self.snapshot = await self.monitor.collect_parentkeys_async()
+        await sync_to_async(self._write)(self.snapshot, True)
+        await sync_to_async(self._record_changes)(self.snapshot)
+        await sync_to_async(self.db_manager.prune_history)((SnapshotModel, ChangeModel), self.monitor.history_since())
+        await asyncio.to_thread(self.monitor.archive_snapshot, self.snapshot)
+        self.parent_keys = {}
+        for (parent, child, net_uid), proportion in self.snapshot.edges.items():
+            self.parent_keys.setdefault((child, net_uid), {})[parent] = proportion
+
+        module, parent_keys_function = self.monitor.runtime.call_params("ParentKeys")
+        stake_module, stake_function = self.monitor.runtime.call_params("TotalHotkeyStake")
+        self.validator_pairs = set(self.monitor.parent_key_pairs(list(self.snapshot.validators), self.snapshot.net_uids))
+        tracked_children = self.validator_pairs | self.parent_keys.keys()
+        self.parent_keys_keys = {
+            self.sdk_call.parent_keys_storage_key(module, parent_keys_function, hotkey, net_uid): (hotkey, net_uid)
+            for hotkey, net_uid in tracked_children
+        }
+        self.stake_keys = {
+            self.sdk_call.stake_storage_key(stake_module, stake_function, hotkey): hotkey
+            for hotkey in self.snapshot.stakes
+        }
+        self.monitor.key_index.retain(set(self.monitor.registrations).union(self.snapshot.stakes))
+        self.monitor.key_index.save(self.monitor.key_index_path)
+        logging.info(f"Tracking {len(self.parent_keys_keys)} ParentKeys and {len(self.stake_keys)} stake keys")
+
+    async def _subscribe_tracked_keys(self, notifications: asyncio.Queue) -> None:
+        """Open storage subscriptions for every tracked key."""
+        await self._subscribe(list(self.parent_keys_keys) + list(self.stake_keys), notifications)
+
+    async def _subscribe(self, storage_keys: List[str], notifications: asyncio.Queue) -> None:
+        """Subscribe to storage keys in chunks and forward their notifications to one queue."""
+        chunk_size = self.config.get("WATCH_SUBSCRIPTION_CHUNK", 1000)
+        for i in range(0, len(storage_keys), chunk_size):
+            subscription_id = await self.sdk_call.client.subscribe(
+                "state_subscribeStorage", [storage_keys[i:i + chunk_size]]
+            )
+            self.subscriptions.append(subscription_id)
+            self.forwarders.append(asyncio.create_task(self._forward(subscription_id, notifications)))
+
+    async def _forward(self, subscription_id: str, notifications: asyncio.Queue) -> None:
+        """Move notifications of one subscription onto the shared queue."""
+        while True:
+            try:
+                notification = await self.sdk_call.client.next_notification(subscription_id)
+            except ConnectionError as e:
+                await notifications.put(e)
+                return
+            await notifications.put(notification)
+
+    async def _unsubscribe_all(self) -> None:
+        """Cancel the forwarders and close every open subscription."""
+        for forwarder in self.forwarders:
+            forwarder.cancel()
+        for subscription_id in self.subscriptions:
+            await self.sdk_call.client.unsubscribe("state_unsubscribeStorage", subscription_id)
+        self.forwarders = []
+        self.subscriptions = []
+
+    async def _consume(self, notifications: asyncio.Queue) -> None:
+        """Apply notifications until the validator set changes."""
+        refresh_interval = self.config.get("WATCH_REFRESH_INTERVAL", 600)
+        next_refresh = time.monotonic() + refresh_interval
+        while True:
+            try:
+                notification = await asyncio.wait_for(notifications.get(), max(next_refresh - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                if await self._validator_set_changed():
+                    return
+                next_refresh = time.monotonic() + refresh_interval
+                continue
+            if isinstance(notification, Exception):
+                raise notification
+            await self._apply_changes(notification["changes"], notification["block"], notifications)
+
+    async def _validator_set_changed(self) -> bool:
+        """Check for a runtime upgrade and for validators that joined, left or registered on other subnets."""
+        block_number, block_hash = await self.sdk_call.pin_block_async()
+        if await self.monitor.runtime.upgraded_async(self.sdk_call, block_hash):
+            logging.info("Runtime upgraded, re-resolving storage items")
+            return True
+        try:
+            validators, subnet_uids = await self.monitor.select_validators_async(
+                self.sdk_call, block_number, block_hash, asyncio.Semaphore(self.config.get("MAX_CONCURRENCY", 16))
+            )
+        except SubnetFetchError as e:
+            logging.warning(f"Skipped validator set check: {e}")
+            return False
+        hotkeys = set(validators.tolist())
+        if hotkeys != self.snapshot.validators or subnet_uids != self.snapshot.net_uids:
+            logging.info(f"Validator set changed: {len(hotkeys - self.snapshot.validators)} joined, "
+                         f"{len(self.snapshot.validators - hotkeys)} left")
+            return True
+        if set(self.monitor.parent_key_pairs(list(hotkeys), subnet_uids)) != self.validator_pairs:
+            logging.info("Validator registrations changed")
+            return True
+        return False
+
+    async def _apply_changes(
+        self, changes: List[List[Optional[str]]], block_hash: str, notifications: asyncio.Queue
+    ) -> None:
+        """Turn one storage change notification into a delta on the affected rows."""
+        stakes = dict(self.snapshot.stakes)
+        stakes_changed = edges_changed = False
+        for storage_key, value in changes:
+            if storage_key in self.stake_keys:
+                hotkey = self.stake_keys[storage_key]
+                if hotkey in stakes:
+                    stake = self.sdk_call.decode_stake(value)
+                    self.monitor.stake_cache.put(hotkey, block_hash, stake)
+                    stakes_changed = stakes_changed or stakes[hotkey] != stake
+                    stakes[hotkey] = stake
+            elif storage_key in self.parent_keys_keys:
+                hotkey, net_uid = self.parent_keys_keys[storage_key]
+                parents = {}
+                if value is not None:
+                    parents = {
+                        parent_key['hotkey']: parent_key['proportion']
+                        for parent_key in self.sdk_call.decode_parent_keys(value, net_uid)
+                    }
+                if self.parent_keys.get((hotkey, net_uid), {}) != parents:
+                    edges_changed = True
+                    if parents:
+                        self.parent_keys[(hotkey, net_uid)] = parents
+                    else:
+                        self.parent_keys.pop((hotkey, net_uid), None)
+
+        if not (stakes_changed or edges_changed):
+            return
+        block_number = await self.sdk_call.get_block_number_async(block_hash)
+        edges = self.snapshot.edges
+        if edges_changed:
+            edges = {
+                (parent, child, net_uid): proportion
+                for (child, net_uid), parents in self.parent_keys.items()
+                for parent, proportion in parents.items()
+            }
+            await self._track_hotkeys(stakes, edges, block_hash, notifications)
+
+        snapshot = GraphSnapshot(
+            stakes, edges, block_number, block_hash, self.snapshot.validators, self.snapshot.net_uids
+        )
+        await sync_to_async(self._write)(snapshot)
+        self.snapshot = snapshot
+        self.monitor.stake_graph = StakeGraph(snapshot)
+        await sync_to_async(self._record_changes)(snapshot)
+
+    def _write(self, snapshot: GraphSnapshot, resync: bool = False) -> None:
+        """Store a snapshot with the PostgreSQL merge, or as a delta against the stored graph on SQLite."""
+        if self.copy_writer is not None:
+            self.copy_writer.merge_snapshot(snapshot)
+        elif resync:
+            self.graph_sync.sync(snapshot)
+        else:
+            delta = self.graph_sync.update(snapshot)
+            logging.info(f"Applied changes at block {snapshot.block_number}: {delta}")
+
+    def _record_changes(self, snapshot: GraphSnapshot) -> None:
+        """Store the changes since the previous snapshot, if there are any."""
+        changes = self.monitor.change_detector.detect(snapshot)
+        if changes is not None and len(changes):
+            self.graph_sync.writer.record_changes(changes)
+            logging.info(f"Recorded changes at block {snapshot.block_hash}: {changes}")
+        self.monitor.change_detector.commit()
+
+    async def _track_hotkeys(
+        self, stakes: Dict[str, float], edges: Dict, block_hash: str, notifications: asyncio.Queue
+    ) -> None:
+        """Add stakes of new parents, drop hotkeys no longer referenced, and subscribe to new stake keys."""
+        required: Set[str] = set(self.snapshot.validators)
+        for parent, child, _ in edges:
+            required.add(parent)
+            required.add(child)
+        for hotkey in stakes.keys() - required:
+            del stakes[hotkey]
+
+        new_hotkeys = list(required - stakes.keys())
+        if not new_hotkeys:
+            return
+        stakes.update(await self.monitor.get_stakes_cached(
+            self.sdk_call, new_hotkeys, block_hash, asyncio.Semaphore(self.config.get("MAX_CONCURRENCY", 16))
+        ))
+        module, stake_function = self.monitor.runtime.call_params("TotalHotkeyStake")
+        new_keys = {self.sdk_call.stake_storage_key(module, stake_function, hotkey): hotkey for hotkey in new_hotkeys}
+        self.stake_keys.update(new_keys)
+        await self._subscribe(list(new_keys), notifications)
@@ -0,0 +1,87 @@
+import hashlib
+from functools import lru_cache
+from typing import Iterable, List, Union
+import base58
+import numpy as np
+
+SS58_PREFIX = b'SS58PRE'
+DEFAULT_SS58_FORMAT = 42
+ADDRESS_CACHE_SIZE = 65536
+
+
+def _ss58_format_bytes(ss58_format: int) -> bytes:
+    """Encode an SS58 address type as its one or two byte prefix."""
+    if ss58_format < 64:
+        return bytes([ss58_format])
+    if ss58_format < 16384:
+        return bytes([
+            ((ss58_format & 0b0000_0000_1111_1100) >> 2) | 0b0100_0000,
+            (ss58_format >> 8) | ((ss58_format & 0b0000_0000_0000_0011) << 6),
+        ])
+    raise ValueError(f"Invalid SS58 format {ss58_format}")
+
+
+def _checksum(payload: bytes) -> bytes:
+    """Return the two checksum bytes of an SS58 payload (address type + public key)."""
+    return hashlib.blake2b(SS58_PREFIX + payload, digest_size=64).digest()[:2]
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def ss58_encode(public_key: bytes, ss58_format: int = DEFAULT_SS58_FORMAT) -> str:
+    """Encode a 32-byte public key as an SS58 address."""
+    if len(public_key) != 32:
+        raise ValueError('Public key should be 32 bytes long')
+    payload = _ss58_format_bytes(ss58_format) + public_key
+    return base58.b58encode(payload + _checksum(payload)).decode()
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def ss58_decode(address: str) -> bytes:
+    """Decode an SS58 address into its 32-byte public key, verifying the checksum."""
+    data = base58.b58decode(address)
+    prefix_length = 1 if data[0] < 64 else 2
+    if len(data) != prefix_length + 32 + 2:
+        raise ValueError(f"Invalid SS58 address length: {address}")
+    payload, checksum = data[:-2], data[-2:]
+    if _checksum(payload) != checksum:
+        raise ValueError(f"Invalid SS58 checksum: {address}")
+    return payload[prefix_length:]
+
+
+def blake2_128concat(data: bytes) -> bytes:
+    """Hash data with the Blake2_128Concat storage hasher (16-byte digest followed by the data)."""
+    return hashlib.blake2b(data, digest_size=16).digest() + data
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def ss58_to_blake2_128concat(address: str) -> bytes:
+    """Return the Blake2_128Concat storage key fragment of an SS58 address."""
+    return blake2_128concat(ss58_decode(address))
+
+
+def hex_to_ss58(hex_string: str, ss58_format: int = DEFAULT_SS58_FORMAT) -> str:
+    """Encode the public key in the last 64 hex characters of a string as an SS58 address."""
+    return ss58_encode(bytes.fromhex(hex_string[-64:]), ss58_format)
+
+
+def ss58_to_hex(address: str) -> str:
+    """Return the public key of an SS58 address as hex without a ``0x`` prefix."""
+    return ss58_decode(address).hex()
+
+
+def ss58_encode_many(
+    public_keys: Union[np.ndarray, bytes, Iterable[bytes]], ss58_format: int = DEFAULT_SS58_FORMAT
+) -> List[str]:
+    """Encode many public keys, given as an (n, 32) uint8 array, concatenated bytes or byte strings."""
+    if isinstance(public_keys, np.ndarray):
+        public_keys = public_keys.tobytes()
+    if isinstance(public_keys, (bytes, bytearray, memoryview)):
+        data = bytes(public_keys)
+        return [ss58_encode(data[i:i + 32], ss58_format) for i in range(0, len(data), 32)]
+    return [ss58_encode(bytes(public_key), ss58_format) for public_key in public_keys]
+
+
+def ss58_decode_many(addresses: Iterable[str]) -> np.ndarray:
+    """Decode many SS58 addresses into an (n, 32) uint8 array of public keys."""
+    data = b''.join(ss58_decode(address) for address in addresses)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 32)
@@ -0,0 +1,126 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+from find_parentkeys.utils.graph_snapshot import EdgeKey, GraphSnapshot
+
+EDGE_ADDED = "edge_added"
+EDGE_REMOVED = "edge_removed"
+EDGE_CHANGED = "edge_changed"
+STAKE_CHANGED = "stake_changed"
+
+
+def fingerprint(items: Iterable[Tuple]) -> int:
+    """Hash a set of items independently of their order, in one pass."""
+    total = 0
+    for item in items:
+        total += int.from_bytes(hashlib.blake2b(repr(item).encode(), digest_size=8).digest(), 'little')
+    return total & 0xFFFFFFFFFFFFFFFF
+
+
+class ChangeSet:
+    """Relationship and stake changes between two cycles."""
+
+    def __init__(self, block_number: Optional[int] = None, block_hash: Optional[str] = None) -> None:
+        """Initialize an empty change set for the block the current cycle was read at."""
+        self.block_number = block_number
+        self.block_hash = block_hash
+        self.edges_added: Dict[EdgeKey, float] = {}
+        self.edges_removed: Dict[EdgeKey, float] = {}
+        self.edges_changed: Dict[EdgeKey, Tuple[float, float]] = {}
+        self.stakes_changed: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+
+    def rows(self) -> List[Tuple[str, str, Optional[str], Optional[int], Optional[float], Optional[float]]]:
+        """Flatten the change set into (kind, hotkey, child, netuid, old value, new value) rows."""
+        rows = []
+        for (parent, child, netuid), proportion in self.edges_added.items():
+            rows.append((EDGE_ADDED, parent, child, netuid, None, proportion))
+        for (parent, child, netuid), proportion in self.edges_removed.items():
+            rows.append((EDGE_REMOVED, parent, child, netuid, proportion, None))
+        for (parent, child, netuid), (old, new) in self.edges_changed.items():
+            rows.append((EDGE_CHANGED, parent, child, netuid, old, new))
+        for hotkey, (old, new) in self.stakes_changed.items():
+            rows.append((STAKE_CHANGED, hotkey, None, None, old, new))
+        return rows
+
+    def __len__(self) -> int:
+        """Return the number of changes."""
+        return len(self.edges_added) + len(self.edges_removed) + len(self.edges_changed) + len(self.stakes_changed)
+
+    def __str__(self) -> str:
+        """Summarize the change set as per-kind counts."""
+        return (f"edges +{len(self.edges_added)} -{len(self.edges_removed)} ~{len(self.edges_changed)}, "
+                f"stakes ~{len(self.stakes_changed)}")
+
+
+class ChangeDetector:
+    """Diffs each cycle's edges and stakes against the previous cycle and reports what changed.
+
+    The edge set and stake vector of every cycle are fingerprinted, so a part that did not
+    change at all is skipped without diffing. Stake changes are reported once a hotkey's
+    stake has moved more than ``stake_threshold`` TAO away from the last reported value,
+    so slow drift is reported once it adds up. The first cycle only sets the baseline.
+
+    ``detect`` does not move the baseline; ``commit`` does, once the change set has been
+    stored, so changes of a cycle whose write failed are reported again by the next one.
+    """
+
+    def __init__(self, stake_threshold: float = 1.0) -> None:
+        """
+        Initialize the detector.
+        :param stake_threshold: Minimum stake movement (in TAO) reported as a change.
+        """
+        self.stake_threshold = stake_threshold
+        self.edges: Optional[Dict[EdgeKey, float]] = None
+        self.reported_stakes: Dict[str, float] = {}
+        self.edge_hash: Optional[int] = None
+        self.stake_hash: Optional[int] = None
+        self._pending: Optional[Tuple[Dict[EdgeKey, float], Dict[str, float], int, int]] = None
+
+    def detect(self, snapshot: GraphSnapshot) -> Optional[ChangeSet]:
+        """Return the changes since the committed baseline, or None for the first cycle."""
+        edge_hash = fingerprint(snapshot.edges.items())
+        stake_hash = fingerprint(snapshot.stakes.items())
+        if self.edges is None:
+            self._pending = (dict(snapshot.edges), dict(snapshot.stakes), edge_hash, stake_hash)
+            return None
+
+        changes = ChangeSet(snapshot.block_number, snapshot.block_hash)
+        edges, reported_stakes = self.edges, self.reported_stakes
+        if edge_hash != self.edge_hash:
+            self._diff_edges(self.edges, snapshot.edges, changes)
+            edges = dict(snapshot.edges)
+        if stake_hash != self.stake_hash:
+            reported_stakes = dict(self.reported_stakes)
+            self._diff_stakes(reported_stakes, snapshot.stakes, changes)
+        self._pending = (edges, reported_stakes, edge_hash, stake_hash)
+        return changes
+
+    def commit(self) -> None:
+        """Make the state seen by the last ``detect`` the baseline of the next one."""
+        if self._pending is None:
+            return
+        if self.edges is None:
+            logging.info("Recorded change detection baseline")
+        self.edges, self.reported_stakes, self.edge_hash, self.stake_hash = self._pending
+        self._pending = None
+
+    def _diff_edges(self, previous: Dict[EdgeKey, float], current: Dict[EdgeKey, float], changes: ChangeSet) -> None:
+        """Record edges that appeared, disappeared or changed proportion."""
+        for edge, proportion in current.items():
+            old = previous.get(edge)
+            if old is None:
+                changes.edges_added[edge] = proportion
+            elif old != proportion:
+                changes.edges_changed[edge] = (old, proportion)
+        for edge in previous.keys() - current.keys():
+            changes.edges_removed[edge] = previous[edge]
+
+    def _diff_stakes(self, reported: Dict[str, float], current: Dict[str, float], changes: ChangeSet) -> None:
+        """Record hotkeys that appeared, disappeared or moved beyond the threshold, and rebase them in ``reported``."""
+        for hotkey, stake in current.items():
+            old = reported.get(hotkey)
+            if old is None or abs(stake - old) > self.stake_threshold:
+                changes.stakes_changed[hotkey] = (old, stake)
+                reported[hotkey] = stake
+        for hotkey in reported.keys() - current.keys():
+            changes.stakes_changed[hotkey] = (reported.pop(hotkey), None)
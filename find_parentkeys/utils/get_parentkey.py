@@ -1,120 +1,176 @@
-import json
-import hashlib
 import asyncio
-import websockets
+import numpy as np
 from dotenv import load_dotenv
-from substrateinterface import Keypair
-from substrateinterface.utils.ss58 import ss58_encode, ss58_decode
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+from find_parentkeys.utils.rpc_client import get_rpc_client
+from find_parentkeys.utils.scale_decode import decode_parent_keys_many
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.storage_keys import get_storage_key_index
 
 load_dotenv()
 
+
 class RPCRequest:
-    """Handles RPC requests and address conversions."""
+    """Builds storage keys and reads and decodes the storage the monitor needs over RPC."""
 
-    def __init__(self, chain_endpoint: str, full_proportion: int) -> None:
-        """Initialize with chain endpoint and full proportion."""
+    def __init__(self, chain_endpoint: str, full_proportion: int, query_chunk_size: int = 1000) -> None:
+        """Initialize with chain endpoint, full proportion and keys per bulk storage query."""
         self.chain_endpoint = chain_endpoint
         self.full_proportion = full_proportion
+        self.query_chunk_size = query_chunk_size
+        self.client = get_rpc_client(chain_endpoint)
+        self.key_index = get_storage_key_index()
+
+    def parent_keys_storage_key(self, call_module: str, call_function: str, hotkey: str, net_uid: int) -> str:
+        """Build the ParentKeys storage key for a hotkey on a subnet."""
+        return self.key_index.double_map_key('0x' + call_module + call_function, hotkey, net_uid)
+
+    def stake_storage_key(self, call_module: str, call_function: str, hotkey: str) -> str:
+        """Build the TotalHotkeyStake storage key for a hotkey."""
+        return self.key_index.map_key('0x' + call_module + call_function, hotkey)
+
+    @staticmethod
+    async def _limited(coro, semaphore: Optional[asyncio.Semaphore]):
+        """Await a coroutine, holding the semaphore if one is given."""
+        if semaphore is None:
+            return await coro
+        async with semaphore:
+            return await coro
+
+    async def query_storage_at_async(
+        self, storage_keys: List[str], block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, Optional[str]]:
+        """Read many storage keys with chunked ``state_queryStorageAt`` calls sent concurrently."""
+        requests = []
+        for i in range(0, len(storage_keys), self.query_chunk_size):
+            chunk = storage_keys[i:i + self.query_chunk_size]
+            params = [chunk] if block_hash is None else [chunk, block_hash]
+            requests.append(self._limited(self.client.request("state_queryStorageAt", params), semaphore))
+        values: Dict[str, Optional[str]] = {}
+        for result in await asyncio.gather(*requests):
+            for change_set in result:
+                for key, value in change_set["changes"]:
+                    values[key] = value
+        return values
+
+    def query_storage_at(self, storage_keys: List[str], block_hash: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """Read many storage keys in bulk (blocking)."""
+        return self.client.run(self.query_storage_at_async(storage_keys, block_hash))
+
+    async def pin_block_async(self) -> Tuple[int, str]:
+        """Return the number and hash of the latest finalized block."""
+        block_hash = await self.client.request("chain_getFinalizedHead", [])
+        return await self.get_block_number_async(block_hash), block_hash
+
+    async def get_block_number_async(self, block_hash: str) -> int:
+        """Return the number of the block with the given hash."""
+        header = await self.client.request("chain_getHeader", [block_hash])
+        return int(header["number"], 16)
+
+    def pin_block(self) -> Tuple[int, str]:
+        """Return the number and hash of the latest finalized block (blocking)."""
+        return self.client.run(self.pin_block_async())
 
-    def convert_ss58_to_hex(self, ss58_address: str) -> str:
-        """Convert SS58 address to hex format."""
-        address_bytes = ss58_decode(ss58_address)
-        if isinstance(address_bytes, str):
-            address_bytes = bytes.fromhex(address_bytes)
-        return address_bytes.hex()
-
-    def convert_hex_to_ss58(self, hex_string: str, ss58_format: int = 42) -> str:
-        """Convert hex string to SS58 address."""
-        public_key_hex = hex_string[-64:]
-        public_key = bytes.fromhex(public_key_hex)
-        if len(public_key) != 32:
-            raise ValueError('Public key should be 32 bytes long')
-        keypair = Keypair(public_key=public_key, ss58_format=ss58_format)
-        return keypair.ss58_address
-
-    def ss58_to_blake2_128concat(self, ss58_address: str) -> bytes:
-        """Convert SS58 address to Blake2b hash with original account ID."""
-        keypair = Keypair(ss58_address=ss58_address)
-        account_id = keypair.public_key
-        blake2b_hash = hashlib.blake2b(account_id, digest_size=16)
-        return blake2b_hash.digest() + account_id
-
-    def decimal_to_hex(self, decimal_num: int) -> str:
-        """Convert decimal number to hexadecimal string."""
-        return hex(decimal_num)[2:].zfill(4) + '00'  # Ensure 4 digits
-
-    async def call_rpc(self, call_params: List[str]) -> List[Dict]:
-        """Call the RPC and return the results."""
-        async with websockets.connect(self.chain_endpoint, ping_interval=None) as ws:
-            await ws.send(json.dumps({
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "state_subscribeStorage",
-                'params': [call_params],
-            }))
-            await ws.recv()  # Ignore confirmation response
-            response = await ws.recv()
-            changes = json.loads(response)["params"]["result"]["changes"]
-            return changes
-
-    def reverse_hex(self, hex_string: str) -> str:
-        """Reverse a hexadecimal string."""
-        if len(hex_string) != 16:
-            raise ValueError("Input must be a 16-character hexadecimal string.")
-        return '0x' + ''.join(reversed([hex_string[i:i + 2] for i in range(0, len(hex_string), 2)]))
-
-    def hex_to_decimal(self, hex_str: str) -> int:
-        """Convert hexadecimal string to decimal number."""
-        return int(hex_str, 16)
-
-    def extract_net_uid(self, net_uid_info: str) -> int:
-        """Extract net UID from the given information."""
-        return self.hex_to_decimal(net_uid_info[-4:-2])
-
-    def get_num_results(self, results: str) -> int:
-        """Get the number of results from the hex string."""
-        num_results = self.hex_to_decimal(results[:4])
-        return num_results // 4
-
-    def get_parent_keys(self, call_module: str, call_function: str, hotkey: str, net_uids: List[int]) -> List[Dict]:
-        """Retrieve parent keys for a given hotkey."""
-        call_params = []
-        blake2_128concat = self.ss58_to_blake2_128concat(hotkey).hex()
-        for net_uid in net_uids:
-            net_uid_hex = self.decimal_to_hex(net_uid)
-            call_hex = '0x' + call_module + call_function + blake2_128concat + net_uid_hex
-            call_params.append(call_hex)
-        call_results = asyncio.run(self.call_rpc(call_params))
-        return self._parse_parent_keys(call_results)
-
-    def _parse_parent_keys(self, call_results: List[Dict]) -> List[Dict]:
-        """Parse parent keys from the call results."""
-        parent_keys = []
-        for call_result in call_results:
-            if call_result[1] is not None:
-                net_uid = self.extract_net_uid(call_result[0])
-                parent_hex = call_result[1]
-                parent_hotkey_hexs = [parent_hex[i:i + 80] for i in range(4, len(parent_hex), 80)]
-                for parent_hotkey_hex in parent_hotkey_hexs:
-                    parent_hotkey = self.convert_hex_to_ss58(parent_hotkey_hex)
-                    parent_proportion_decimal = self.hex_to_decimal(self.reverse_hex(parent_hotkey_hex[:16]))
-                    parent_proportion = round(parent_proportion_decimal / self.full_proportion, 4)
-                    parent_keys.append({
-                        'hotkey': parent_hotkey,
-                        'proportion': parent_proportion,
-                        'net_uid': net_uid,
-                    })
+    async def get_runtime_version_async(self, block_hash: Optional[str] = None) -> Dict:
+        """Return the runtime version (``specVersion``, ``specName``, ...) at a block."""
+        return await self.client.request("state_getRuntimeVersion", [] if block_hash is None else [block_hash])
+
+    async def get_metadata_async(self, block_hash: Optional[str] = None) -> str:
+        """Return the SCALE encoded runtime metadata at a block, as hex."""
+        return await self.client.request("state_getMetadata", [] if block_hash is None else [block_hash])
+
+    async def get_keys_paged_async(
+        self, prefix: str, page_size: int = 1000, block_hash: Optional[str] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[str]:
+        """Page through every storage key under a prefix with ``state_getKeysPaged``."""
+        keys: List[str] = []
+        start_key = None
+        while True:
+            page = await self._limited(
+                self.client.request("state_getKeysPaged", [prefix, page_size, start_key, block_hash]), semaphore
+            )
+            keys.extend(page)
+            if len(page) < page_size:
+                return keys
+            start_key = page[-1]
+
+    def get_keys_paged(self, prefix: str, page_size: int = 1000, block_hash: Optional[str] = None) -> List[str]:
+        """Page through every storage key under a prefix (blocking)."""
+        return self.client.run(self.get_keys_paged_async(prefix, page_size, block_hash))
+
+    async def get_parent_keys_pairs_async(
+        self, call_module: str, call_function: str, pairs: List[Tuple[str, int]],
+        block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[Tuple[str, int], List[Dict]]:
+        """Retrieve parent keys for specific (child hotkey, net UID) pairs."""
+        storage_keys = [
+            self.parent_keys_storage_key(call_module, call_function, hotkey, net_uid) for hotkey, net_uid in pairs
+        ]
+        values = await self.query_storage_at_async(storage_keys, block_hash, semaphore)
+        lookup = self.key_index.lookup
+        return self.decode_parent_keys_values({
+            lookup(storage_key): parent_hex
+            for storage_key, parent_hex in values.items()
+            if parent_hex is not None and lookup(storage_key) is not None
+        })
+
+    async def get_all_parent_keys_async(
+        self, call_module: str, call_function: str, page_size: int = 1000,
+        block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[Tuple[str, int], List[Dict]]:
+        """Sweep the whole ParentKeys map, keyed by (child hotkey, net UID)."""
+        prefix = '0x' + call_module + call_function
+        storage_keys = await self.get_keys_paged_async(prefix, page_size, block_hash, semaphore)
+        values = await self.query_storage_at_async(storage_keys, block_hash, semaphore)
+        decode_key = self.key_index.decode_double_map_key
+        return self.decode_parent_keys_values({
+            decode_key(prefix, storage_key): parent_hex
+            for storage_key, parent_hex in values.items()
+            if parent_hex is not None
+        })
+
+    def decode_parent_keys(self, parent_hex: str, net_uid: int) -> List[Dict]:
+        """Decode a ParentKeys storage value into (hotkey, proportion) entries."""
+        return self.decode_parent_keys_values({(None, net_uid): parent_hex})[(None, net_uid)]
+
+    def decode_parent_keys_values(
+        self, parent_hexs: Dict[Tuple[str, int], str]
+    ) -> Dict[Tuple[str, int], List[Dict]]:
+        """Decode many ParentKeys storage values keyed by (child hotkey, net UID) in one pass."""
+        records, counts = decode_parent_keys_many(parent_hexs.values())
+        proportions = np.round(records['proportion'] / np.float64(self.full_proportion), 4).tolist()
+        hotkeys = address_codec.ss58_encode_many(records['account'])
+        parent_keys: Dict[Tuple[str, int], List[Dict]] = {}
+        start = 0
+        for (hotkey, net_uid), count in zip(parent_hexs, counts.tolist()):
+            parent_keys[(hotkey, net_uid)] = [
+                {
+                    'hotkey': hotkeys[i],
+                    'proportion': proportions[i],
+                    'net_uid': net_uid,
+                }
+                for i in range(start, start + count)
+            ]
+            start += count
         return parent_keys
 
-    def get_stake_from_hotkey(self, call_module: str, call_function: str, hotkey: str) -> float:
-        """Retrieve stake for the given hotkey."""
-        hex_address = self.convert_ss58_to_hex(hotkey)
-        call_hex = '0x' + call_module + call_function + hex_address
-        call_params = [call_hex]
-        call_results = asyncio.run(self.call_rpc(call_params))
-        if call_results[0][1] is not None:
-            stake_hex = call_results[0][1][2:]
-            stake = self.hex_to_decimal(self.reverse_hex(stake_hex))
-            return round(stake / 1e9, 4)
-        return 0.0
+    async def get_stakes_bulk_async(
+        self, call_module: str, call_function: str, hotkeys: List[str],
+        block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, float]:
+        """Retrieve stakes for many hotkeys in chunked bulk queries."""
+        storage_keys = [self.stake_storage_key(call_module, call_function, hotkey) for hotkey in hotkeys]
+        values = await self.query_storage_at_async(storage_keys, block_hash, semaphore)
+        return {
+            hotkey: self.decode_stake(values.get(storage_key)) for hotkey, storage_key in zip(hotkeys, storage_keys)
+        }
+
+    def decode_stake(self, stake_value: Optional[str]) -> float:
+        """Decode a TotalHotkeyStake storage value into TAO."""
+        if stake_value is None:
+            return 0.0
+        if len(stake_value) != 18:
+            raise ValueError(f"TotalHotkeyStake value should be a u64: {stake_value}")
+        stake = int.from_bytes(bytes.fromhex(stake_value[2:]), 'little')
+        return round(stake / 1e9, 4)
@@ -0,0 +1,28 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+EdgeKey = Tuple[str, str, int]  # (parent hotkey, child hotkey, netuid)
+
+
+class GraphSnapshot:
+    """Hotkey stakes and parent/child edges of one monitoring cycle."""
+
+    def __init__(
+        self, stakes: Dict[str, float] = None, edges: Dict[EdgeKey, float] = None,
+        block_number: Optional[int] = None, block_hash: Optional[str] = None,
+        validators: Set[str] = None, net_uids: List[int] = None
+    ) -> None:
+        """
+        Initialize the snapshot.
+        :param stakes: Stake per hotkey.
+        :param edges: Proportion per (parent hotkey, child hotkey, netuid) edge.
+        :param block_number: Number of the block every read of the cycle was pinned to.
+        :param block_hash: Hash of that block.
+        :param validators: Hotkeys selected from the metagraph in the cycle.
+        :param net_uids: Monitored subnets.
+        """
+        self.stakes = stakes if stakes is not None else {}
+        self.edges = edges if edges is not None else {}
+        self.block_number = block_number
+        self.block_hash = block_hash
+        self.validators = validators if validators is not None else set()
+        self.net_uids = net_uids if net_uids is not None else []
@@ -0,0 +1,104 @@
+import asyncio
+import numpy as np
+from typing import List, Optional
+from find_parentkeys.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.runtime_metadata import RuntimeResolver
+from find_parentkeys.utils.storage_keys import u16_key
+from find_parentkeys.utils import address_codec
+
+
+class LiteMetagraph:
+    """The columns of a subnet metagraph the monitor reads, as NumPy arrays."""
+
+    def __init__(
+        self, netuid: int, uids: np.ndarray, hotkeys: np.ndarray, stakes: np.ndarray,
+        coldkeys: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Initialize the metagraph columns.
+        :param netuid: Subnet the neurons are registered on.
+        :param uids: Neuron UIDs (int64).
+        :param hotkeys: SS58 hotkey of each UID.
+        :param stakes: Total stake of each hotkey in TAO (float64).
+        :param coldkeys: SS58 coldkey owning each hotkey, if it was loaded.
+        """
+        self.netuid = netuid
+        self.uids = uids
+        self.hotkeys = hotkeys
+        self.stakes = stakes
+        self.coldkeys = coldkeys
+
+    def __len__(self) -> int:
+        """Return the number of neurons."""
+        return len(self.uids)
+
+
+class MetagraphLoader:
+    """Loads UIDs, hotkeys, stakes and optionally coldkeys of subnets with direct storage reads.
+
+    ``subtensor.metagraph`` builds the whole metagraph (weights, bonds, axons, ...) only for
+    the monitor to read three columns; this reads just ``SubnetworkN``, ``Keys``,
+    ``TotalHotkeyStake`` and ``Owner`` with bulk ``state_queryStorageAt`` calls. Their key
+    prefixes come from the runtime resolver, which must be resolved before loading.
+    """
+
+    def __init__(self, sdk_call: RPCRequest, runtime: RuntimeResolver) -> None:
+        """Initialize the loader on an RPC request helper and the resolved storage items."""
+        self.sdk_call = sdk_call
+        self.runtime = runtime
+
+    async def get_subnets_async(
+        self, block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[int]:
+        """Return the net UIDs of all existing subnets."""
+        prefix = self.runtime.prefix("NetworksAdded")
+        keys = await self.sdk_call.get_keys_paged_async(prefix, 1000, block_hash, semaphore)
+        return sorted(int.from_bytes(bytes.fromhex(key[-4:]), 'little') for key in keys)
+
+    def get_subnets(self, block_hash: Optional[str] = None) -> List[int]:
+        """Return the net UIDs of all existing subnets (blocking)."""
+        return self.sdk_call.client.run(self.get_subnets_async(block_hash))
+
+    async def load_async(
+        self, netuid: int, block_hash: Optional[str] = None, semaphore: Optional[asyncio.Semaphore] = None,
+        coldkeys: bool = False
+    ) -> LiteMetagraph:
+        """Load the neurons of one subnet."""
+        size_key = self.runtime.prefix("SubnetworkN") + u16_key(netuid)
+        size_value = (await self.sdk_call.query_storage_at_async([size_key], block_hash, semaphore)).get(size_key)
+        size = int.from_bytes(bytes.fromhex(size_value[2:]), 'little') if size_value else 0
+
+        keys_prefix = self.runtime.prefix("Keys") + u16_key(netuid)
+        hotkey_keys = [keys_prefix + u16_key(uid) for uid in range(size)]
+        values = await self.sdk_call.query_storage_at_async(hotkey_keys, block_hash, semaphore)
+        uids = np.array([uid for uid, key in enumerate(hotkey_keys) if values.get(key)], dtype=np.int64)
+        public_keys = bytes.fromhex(''.join(values[hotkey_keys[uid]][2:] for uid in uids.tolist()))
+        hotkeys = np.array(address_codec.ss58_encode_many(public_keys), dtype=object)
+
+        stakes = await self.sdk_call.get_stakes_bulk_async(
+            *self.runtime.call_params("TotalHotkeyStake"), hotkeys.tolist(), block_hash, semaphore
+        )
+        metagraph = LiteMetagraph(
+            netuid, uids, hotkeys, np.array([stakes[hotkey] for hotkey in hotkeys.tolist()], dtype=np.float64)
+        )
+        if coldkeys:
+            metagraph.coldkeys = await self._load_coldkeys(public_keys, block_hash, semaphore)
+        return metagraph
+
+    def load(self, netuid: int, block_hash: Optional[str] = None, coldkeys: bool = False) -> LiteMetagraph:
+        """Load the neurons of one subnet (blocking)."""
+        return self.sdk_call.client.run(self.load_async(netuid, block_hash, coldkeys=coldkeys))
+
+    async def _load_coldkeys(
+        self, public_keys: bytes, block_hash: Optional[str], semaphore: Optional[asyncio.Semaphore]
+    ) -> np.ndarray:
+        """Read the owning coldkey of each hotkey public key."""
+        owner_prefix = self.runtime.prefix("Owner")
+        owner_keys = [
+            owner_prefix + address_codec.blake2_128concat(public_keys[i:i + 32]).hex()
+            for i in range(0, len(public_keys), 32)
+        ]
+        values = await self.sdk_call.query_storage_at_async(owner_keys, block_hash, semaphore)
+        return np.array([
+            address_codec.hex_to_ss58(values[key]) if values.get(key) else None for key in owner_keys
+        ], dtype=object)
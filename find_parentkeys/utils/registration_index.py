@@ -0,0 +1,47 @@
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class RegistrationIndex:
+    """In-process hotkey -> registered net UIDs map, filled from the metagraph stage of a cycle."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._netuids: Dict[str, List[int]] = {}
+
+    def add(self, netuid: int, hotkeys: np.ndarray) -> None:
+        """Record the hotkeys registered on a subnet."""
+        for hotkey in hotkeys.tolist() if isinstance(hotkeys, np.ndarray) else hotkeys:
+            self._netuids.setdefault(hotkey, []).append(netuid)
+
+    def netuids(self, hotkey: str) -> List[int]:
+        """Return the subnets a hotkey is registered on."""
+        return self._netuids.get(hotkey, [])
+
+    def pairs(self, hotkeys: Iterable[str], net_uids: List[int]) -> List[Tuple[str, int]]:
+        """Return the (hotkey, net UID) pairs to query, limited to subnets each hotkey is registered on.
+
+        Hotkeys the index knows nothing about keep every net UID, so a missing metagraph
+        never hides parent keys.
+        """
+        monitored = set(net_uids)
+        pairs: List[Tuple[str, int]] = []
+        for hotkey in hotkeys:
+            registered = self._netuids.get(hotkey)
+            if registered is None:
+                pairs.extend((hotkey, net_uid) for net_uid in net_uids)
+            else:
+                pairs.extend((hotkey, net_uid) for net_uid in registered if net_uid in monitored)
+        return pairs
+
+    def __contains__(self, hotkey: str) -> bool:
+        """Check whether the hotkey is registered on any indexed subnet."""
+        return hotkey in self._netuids
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the indexed hotkeys."""
+        return iter(self._netuids)
+
+    def __len__(self) -> int:
+        """Return the number of indexed hotkeys."""
+        return len(self._netuids)
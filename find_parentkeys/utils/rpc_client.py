@@ -0,0 +1,203 @@
+import json
+import asyncio
+import logging
+import threading
+import itertools
+import websockets
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RPCError(Exception):
+    """Raised when the node answers a JSON-RPC request with an error object."""
+
+
+class RPCClient:
+    """Persistent JSON-RPC client multiplexing many requests over one WebSocket.
+
+    The connection lives on a dedicated event loop running in a background thread,
+    so it survives across ``asyncio.run`` calls and across monitoring cycles. Every
+    request gets its own id and responses are matched back to their callers by id,
+    which lets any number of requests be in flight on the same connection.
+    """
+
+    def __init__(self, endpoint: str, request_timeout: float = 60.0, max_size: Optional[int] = None) -> None:
+        """Initialize the client and start its event loop thread."""
+        self.endpoint = endpoint
+        self.request_timeout = request_timeout
+        self.max_size = max_size
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._subscriptions: Dict[str, asyncio.Queue] = {}
+        self._orphan_notifications: Dict[str, List[Any]] = {}
+        self._ws = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name=f"rpc-client-{endpoint}", daemon=True)
+        self._thread.start()
+
+    # Connection handling (runs on the client loop)
+
+    async def _ensure_connected(self):
+        """Open the WebSocket connection if it is not already open."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._ws is None:
+                self._ws = await websockets.connect(self.endpoint, ping_interval=None, max_size=self.max_size)
+                self._loop.create_task(self._read_loop(self._ws))
+                logging.info(f"Opened RPC connection to {self.endpoint}")
+            return self._ws
+
+    async def _read_loop(self, ws) -> None:
+        """Dispatch incoming messages to pending requests and subscriptions."""
+        error: Exception = ConnectionError(f"RPC connection to {self.endpoint} closed")
+        try:
+            async for message in ws:
+                payload = json.loads(message)
+                for item in payload if isinstance(payload, list) else [payload]:
+                    self._dispatch(item)
+        except Exception as e:
+            logging.warning(f"RPC connection to {self.endpoint} lost: {e}")
+            error = ConnectionError(f"RPC connection to {self.endpoint} lost: {e}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            for queue in self._subscriptions.values():
+                queue.put_nowait(error)
+            self._subscriptions.clear()
+            self._orphan_notifications.clear()
+
+    def _dispatch(self, item: Dict) -> None:
+        """Route a single JSON-RPC message by request id or subscription id."""
+        request_id = item.get("id")
+        if request_id is not None:
+            future = self._pending.get(request_id)
+            if future is None or future.done():
+                return
+            if "error" in item:
+                future.set_exception(RPCError(item["error"]))
+            else:
+                future.set_result(item.get("result"))
+            return
+        params = item.get("params")
+        if not isinstance(params, dict) or "subscription" not in params:
+            return
+        subscription_id = params["subscription"]
+        queue = self._subscriptions.get(subscription_id)
+        if queue is not None:
+            queue.put_nowait(params.get("result"))
+        else:
+            # The notification raced ahead of the subscribe response; keep it until the
+            # subscriber registers its queue.
+            self._orphan_notifications.setdefault(subscription_id, []).append(params.get("result"))
+
+    async def _request(self, method: str, params: List) -> Any:
+        """Send one request and wait for the response carrying its id."""
+        ws = await self._ensure_connected()
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        try:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _batch(self, calls: List[Tuple[str, List]]) -> List[Any]:
+        """Send many requests at once and return their results in call order."""
+        return await asyncio.gather(*(self._request(method, params) for method, params in calls))
+
+    async def _subscribe(self, method: str, params: List) -> str:
+        """Open a subscription and register a queue for its notifications."""
+        subscription_id = await self._request(method, params)
+        queue: asyncio.Queue = asyncio.Queue()
+        for notification in self._orphan_notifications.pop(subscription_id, []):
+            queue.put_nowait(notification)
+        self._subscriptions[subscription_id] = queue
+        return subscription_id
+
+    async def _next_notification(self, subscription_id: str, timeout: Optional[float] = None) -> Any:
+        """Wait for the next notification of a subscription."""
+        queue = self._subscriptions.get(subscription_id)
+        if queue is None:
+            raise ConnectionError(f"Subscription {subscription_id} is closed")
+        notification = await asyncio.wait_for(queue.get(), timeout)
+        if isinstance(notification, Exception):
+            raise notification
+        return notification
+
+    async def _unsubscribe(self, method: str, subscription_id: str) -> None:
+        """Close a subscription, ignoring errors from an already closed one."""
+        self._subscriptions.pop(subscription_id, None)
+        self._orphan_notifications.pop(subscription_id, None)
+        try:
+            await self._request(method, [subscription_id])
+        except (RPCError, ConnectionError, asyncio.TimeoutError) as e:
+            logging.debug(f"Failed to unsubscribe {subscription_id}: {e}")
+
+    # Public API (safe to call from any thread or event loop)
+
+    def run(self, coro) -> Any:
+        """Run a coroutine on the client loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def run_async(self, coro) -> Any:
+        """Run a coroutine on the client loop and await it from the caller's loop."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    async def request(self, method: str, params: List) -> Any:
+        """Await a single JSON-RPC request."""
+        return await self.run_async(self._request(method, params))
+
+    async def batch(self, calls: List[Tuple[str, List]]) -> List[Any]:
+        """Await many JSON-RPC requests sent concurrently over the connection."""
+        return await self.run_async(self._batch(calls))
+
+    async def subscribe(self, method: str, params: List) -> str:
+        """Open a long-lived subscription and return its id."""
+        return await self.run_async(self._subscribe(method, params))
+
+    async def next_notification(self, subscription_id: str, timeout: Optional[float] = None) -> Any:
+        """Await the next notification of a subscription.
+
+        Raises ConnectionError once the connection is lost; the subscription is gone
+        at that point and has to be opened again.
+        """
+        return await self.run_async(self._next_notification(subscription_id, timeout))
+
+    async def unsubscribe(self, method: str, subscription_id: str) -> None:
+        """Close a subscription opened with ``subscribe``."""
+        await self.run_async(self._unsubscribe(method, subscription_id))
+
+    def call(self, method: str, params: List) -> Any:
+        """Send a single JSON-RPC request and block for its result."""
+        return self.run(self._request(method, params))
+
+    def call_batch(self, calls: List[Tuple[str, List]]) -> List[Any]:
+        """Send many JSON-RPC requests concurrently and block for their results."""
+        return self.run(self._batch(calls))
+
+    def close(self) -> None:
+        """Close the connection; the next request reconnects."""
+        async def _close():
+            if self._ws is not None:
+                await self._ws.close()
+        self.run(_close())
+
+
+_clients: Dict[str, RPCClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_rpc_client(endpoint: str) -> RPCClient:
+    """Return the shared client for an endpoint, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            client = RPCClient(endpoint)
+            _clients[endpoint] = client
+        return client
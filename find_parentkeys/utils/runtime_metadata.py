@@ -0,0 +1,152 @@
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+from find_parentkeys.utils.storage_keys import twox128
+
+# Storage items read by the monitor and the metagraph loader:
+# name -> (pallet, storage item, key hashers the key builders use, value type the decoders expect)
+STORAGE_ITEMS: Dict[str, Tuple[str, str, List[str], str]] = {
+    "ParentKeys": ("SubtensorModule", "ParentKeys", ["Blake2_128Concat", "Identity"], "Vec<(u64, AccountId32)>"),
+    "TotalHotkeyStake": ("SubtensorModule", "TotalHotkeyStake", ["Identity"], "u64"),
+    "NetworksAdded": ("SubtensorModule", "NetworksAdded", ["Identity"], "bool"),
+    "SubnetworkN": ("SubtensorModule", "SubnetworkN", ["Identity"], "u16"),
+    "Keys": ("SubtensorModule", "Keys", ["Identity", "Identity"], "AccountId32"),
+    "Owner": ("SubtensorModule", "Owner", ["Blake2_128Concat"], "AccountId32"),
+}
+
+
+class RuntimeResolver:
+    """Resolves storage prefixes from runtime metadata and checks their layout, cached per spec version.
+
+    Resolved items are kept in a JSON file keyed by ``specVersion``, so the metadata is only
+    downloaded and decoded the first time a runtime version is seen. ``resolve_async`` checks
+    the spec version of the given block and re-resolves after a runtime upgrade. An item whose
+    key hashers or value type differ from what the key builders and decoders assume is an error.
+    """
+
+    def __init__(
+        self, cache_path: str, storage_items: Optional[Dict[str, Tuple[str, str, List[str], str]]] = None
+    ) -> None:
+        """
+        Initialize the resolver.
+        :param cache_path: JSON file the resolved items are cached in, keyed by spec version.
+        :param storage_items: Items to resolve as name -> (pallet, storage item, expected hashers, expected value type).
+        """
+        self.cache_path = cache_path
+        self.storage_items = storage_items or STORAGE_ITEMS
+        self.spec_version: Optional[int] = None
+        self.items: Dict[str, Dict] = {}
+
+    async def resolve_async(self, sdk_call, block_hash: Optional[str] = None) -> bool:
+        """Resolve the storage items for the runtime at a block; return True if the runtime changed."""
+        runtime_version = await sdk_call.get_runtime_version_async(block_hash)
+        spec_version = runtime_version["specVersion"]
+        if spec_version == self.spec_version:
+            return False
+        if self.spec_version is not None:
+            logging.info(f"Runtime upgraded from spec version {self.spec_version} to {spec_version}")
+
+        cache = self._load_cache()
+        items = cache.get(str(spec_version))
+        if items is None or items.keys() != self.storage_items.keys():
+            logging.info(f"Resolving storage items from the metadata of spec version {spec_version}")
+            items = self.decode_metadata(await sdk_call.get_metadata_async(block_hash))
+            cache[str(spec_version)] = items
+            self._save_cache(cache)
+        self.spec_version = spec_version
+        self.items = items
+        return True
+
+    def resolve(self, sdk_call, block_hash: Optional[str] = None) -> bool:
+        """Resolve the storage items for the runtime at a block (blocking)."""
+        return sdk_call.client.run(self.resolve_async(sdk_call, block_hash))
+
+    async def upgraded_async(self, sdk_call, block_hash: Optional[str] = None) -> bool:
+        """Check whether the runtime at a block differs from the resolved one, without re-resolving."""
+        runtime_version = await sdk_call.get_runtime_version_async(block_hash)
+        return runtime_version["specVersion"] != self.spec_version
+
+    def call_params(self, name: str) -> Tuple[str, str]:
+        """Return the (pallet prefix, storage item prefix) hex of a resolved storage item."""
+        item = self.items[name]
+        return item["module"], item["function"]
+
+    def prefix(self, name: str) -> str:
+        """Return the ``0x`` prefixed key prefix of a resolved storage item."""
+        module, function = self.call_params(name)
+        return '0x' + module + function
+
+    def decode_metadata(self, metadata_hex: str) -> Dict[str, Dict]:
+        """Decode V14+ runtime metadata and resolve every storage item from it."""
+        from scalecodec.base import RuntimeConfiguration, ScaleBytes
+        from scalecodec.type_registry import load_type_registry_preset
+        runtime_config = RuntimeConfiguration()
+        runtime_config.update_type_registry(load_type_registry_preset("core"))
+        runtime_config.update_type_registry(load_type_registry_preset("legacy"))
+        metadata = runtime_config.create_scale_object("MetadataVersioned", data=ScaleBytes(metadata_hex))
+        metadata.decode()
+        version, versioned = next(iter(metadata.value[1].items()))
+        types = {portable_type["id"]: portable_type["type"] for portable_type in versioned["types"]["types"]}
+        pallets = {pallet["name"]: pallet for pallet in versioned["pallets"]}
+
+        items: Dict[str, Dict] = {}
+        for name, (pallet_name, item_name, expected_hashers, expected_type) in self.storage_items.items():
+            pallet = pallets.get(pallet_name)
+            if pallet is None or pallet["storage"] is None:
+                raise KeyError(f"Pallet {pallet_name} has no storage in {version} metadata")
+            entry = next((entry for entry in pallet["storage"]["entries"] if entry["name"] == item_name), None)
+            if entry is None:
+                raise KeyError(f"Storage item {pallet_name}.{item_name} not found in {version} metadata")
+            entry_type = entry["type"]
+            if "Map" in entry_type:
+                hashers = entry_type["Map"]["hashers"]
+                value_type = self._type_name(types, entry_type["Map"]["value"])
+            else:
+                hashers = []
+                value_type = self._type_name(types, entry_type["Plain"])
+            if hashers != expected_hashers:
+                raise ValueError(f"{pallet_name}.{item_name} has key hashers {hashers}, expected {expected_hashers}")
+            if value_type != expected_type:
+                raise ValueError(f"{pallet_name}.{item_name} has value type {value_type}, expected {expected_type}")
+            items[name] = {
+                "module": twox128(pallet["storage"]["prefix"]),
+                "function": twox128(item_name),
+            }
+        return items
+
+    def _type_name(self, types: Dict[int, Dict], type_id: int) -> str:
+        """Render a portable registry type as a Rust-like type name, e.g. ``Vec<(u64, AccountId32)>``."""
+        registry_type = types[type_id]
+        type_def = registry_type["def"]
+        if "primitive" in type_def:
+            return type_def["primitive"]
+        if "sequence" in type_def:
+            return f"Vec<{self._type_name(types, type_def['sequence']['type'])}>"
+        if "array" in type_def:
+            return f"[{self._type_name(types, type_def['array']['type'])}; {type_def['array']['len']}]"
+        if "tuple" in type_def:
+            return "(" + ", ".join(self._type_name(types, element) for element in type_def["tuple"]) + ")"
+        if "compact" in type_def:
+            return f"Compact<{self._type_name(types, type_def['compact']['type'])}>"
+        if registry_type["path"]:
+            return registry_type["path"][-1]
+        return f"scale_info::{type_id}"
+
+    def _load_cache(self) -> Dict[str, Dict]:
+        """Read the cached items of every seen spec version."""
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable runtime metadata cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self, cache: Dict[str, Dict]) -> None:
+        """Write the cached items of every seen spec version."""
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
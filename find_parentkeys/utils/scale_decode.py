@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Iterable, Tuple, Union
+
+# One (u64 proportion, AccountId) tuple of a ParentKeys value, SCALE encoded (40 bytes)
+PARENT_KEY_DTYPE = np.dtype([('proportion', '<u8'), ('account', 'u1', (32,))])
+
+
+def to_bytes(value: Union[str, bytes, bytearray, memoryview]) -> bytes:
+    """Return the raw bytes of a storage value given as ``0x`` hex or as bytes."""
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+
+def decode_compact(data: Union[bytes, memoryview], offset: int = 0) -> Tuple[int, int]:
+    """Decode a SCALE compact integer at ``offset``; return the value and the offset after it."""
+    first = data[offset]
+    mode = first & 0b11
+    if mode == 0:
+        return first >> 2, offset + 1
+    if mode == 1:
+        return int.from_bytes(data[offset:offset + 2], 'little') >> 2, offset + 2
+    if mode == 2:
+        return int.from_bytes(data[offset:offset + 4], 'little') >> 2, offset + 4
+    length = (first >> 2) + 4
+    return int.from_bytes(data[offset + 1:offset + 1 + length], 'little'), offset + 1 + length
+
+
+def decode_parent_keys_array(value: Union[str, bytes, memoryview]) -> np.ndarray:
+    """Decode a ParentKeys value (``Vec<(u64, AccountId)>``) into a PARENT_KEY_DTYPE record array.
+
+    The records are a view on the decoded bytes; nothing is copied per entry.
+    """
+    data = to_bytes(value)
+    count, offset = decode_compact(data)
+    if len(data) - offset != count * PARENT_KEY_DTYPE.itemsize:
+        raise ValueError(f"ParentKeys value holds {len(data) - offset} bytes, expected {count} entries")
+    return np.frombuffer(data, dtype=PARENT_KEY_DTYPE, count=count, offset=offset)
+
+
+def decode_parent_keys_many(values: Iterable[Union[str, bytes]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode many ParentKeys values into one record array plus the entry count of each value.
+
+    All values are unhexed in one call and their entries joined into one buffer, so the
+    per-value cost is a compact prefix read and a slice.
+    """
+    values = list(values)
+    if values and isinstance(values[0], str):
+        data = memoryview(bytes.fromhex(''.join(value[2:] for value in values)))
+    else:
+        data = memoryview(b''.join(to_bytes(value) for value in values))
+    itemsize = PARENT_KEY_DTYPE.itemsize
+    entries = []
+    counts = np.empty(len(values), dtype=np.int64)
+    offset = 0
+    for i in range(len(values)):
+        count, offset = decode_compact(data, offset)
+        end = offset + count * itemsize
+        if end > len(data):
+            raise ValueError(f"ParentKeys value {i} is truncated")
+        entries.append(data[offset:end])
+        counts[i] = count
+        offset = end
+    if offset != len(data):
+        raise ValueError(f"{len(data) - offset} trailing bytes after the last ParentKeys value")
+    return np.frombuffer(b''.join(entries), dtype=PARENT_KEY_DTYPE), counts
@@ -0,0 +1,292 @@
+import os
+import time
+import shutil
+import logging
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+
+HOTKEY_DTYPE = 'S48'  # SS58 addresses are ASCII and at most 48 characters
+BLOCK_DTYPE = [
+    ('block_number', '<i8'), ('timestamp', '<f8'),
+    ('hotkey_start', '<i8'), ('hotkey_end', '<i8'), ('edge_start', '<i8'), ('edge_end', '<i8'),
+]
+COLUMNS = ('hotkeys', 'stakes', 'parents', 'children', 'netuids', 'proportions')
+
+
+class SnapshotArchive:
+    """Append-only columnar archive of cycle snapshots in memory-mapped ``.npy`` segments.
+
+    Every cycle is written as a new segment directory holding one ``.npy`` file per column
+    (hotkeys, stakes, and edge parent/child/netuid/proportion) plus a ``blocks.npy`` table
+    with each snapshot's block number, timestamp and row ranges. Edge parents and children
+    are row numbers into the segment's hotkeys column. The block tables of all segments form
+    the index by block number. Once ``compact_segments`` single-cycle segments exist they are
+    merged into one, and snapshots older than ``retention_days`` are dropped. A merged segment
+    is renamed into place before its sources are deleted, so a crash in between leaves
+    sources whose snapshots are all in another segment; they are removed on the next start.
+    """
+
+    def __init__(self, directory: str, retention_days: float = 30.0, compact_segments: int = 24) -> None:
+        """
+        Initialize the archive, creating its directory if needed.
+        :param directory: Directory the segments are stored in.
+        :param retention_days: Snapshots older than this many days are dropped.
+        :param compact_segments: Number of single-cycle segments merged into one compacted segment.
+        """
+        self.directory = directory
+        self.retention_days = retention_days
+        self.compact_segments = compact_segments
+        os.makedirs(directory, exist_ok=True)
+        self._segments: Dict[str, Dict[str, np.ndarray]] = {}
+        self._remove_leftovers()
+        self._load_index()
+
+    def _remove_leftovers(self) -> None:
+        """Delete unfinished segment writes and segments whose snapshots were all merged into another one."""
+        for name in os.listdir(self.directory):
+            if name.startswith('.') and name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+        block_sets = {
+            name: set(np.load(os.path.join(self.directory, name, 'blocks.npy'))['block_number'].tolist())
+            for name in self.segment_names()
+        }
+        for name, blocks in list(block_sets.items()):
+            if any(other != name and other in block_sets and blocks <= other_blocks
+                   for other, other_blocks in block_sets.items()):
+                logging.warning(f"Removing archive segment {name}, which was already merged")
+                self._remove_segment(name)
+                del block_sets[name]
+
+    def _load_index(self) -> None:
+        """Read the block table of every segment into the in-memory index."""
+        blocks, segments, rows = [], [], []
+        for name in self.segment_names():
+            segment_blocks = np.load(os.path.join(self.directory, name, 'blocks.npy'))
+            blocks.append(segment_blocks)
+            segments.extend([name] * len(segment_blocks))
+            rows.extend(range(len(segment_blocks)))
+        self.blocks = np.concatenate(blocks) if blocks else np.empty(0, dtype=BLOCK_DTYPE)
+        self.block_segments: List[str] = segments
+        self.block_rows: List[int] = rows
+
+    def segment_names(self) -> List[str]:
+        """Return the segment directory names in block order."""
+        return sorted(name for name in os.listdir(self.directory) if not name.startswith('.'))
+
+    def _segment(self, name: str) -> Dict[str, np.ndarray]:
+        """Open the columns of a segment memory-mapped."""
+        segment = self._segments.get(name)
+        if segment is None:
+            path = os.path.join(self.directory, name)
+            segment = {column: np.load(os.path.join(path, f'{column}.npy'), mmap_mode='r') for column in COLUMNS}
+            segment['blocks'] = np.load(os.path.join(path, 'blocks.npy'))
+            self._segments[name] = segment
+        return segment
+
+    def append(self, snapshot: GraphSnapshot, timestamp: Optional[float] = None) -> bool:
+        """Archive a snapshot as a new segment; return False if its block is already archived."""
+        if snapshot.block_number is None:
+            return False
+        if len(self.blocks) and snapshot.block_number <= self.blocks['block_number'].max():
+            logging.info(f"Block {snapshot.block_number} is already archived, skipping")
+            return False
+        hotkeys = list(snapshot.stakes)
+        for parent, child, _ in snapshot.edges:
+            for hotkey in (parent, child):
+                if hotkey not in snapshot.stakes:
+                    hotkeys.append(hotkey)
+        hotkeys = list(dict.fromkeys(hotkeys))
+        rows = {hotkey: i for i, hotkey in enumerate(hotkeys)}
+        edges = list(snapshot.edges.items())
+        columns = {
+            'hotkeys': np.array(hotkeys, dtype=HOTKEY_DTYPE),
+            'stakes': np.array([snapshot.stakes.get(hotkey, 0.0) for hotkey in hotkeys], dtype=np.float64),
+            'parents': np.array([rows[parent] for (parent, _, _), _ in edges], dtype=np.int64),
+            'children': np.array([rows[child] for (_, child, _), _ in edges], dtype=np.int64),
+            'netuids': np.array([netuid for (_, _, netuid), _ in edges], dtype=np.uint16),
+            'proportions': np.array([proportion for _, proportion in edges], dtype=np.float64),
+        }
+        blocks = np.array(
+            [(snapshot.block_number, timestamp or time.time(), 0, len(hotkeys), 0, len(edges))], dtype=BLOCK_DTYPE
+        )
+        self._write_segment(blocks, columns)
+        self.apply_retention()
+        if self._single_cycle_segments() >= self.compact_segments:
+            self.compact()
+        return True
+
+    def _write_segment(self, blocks: np.ndarray, columns: Dict[str, np.ndarray]) -> str:
+        """Write a segment to a temporary directory and rename it into place under an unused name."""
+        name = base_name = f"{blocks['block_number'][0]:012d}-{blocks['block_number'][-1]:012d}"
+        suffix = 0
+        while os.path.exists(os.path.join(self.directory, name)):
+            # A merge can cover the same blocks as one of its sources, which still exists
+            suffix += 1
+            name = f"{base_name}-{suffix}"
+        tmp_path = os.path.join(self.directory, f'.{name}.tmp')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'blocks.npy'), blocks)
+        for column, values in columns.items():
+            np.save(os.path.join(tmp_path, f'{column}.npy'), values)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        self._load_index()
+        return name
+
+    def _single_cycle_segments(self) -> int:
+        """Count the segments holding a single snapshot."""
+        return sum(1 for name in self.segment_names() if len(self._segment(name)['blocks']) == 1)
+
+    def compact(self) -> None:
+        """Merge the single-cycle segments into one segment, leaving out expired snapshots."""
+        names = [name for name in self.segment_names() if len(self._segment(name)['blocks']) == 1]
+        if len(names) < 2:
+            return
+        self._merge(names)
+        logging.info(f"Compacted {len(names)} archive segments")
+
+    def apply_retention(self) -> None:
+        """Drop snapshots older than the retention period, rewriting segments that are partly expired."""
+        cutoff = time.time() - self.retention_days * 86400
+        for name in self.segment_names():
+            timestamps = self._segment(name)['blocks']['timestamp']
+            if timestamps.max() < cutoff:
+                self._remove_segment(name)
+            elif timestamps.min() < cutoff:
+                self._merge([name])
+        self._load_index()
+
+    def _merge(self, names: List[str]) -> None:
+        """Rewrite the unexpired snapshots of some segments as one segment and remove the originals."""
+        cutoff = time.time() - self.retention_days * 86400
+        blocks, parts = [], {column: [] for column in COLUMNS}
+        hotkey_offset = edge_offset = 0
+        for name in names:
+            segment = self._segment(name)
+            for block in segment['blocks']:
+                if block['timestamp'] < cutoff:
+                    continue
+                hotkey_slice = slice(block['hotkey_start'], block['hotkey_end'])
+                edge_slice = slice(block['edge_start'], block['edge_end'])
+                hotkey_count = block['hotkey_end'] - block['hotkey_start']
+                edge_count = block['edge_end'] - block['edge_start']
+                blocks.append((
+                    block['block_number'], block['timestamp'],
+                    hotkey_offset, hotkey_offset + hotkey_count, edge_offset, edge_offset + edge_count
+                ))
+                parts['hotkeys'].append(segment['hotkeys'][hotkey_slice])
+                parts['stakes'].append(segment['stakes'][hotkey_slice])
+                shift = hotkey_offset - block['hotkey_start']
+                parts['parents'].append(segment['parents'][edge_slice] + shift)
+                parts['children'].append(segment['children'][edge_slice] + shift)
+                parts['netuids'].append(segment['netuids'][edge_slice])
+                parts['proportions'].append(segment['proportions'][edge_slice])
+                hotkey_offset += hotkey_count
+                edge_offset += edge_count
+        columns = {column: np.concatenate(values) for column, values in parts.items() if values}
+        # The merged segment is in place before any source is deleted
+        if blocks:
+            self._write_segment(np.array(blocks, dtype=BLOCK_DTYPE), columns)
+        for name in names:
+            self._remove_segment(name)
+        self._load_index()
+
+    def _remove_segment(self, name: str) -> None:
+        """Delete a segment directory and forget its open columns."""
+        self._segments.pop(name, None)
+        shutil.rmtree(os.path.join(self.directory, name))
+
+    def _since(self, days: Optional[float]) -> float:
+        """Return the timestamp ``days`` ago, or 0 for the whole archive."""
+        return 0.0 if days is None else time.time() - days * 86400
+
+    def edge_history(
+        self, parent: str, child: str, netuid: int, days: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (block numbers, timestamps, proportions) of an edge in every archived snapshot that has it."""
+        since = self._since(days)
+        parent_key, child_key = parent.encode(), child.encode()
+        results = []
+        for name in self.segment_names():
+            segment = self._segment(name)
+            blocks = segment['blocks']
+            if blocks['timestamp'].max() < since:
+                continue
+            hotkeys = segment['hotkeys']
+            parent_rows = np.flatnonzero(hotkeys == parent_key)
+            child_rows = np.flatnonzero(hotkeys == child_key)
+            if not len(parent_rows) or not len(child_rows):
+                continue
+            edge_rows = np.flatnonzero(
+                (segment['netuids'] == netuid)
+                & np.isin(segment['parents'], parent_rows)
+                & np.isin(segment['children'], child_rows)
+            )
+            snapshot_rows = np.searchsorted(blocks['edge_start'], edge_rows, side='right') - 1
+            keep = blocks['timestamp'][snapshot_rows] >= since
+            results.append((
+                blocks['block_number'][snapshot_rows[keep]],
+                blocks['timestamp'][snapshot_rows[keep]],
+                np.asarray(segment['proportions'][edge_rows[keep]]),
+            ))
+        return self._concatenate(results)
+
+    def stake_history(self, hotkey: str, days: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (block numbers, timestamps, stakes) of a hotkey in every archived snapshot that has it."""
+        since = self._since(days)
+        hotkey_key = hotkey.encode()
+        results = []
+        for name in self.segment_names():
+            segment = self._segment(name)
+            blocks = segment['blocks']
+            if blocks['timestamp'].max() < since:
+                continue
+            rows = np.flatnonzero(segment['hotkeys'] == hotkey_key)
+            snapshot_rows = np.searchsorted(blocks['hotkey_start'], rows, side='right') - 1
+            keep = blocks['timestamp'][snapshot_rows] >= since
+            results.append((
+                blocks['block_number'][snapshot_rows[keep]],
+                blocks['timestamp'][snapshot_rows[keep]],
+                np.asarray(segment['stakes'][rows[keep]]),
+            ))
+        return self._concatenate(results)
+
+    def _concatenate(self, results: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, ...]:
+        """Join per-segment query results into three columns."""
+        if not results:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+        return tuple(np.concatenate(column) for column in zip(*results))
+
+    def snapshot_at(self, block_number: int) -> Optional[GraphSnapshot]:
+        """Rebuild the archived snapshot of a block, or None if it is not archived."""
+        matches = np.flatnonzero(self.blocks['block_number'] == block_number)
+        if not len(matches):
+            return None
+        i = matches[0]
+        segment = self._segment(self.block_segments[i])
+        block = segment['blocks'][self.block_rows[i]]
+        hotkeys = np.char.decode(segment['hotkeys'][block['hotkey_start']:block['hotkey_end']]).tolist()
+        stakes = dict(zip(hotkeys, segment['stakes'][block['hotkey_start']:block['hotkey_end']].tolist()))
+        edge_slice = slice(block['edge_start'], block['edge_end'])
+        all_hotkeys = segment['hotkeys']
+        edges = {
+            (all_hotkeys[parent].decode(), all_hotkeys[child].decode(), netuid): proportion
+            for parent, child, netuid, proportion in zip(
+                segment['parents'][edge_slice].tolist(), segment['children'][edge_slice].tolist(),
+                segment['netuids'][edge_slice].tolist(), segment['proportions'][edge_slice].tolist()
+            )
+        }
+        return GraphSnapshot(stakes, edges, int(block['block_number']))
+
+    def size(self) -> int:
+        """Return the archive size on disk in bytes."""
+        return sum(
+            entry.stat().st_size
+            for name in self.segment_names()
+            for entry in os.scandir(os.path.join(self.directory, name))
+        )
+
+    def __len__(self) -> int:
+        """Return the number of archived snapshots."""
+        return len(self.blocks)
@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class StakeCache:
+    """Size-bounded LRU cache of hotkey stakes keyed by hotkey and block hash.
+
+    A stake read at a given block never changes, so entries are keyed by the block
+    they were read at; the TTL only bounds how long entries for old blocks linger.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_size: int = 100000) -> None:
+        """
+        Initialize the cache.
+        :param ttl: Seconds an entry stays valid after it was stored.
+        :param max_size: Maximum number of entries; the least recently used are evicted first.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, float]]" = OrderedDict()
+
+    def get(self, hotkey: str, block_hash: Optional[str]) -> Optional[float]:
+        """Return the cached stake of a hotkey at a block, or None on a miss."""
+        key = (hotkey, block_hash)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, hotkeys: Iterable[str], block_hash: Optional[str]) -> Tuple[Dict[str, float], List[str]]:
+        """Split hotkeys into cached stakes and the hotkeys that still have to be fetched."""
+        found: Dict[str, float] = {}
+        missing: List[str] = []
+        for hotkey in hotkeys:
+            stake = self.get(hotkey, block_hash)
+            if stake is None:
+                missing.append(hotkey)
+            else:
+                found[hotkey] = stake
+        return found, missing
+
+    def put(self, hotkey: str, block_hash: Optional[str], stake: float) -> None:
+        """Store the stake of a hotkey at a block, evicting the oldest entries if full."""
+        key = (hotkey, block_hash)
+        self._entries[key] = (time.monotonic() + self.ttl, stake)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put_many(self, stakes: Dict[str, float], block_hash: Optional[str]) -> None:
+        """Store the stakes of many hotkeys at a block."""
+        for hotkey, stake in stakes.items():
+            self.put(hotkey, block_hash, stake)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def __str__(self) -> str:
+        """Summarize the cache size and hit rate."""
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return f"{len(self)} entries, {self.hits} hits, {self.misses} misses ({hit_rate:.1%} hit rate)"
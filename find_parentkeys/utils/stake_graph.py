@@ -0,0 +1,141 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+
+
+class SubnetEdges:
+    """Parent/child edges of one subnet as CSR arrays in both directions over hotkey ids."""
+
+    def __init__(self, parents: np.ndarray, children: np.ndarray, proportions: np.ndarray, size: int) -> None:
+        """
+        Initialize the CSR arrays from edge columns.
+        :param parents: Parent hotkey id of each edge.
+        :param children: Child hotkey id of each edge.
+        :param proportions: Proportion of the parent's stake delegated along each edge.
+        :param size: Number of hotkey ids in the graph.
+        """
+        self.parents = parents
+        self.children = children
+        self.proportions = proportions
+        # Rows by parent: children of hotkey i are child_ids[child_ptr[i]:child_ptr[i + 1]]
+        order = np.argsort(parents, kind='stable')
+        self.child_ptr = np.concatenate(([0], np.cumsum(np.bincount(parents, minlength=size))))
+        self.child_ids = children[order]
+        self.child_proportions = proportions[order]
+        # Rows by child: parents of hotkey i are parent_ids[parent_ptr[i]:parent_ptr[i + 1]]
+        order = np.argsort(children, kind='stable')
+        self.parent_ptr = np.concatenate(([0], np.cumsum(np.bincount(children, minlength=size))))
+        self.parent_ids = parents[order]
+        self.parent_proportions = proportions[order]
+
+    def __len__(self) -> int:
+        """Return the number of edges."""
+        return len(self.parents)
+
+
+class StakeGraph:
+    """In-memory parent/child graph of one cycle with hotkeys as integer ids and edges in CSR arrays per subnet.
+
+    Effective stake on a subnet is a hotkey's own stake, minus the proportions it delegates
+    to its children, plus the proportions of its parents' stakes delegated to it. It is
+    computed for every hotkey at once as one sparse matrix-vector product over the edges.
+    """
+
+    def __init__(self, snapshot: GraphSnapshot) -> None:
+        """Build the graph from the stakes and edges of a snapshot."""
+        hotkeys = set(snapshot.stakes)
+        for parent, child, _ in snapshot.edges:
+            hotkeys.add(parent)
+            hotkeys.add(child)
+        self.hotkeys = np.array(sorted(hotkeys), dtype=object)
+        self.ids: Dict[str, int] = {hotkey: i for i, hotkey in enumerate(self.hotkeys.tolist())}
+        self.stakes = np.array([snapshot.stakes.get(hotkey, 0.0) for hotkey in self.hotkeys.tolist()], dtype=np.float64)
+        self.block_number = snapshot.block_number
+
+        columns: Dict[int, Tuple[List[int], List[int], List[float]]] = {}
+        for (parent, child, net_uid), proportion in snapshot.edges.items():
+            parents, children, proportions = columns.setdefault(net_uid, ([], [], []))
+            parents.append(self.ids[parent])
+            children.append(self.ids[child])
+            proportions.append(proportion)
+        self.subnets: Dict[int, SubnetEdges] = {
+            net_uid: SubnetEdges(
+                np.array(parents, dtype=np.int64), np.array(children, dtype=np.int64),
+                np.array(proportions, dtype=np.float64), len(self.hotkeys)
+            )
+            for net_uid, (parents, children, proportions) in sorted(columns.items())
+        }
+
+    def effective_stakes(self, net_uid: int) -> np.ndarray:
+        """Return the effective stake of every hotkey on a subnet, indexed by hotkey id."""
+        edges = self.subnets.get(net_uid)
+        if edges is None:
+            return self.stakes.copy()
+        size = len(self.hotkeys)
+        # (I - diag(out) + P^T) @ stakes, with P the parent -> child proportion matrix
+        delegated = self.stakes[edges.parents] * edges.proportions
+        inflow = np.bincount(edges.children, weights=delegated, minlength=size)
+        outflow = np.bincount(edges.parents, weights=delegated, minlength=size)
+        return self.stakes - outflow + inflow
+
+    def effective_stake(self, hotkey: str, net_uid: int) -> float:
+        """Return the effective stake of one hotkey on a subnet."""
+        i = self.ids[hotkey]
+        edges = self.subnets.get(net_uid)
+        if edges is None:
+            return float(self.stakes[i])
+        outflow = self.stakes[i] * edges.child_proportions[edges.child_ptr[i]:edges.child_ptr[i + 1]].sum()
+        start, end = edges.parent_ptr[i], edges.parent_ptr[i + 1]
+        inflow = np.dot(self.stakes[edges.parent_ids[start:end]], edges.parent_proportions[start:end])
+        return float(self.stakes[i] - outflow + inflow)
+
+    def effective_stake_map(self, net_uid: int) -> Dict[str, float]:
+        """Return the effective stake of every hotkey on a subnet, keyed by hotkey."""
+        return dict(zip(self.hotkeys.tolist(), self.effective_stakes(net_uid).tolist()))
+
+    def children(self, hotkey: str, net_uid: int) -> Dict[str, float]:
+        """Return the children of a hotkey on a subnet with the proportion delegated to each."""
+        i = self.ids.get(hotkey)
+        edges = self.subnets.get(net_uid)
+        if i is None or edges is None:
+            return {}
+        start, end = edges.child_ptr[i], edges.child_ptr[i + 1]
+        return dict(zip(self.hotkeys[edges.child_ids[start:end]].tolist(), edges.child_proportions[start:end].tolist()))
+
+    def parents(self, hotkey: str, net_uid: int) -> Dict[str, float]:
+        """Return the parents of a hotkey on a subnet with the proportion each delegates to it."""
+        i = self.ids.get(hotkey)
+        edges = self.subnets.get(net_uid)
+        if i is None or edges is None:
+            return {}
+        start, end = edges.parent_ptr[i], edges.parent_ptr[i + 1]
+        return dict(zip(self.hotkeys[edges.parent_ids[start:end]].tolist(), edges.parent_proportions[start:end].tolist()))
+
+    def all_children(self, hotkey: str) -> List[Tuple[str, int, float]]:
+        """Return the (child, net UID, proportion) edges of a hotkey on every subnet."""
+        return [
+            (child, net_uid, proportion)
+            for net_uid in self.subnets
+            for child, proportion in self.children(hotkey, net_uid).items()
+        ]
+
+    def all_parents(self, hotkey: str) -> List[Tuple[str, int, float]]:
+        """Return the (parent, net UID, proportion) edges of a hotkey on every subnet."""
+        return [
+            (parent, net_uid, proportion)
+            for net_uid in self.subnets
+            for parent, proportion in self.parents(hotkey, net_uid).items()
+        ]
+
+    def __contains__(self, hotkey: str) -> bool:
+        """Check whether the hotkey is in the graph."""
+        return hotkey in self.ids
+
+    def __len__(self) -> int:
+        """Return the number of hotkeys."""
+        return len(self.hotkeys)
+
+    def __str__(self) -> str:
+        """Summarize the graph size."""
+        edges = sum(len(edges) for edges in self.subnets.values())
+        return f"{len(self.hotkeys)} hotkeys, {edges} edges on {len(self.subnets)} subnets"
@@ -0,0 +1,131 @@
+import os
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+import xxhash
+from find_parentkeys.utils import address_codec
+
+
+@lru_cache(maxsize=None)
+def twox128(name: str) -> str:
+    """Hash a pallet or storage item name with the Twox128 hasher, as hex."""
+    data = name.encode()
+    return (xxhash.xxh64(data, seed=0).intdigest().to_bytes(8, 'little')
+            + xxhash.xxh64(data, seed=1).intdigest().to_bytes(8, 'little')).hex()
+
+
+def storage_prefix(pallet: str, item: str) -> str:
+    """Return the ``0x`` prefixed key prefix of a storage item."""
+    return '0x' + twox128(pallet) + twox128(item)
+
+
+def u16_key(value: int) -> str:
+    """Encode a u16 map key (net UID, UID) for the Identity hasher, as little-endian hex."""
+    return value.to_bytes(2, 'little').hex()
+
+
+def u16_from_key(key: str) -> int:
+    """Decode the u16 Identity-hashed map key at the end of a storage key."""
+    return int.from_bytes(bytes.fromhex(key[-4:]), 'little')
+
+
+class StorageKeyIndex:
+    """Builds hotkey storage keys from precomputed fragments and maps keys back to their hotkey.
+
+    The Blake2_128Concat fragment of every hotkey is computed once and can be persisted
+    across restarts; every key built is remembered so a key returned by the node resolves
+    to its (hotkey, net UID) with one dict lookup.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._fragments: Dict[str, str] = {}
+        self._reverse: Dict[str, Tuple[str, Optional[int]]] = {}
+        self._dirty = False
+
+    def fragment(self, hotkey: str) -> str:
+        """Return the Blake2_128Concat fragment (hash + account id) of a hotkey as hex."""
+        fragment = self._fragments.get(hotkey)
+        if fragment is None:
+            fragment = address_codec.ss58_to_blake2_128concat(hotkey).hex()
+            self._fragments[hotkey] = fragment
+            self._dirty = True
+        return fragment
+
+    def double_map_key(self, prefix: str, hotkey: str, netuid: int) -> str:
+        """Build the key of a (Blake2_128Concat hotkey, Identity u16 net UID) double map entry."""
+        key = prefix + self.fragment(hotkey) + u16_key(netuid)
+        self._reverse[key] = (hotkey, netuid)
+        return key
+
+    def map_key(self, prefix: str, hotkey: str) -> str:
+        """Build the key of an Identity-hashed hotkey map entry."""
+        key = prefix + self.fragment(hotkey)[32:]
+        self._reverse[key] = (hotkey, None)
+        return key
+
+    def lookup(self, key: str) -> Optional[Tuple[str, Optional[int]]]:
+        """Return the (hotkey, net UID) a key was built for, or None for unknown keys."""
+        return self._reverse.get(key)
+
+    def decode_double_map_key(self, prefix: str, key: str) -> Tuple[str, int]:
+        """Resolve a double map key to (hotkey, net UID), decoding and remembering keys not built here."""
+        entry = self._reverse.get(key)
+        if entry is None:
+            # Key layout: prefix | blake2_128(hotkey) | account id | net UID (u16 LE)
+            fragment = key[len(prefix):-4]
+            hotkey = address_codec.ss58_encode(bytes.fromhex(fragment[32:]))
+            if hotkey not in self._fragments:
+                self._fragments[hotkey] = fragment
+                self._dirty = True
+            entry = (hotkey, u16_from_key(key))
+            self._reverse[key] = entry
+        return entry
+
+    def retain(self, hotkeys: Iterable[str]) -> None:
+        """Forget the fragments and keys of every hotkey not in ``hotkeys``, so deregistered hotkeys do not pile up."""
+        hotkeys = set(hotkeys)
+        self._reverse = {key: entry for key, entry in self._reverse.items() if entry[0] in hotkeys}
+        fragments = {hotkey: fragment for hotkey, fragment in self._fragments.items() if hotkey in hotkeys}
+        if len(fragments) != len(self._fragments):
+            self._fragments = fragments
+            self._dirty = True
+
+    def load(self, path: str) -> None:
+        """Load persisted hotkey fragments, if the file exists."""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r") as f:
+                self._fragments.update(json.load(f))
+        except ValueError as e:
+            logging.warning(f"Ignoring unreadable storage key index {path}: {e}")
+            return
+        logging.info(f"Loaded {len(self._fragments)} storage key fragments from {path}")
+
+    def save(self, path: str) -> None:
+        """Persist the hotkey fragments if new ones were computed since the last save."""
+        if not self._dirty:
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._fragments, f)
+        os.replace(tmp_path, path)
+        self._dirty = False
+
+    def __contains__(self, hotkey: str) -> bool:
+        """Check whether a fragment is held for the hotkey."""
+        return hotkey in self._fragments
+
+    def __len__(self) -> int:
+        """Return the number of hotkeys with a precomputed fragment."""
+        return len(self._fragments)
+
+
+_index = StorageKeyIndex()
+
+
+def get_storage_key_index() -> StorageKeyIndex:
+    """Return the process-wide storage key index."""
+    return _index
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SubnetFetchError(Exception):
+    """Raised when more subnets failed to load than the fetcher tolerates."""
+
+    def __init__(self, failures: Dict[int, str]) -> None:
+        """Initialize with the error message of each failed subnet."""
+        self.failures = failures
+        super().__init__(f"{len(failures)} subnets failed to load: {failures}")
+
+
+class SubnetFetcher:
+    """Runs one fetch per subnet concurrently with a worker limit and a per-subnet timeout.
+
+    A subnet that raises or runs past its timeout is recorded in ``failures`` instead of
+    stalling the others. If more than ``max_failures`` subnets fail, ``SubnetFetchError``
+    is raised so the cycle is dropped rather than written with missing subnets.
+    """
+
+    def __init__(self, workers: int = 8, timeout: float = 120.0, max_failures: int = 0) -> None:
+        """
+        Initialize the fetcher.
+        :param workers: Maximum number of subnets fetched at once.
+        :param timeout: Seconds one subnet may take once its fetch has started.
+        :param max_failures: Number of failed subnets tolerated before the whole fetch fails.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.failures: Dict[int, str] = {}
+
+    async def fetch_async(self, netuids: List[int], fetch: Callable[[int], Awaitable[T]]) -> Dict[int, T]:
+        """Fetch every subnet and return the results of those that succeeded, keyed by net UID."""
+        workers = asyncio.Semaphore(self.workers)
+
+        async def fetch_one(netuid: int) -> T:
+            async with workers:
+                return await asyncio.wait_for(fetch(netuid), self.timeout)
+
+        outcomes = await asyncio.gather(*(fetch_one(netuid) for netuid in netuids), return_exceptions=True)
+        results: Dict[int, T] = {}
+        self.failures = {}
+        for netuid, outcome in zip(netuids, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                self.failures[netuid] = f"timed out after {self.timeout}s"
+            elif isinstance(outcome, BaseException):
+                self.failures[netuid] = f"{type(outcome).__name__}: {outcome}"
+            else:
+                results[netuid] = outcome
+
+        if self.failures:
+            for netuid, error in self.failures.items():
+                logging.warning(f"Failed to load subnet {netuid}: {error}")
+            logging.warning(f"Loaded {len(results)} of {len(netuids)} subnets, failed: {sorted(self.failures)}")
+        if len(self.failures) > self.max_failures:
+            raise SubnetFetchError(self.failures)
+        return results
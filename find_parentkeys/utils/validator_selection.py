@@ -0,0 +1,52 @@
+import numpy as np
+from typing import Iterable, List, Optional, Sequence
+
+ROOT_NETUID = 0
+
+
+class ValidatorSelector:
+    """Picks the subnets to monitor and the validators of each subnet from its stake column."""
+
+    def __init__(
+        self, stake_threshold: float = 1000.0, subnet_include: Optional[Sequence[int]] = None,
+        subnet_exclude: Optional[Sequence[int]] = None, top_n: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the selection rules.
+        :param stake_threshold: Hotkeys need more stake than this (in TAO) to count as validators.
+        :param subnet_include: Only monitor these subnets; empty or None monitors every subnet except root.
+        :param subnet_exclude: Never monitor these subnets.
+        :param top_n: Keep at most this many validators per subnet, highest stake first.
+        """
+        self.stake_threshold = stake_threshold
+        self.subnet_include = set(subnet_include) if subnet_include else None
+        self.subnet_exclude = set(subnet_exclude or [])
+        self.top_n = top_n
+
+    def select_subnets(self, netuids: Iterable[int]) -> List[int]:
+        """Filter the existing subnets down to the monitored ones."""
+        if self.subnet_include is None:
+            selected = [netuid for netuid in netuids if netuid != ROOT_NETUID]
+        else:
+            selected = [netuid for netuid in netuids if netuid in self.subnet_include]
+        return [netuid for netuid in selected if netuid not in self.subnet_exclude]
+
+    def select(self, stakes: np.ndarray) -> np.ndarray:
+        """Return the indices of the neurons selected as validators."""
+        stakes = np.asarray(stakes, dtype=np.float64)
+        indices = np.flatnonzero(stakes > self.stake_threshold)
+        if self.top_n is not None and len(indices) > self.top_n:
+            order = np.argsort(-stakes[indices], kind='stable')
+            indices = np.sort(indices[order[:self.top_n]])
+        return indices
+
+    def select_hotkeys(self, hotkeys: Sequence[str], stakes: np.ndarray) -> np.ndarray:
+        """Return the hotkeys selected as validators."""
+        return np.asarray(hotkeys, dtype=object)[self.select(stakes)]
+
+    def merge(self, subnet_hotkeys: Iterable[np.ndarray]) -> np.ndarray:
+        """Merge the validators of all subnets into one array of unique hotkeys."""
+        arrays = [np.asarray(hotkeys, dtype=object) for hotkeys in subnet_hotkeys]
+        if not arrays:
+            return np.empty(0, dtype=object)
+        return np.unique(np.concatenate(arrays))
@@ -52,8 +52,7 @@ import argparse
 import yaml
 import logging
 from dotenv import load_dotenv
-from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor
-from find_parentkeys.utils.sentry import init_sentry
+from find_parentkeys.utils.subnet_fetcher import SubnetFetchError
 
 load_dotenv()
 sentry_dsn = os.getenv("SENTRY_DSN")
@@ -74,9 +73,13 @@ def create_db_directory(db_path: str) -> None:
 
 def run_bot(timestamp: int, config: dict) -> None:
     """Run the parent key monitoring function continuously."""
+    from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor
     parent_monitor = ParentkeyMonitor(config)
     while True:
-        parent_monitor.monitor_parentkeys()  # Monitor parent keys
+        try:
+            parent_monitor.monitor_parentkeys()  # Monitor parent keys
+        except SubnetFetchError as e:
+            logging.error(f"Skipped cycle, the database keeps the previous state: {e}")
         logging.info(f"monitor_parentkeys finished, sleeping for {timestamp} seconds")
         time.sleep(timestamp)  # Delay for specified time
 
@@ -85,9 +88,11 @@ def main():
     parser = argparse.ArgumentParser(description="Initialize and run the bot.")
     parser.add_argument("config_file", nargs='?', default='config.yaml', help="Path to the YAML configuration file.")
     parser.add_argument("--interval", type=int, default=3600, help="Delay between runs in seconds.")
+    parser.add_argument("--watch", action="store_true", help="Follow storage changes instead of polling.")
     args = parser.parse_args()
 
     # Uncomment to initialize Sentry for error tracking
+    # from find_parentkeys.utils.sentry import init_sentry
     # init_sentry(sentry_dsn)
 
     with open(args.config_file, "r") as f:
@@ -95,8 +100,14 @@ def main():
 
     db_dir = config.get("DATABASE_DIR")
     create_db_directory(db_dir)  # Create a database directory
+    # Django reads the backend when the monitor modules set it up; the environment wins over the config
+    os.environ.setdefault("DB_BACKEND", config.get("DB_BACKEND", "sqlite"))
 
-    run_bot(args.interval, config)
+    if args.watch:
+        from find_parentkeys.parentkey_monitor.watch_parentkey import ParentkeyWatcher
+        ParentkeyWatcher(config).run()
+    else:
+        run_bot(args.interval, config)
 
 if __name__ == '__main__':
     main()
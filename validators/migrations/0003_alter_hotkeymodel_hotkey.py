@@ -0,0 +1,33 @@
+# Generated by Django 5.0.9 on 2026-10-18 09:46
+
+from django.db import migrations, models
+
+
+def merge_duplicate_hotkeys(apps, schema_editor):
+    """Point edges at the oldest row of each duplicated hotkey and drop the rest."""
+    HotkeyModel = apps.get_model('validators', 'HotkeyModel')
+    ChildHotkeyModel = apps.get_model('validators', 'ChildHotkeyModel')
+    kept = {}
+    for hotkey_id, hotkey in HotkeyModel.objects.order_by('id').values_list('id', 'hotkey'):
+        if hotkey not in kept:
+            kept[hotkey] = hotkey_id
+            continue
+        ChildHotkeyModel.objects.filter(parent_id=hotkey_id).update(parent_id=kept[hotkey])
+        ChildHotkeyModel.objects.filter(child_id=hotkey_id).update(child_id=kept[hotkey])
+        HotkeyModel.objects.filter(id=hotkey_id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validators', '0002_alter_childhotkeymodel_child_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_hotkeys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='hotkeymodel',
+            name='hotkey',
+            field=models.CharField(max_length=255, unique=True),
+        ),
+    ]
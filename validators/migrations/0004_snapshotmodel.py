@@ -0,0 +1,22 @@
+# Generated by Django 5.0.9 on 2026-10-18 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validators', '0003_alter_hotkeymodel_hotkey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block_number', models.BigIntegerField()),
+                ('block_hash', models.CharField(max_length=66)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
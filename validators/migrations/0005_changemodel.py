@@ -0,0 +1,27 @@
+# Generated by Django 5.0.9 on 2026-10-18 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validators', '0004_snapshotmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('block_number', models.BigIntegerField(db_index=True)),
+                ('kind', models.CharField(max_length=16)),
+                ('hotkey', models.CharField(max_length=255)),
+                ('child', models.CharField(max_length=255, null=True)),
+                ('netuid', models.IntegerField(null=True)),
+                ('old_value', models.FloatField(null=True)),
+                ('new_value', models.FloatField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -6,7 +6,7 @@ import logging
         
 
 class HotkeyModel(models.Model):
-    hotkey = models.CharField(max_length=255)  # Adjust max_length as needed
+    hotkey = models.CharField(max_length=255, unique=True)  # Unique, so it is also indexed
     stake = models.FloatField()  # or IntegerField, based on your needs
 
     def __str__(self):
@@ -26,3 +26,26 @@ class ChildHotkeyModel(models.Model):
 
     def __str__(self):
         return f"Child: {self.child}, Parent: {self.parent}, NetUID: {self.netuid}"
+
+
+class SnapshotModel(models.Model):
+    block_number = models.BigIntegerField()
+    block_hash = models.CharField(max_length=66)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Block {self.block_number} ({self.block_hash})"
+
+
+class ChangeModel(models.Model):
+    block_number = models.BigIntegerField(db_index=True)  # Block of the cycle the change was detected in
+    kind = models.CharField(max_length=16)  # edge_added, edge_removed, edge_changed or stake_changed
+    hotkey = models.CharField(max_length=255)  # Parent hotkey for edge changes
+    child = models.CharField(max_length=255, null=True)
+    netuid = models.IntegerField(null=True)
+    old_value = models.FloatField(null=True)  # Previous proportion or stake
+    new_value = models.FloatField(null=True)  # Current proportion or stake
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.hotkey} at block {self.block_number}"
@@ -0,0 +1,488 @@
+import json
+import bisect
+import random
+import asyncio
+import hashlib
+import logging
+import itertools
+import threading
+import websockets
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.storage_keys import storage_prefix, u16_key
+from find_parentkeys.utils.get_parentkey import RPCRequest
+
+PALLET = "SubtensorModule"
+FULL_PROPORTION = 18446744073709551615
+
+# Storage items the monitor reads: name -> (key hashers, key type ids, value type id) in the fake metadata
+STORAGE_ENTRIES = {
+    "NetworksAdded": (["Identity"], 3, 8),
+    "SubnetworkN": (["Identity"], 3, 3),
+    "Keys": (["Identity", "Identity"], 9, 2),
+    "TotalHotkeyStake": (["Identity"], 2, 4),
+    "ParentKeys": (["Blake2_128Concat", "Identity"], 7, 6),
+    "Owner": (["Blake2_128Concat"], 2, 2),
+}
+
+
+def encode_compact(value: int) -> bytes:
+    """SCALE encode a compact integer (below 2^30)."""
+    if value < 1 << 6:
+        return bytes([value << 2])
+    if value < 1 << 14:
+        return ((value << 2) | 1).to_bytes(2, 'little')
+    return ((value << 2) | 2).to_bytes(4, 'little')
+
+
+def encode_parent_keys(parents: List[Tuple[float, bytes]]) -> str:
+    """Encode a ParentKeys value, ``Vec<(u64, AccountId)>``, from (proportion, public key) pairs."""
+    entries = b''.join(
+        (round(proportion * 10**9) * FULL_PROPORTION // 10**9).to_bytes(8, 'little') + parent
+        for proportion, parent in parents
+    )
+    return '0x' + (encode_compact(len(parents)) + entries).hex()
+
+
+def build_metadata() -> str:
+    """Encode V14 runtime metadata declaring the SubtensorModule storage items the monitor reads."""
+    from scalecodec.base import RuntimeConfiguration
+    from scalecodec.type_registry import load_type_registry_preset
+    runtime_config = RuntimeConfiguration()
+    runtime_config.update_type_registry(load_type_registry_preset("core"))
+    runtime_config.update_type_registry(load_type_registry_preset("legacy"))
+
+    def portable_type(type_id, type_def, path=()):
+        return {'id': type_id, 'type': {'path': list(path), 'params': [], 'def': type_def, 'docs': []}}
+
+    types = [
+        portable_type(0, {'primitive': 'u8'}),
+        portable_type(1, {'array': {'len': 32, 'type': 0}}),
+        portable_type(2, {'composite': {'fields': [{'name': None, 'type': 1, 'typeName': '[u8; 32]', 'docs': []}]}},
+                      ['sp_core', 'crypto', 'AccountId32']),
+        portable_type(3, {'primitive': 'u16'}),
+        portable_type(4, {'primitive': 'u64'}),
+        portable_type(5, {'tuple': [4, 2]}),
+        portable_type(6, {'sequence': {'type': 5}}),
+        portable_type(7, {'tuple': [2, 3]}),
+        portable_type(8, {'primitive': 'bool'}),
+        portable_type(9, {'tuple': [3, 3]}),
+    ]
+    entries = [
+        {'name': name, 'modifier': 'Default', 'default': '0x00', 'documentation': [],
+         'type': {'Map': {'hashers': hashers, 'key': key, 'value': value}}}
+        for name, (hashers, key, value) in STORAGE_ENTRIES.items()
+    ]
+    pallets = [{
+        'name': PALLET, 'storage': {'prefix': PALLET, 'entries': entries},
+        'calls': None, 'event': None, 'constants': [], 'error': None, 'index': 7
+    }]
+    metadata = runtime_config.create_scale_object('MetadataVersioned')
+    return metadata.encode(('0x6d657461', {'V14': {
+        'types': {'types': types}, 'pallets': pallets,
+        'extrinsic': {'ty': 0, 'version': 4, 'signed_extensions': []}, 'runtime_type': 0
+    }})).to_hex()
+
+
+class UnknownBlock(Exception):
+    """Raised for a block hash the chain has not produced."""
+
+
+class ChainState:
+    """Storage of a chain, served by ``FakeSubstrateNode``.
+
+    A state is either generated with ``synthetic`` or recorded from a live node with
+    ``record``, and can be saved to and loaded from a JSON file. Synthetic states also
+    keep the validators, stakes, edges and coldkeys they were generated from. ``storage`` holds
+    the latest block; every ``update`` keeps the values it overwrote, so the storage of
+    earlier blocks can still be read with ``storage_at``.
+    """
+
+    def __init__(
+        self, storage: Dict[str, str], block_number: int = 1000, spec_version: int = 100,
+        metadata: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the state.
+        :param storage: Storage values by ``0x`` prefixed key, as hex.
+        :param block_number: Number of the current finalized block.
+        :param spec_version: Runtime spec version reported by the node.
+        :param metadata: SCALE encoded runtime metadata; built from ``STORAGE_ENTRIES`` if not given.
+        """
+        self.storage = storage
+        self.block_number = block_number
+        self.spec_version = spec_version
+        self._metadata = metadata
+        self._sorted_keys: Optional[List[str]] = None
+        self.block_numbers: Dict[str, int] = {self.block_hash: block_number}
+        # Values each block overwrote, by block number, to read the storage of earlier blocks
+        self._undo: Dict[int, Dict[str, Optional[str]]] = {}
+        self.validators: List[str] = []
+        self.stakes: Dict[str, float] = {}
+        self.edges: Dict[Tuple[str, str, int], float] = {}
+        self.coldkeys: Dict[str, str] = {}
+
+    @classmethod
+    def synthetic(
+        cls, validators: int = 64, subnets: int = 4, edges: int = 256, miners: int = 16, seed: int = 0
+    ) -> "ChainState":
+        """
+        Generate a chain with validators registered on every subnet and random parent/child edges.
+        :param validators: Hotkeys with more than 1000 TAO, registered on every subnet.
+        :param subnets: Subnets, with net UIDs 1..subnets.
+        :param edges: Parent/child edges; children are validators, parents are validators or other hotkeys.
+        :param miners: Hotkeys below the validator threshold registered on each subnet.
+        :param seed: Seed of the generator, so the same arguments give the same chain.
+        """
+        rng = random.Random(seed)
+        state = cls({})
+        validator_keys = [rng.randbytes(32) for _ in range(validators)]
+        parent_keys = [rng.randbytes(32) for _ in range(max(1, edges // 4))]
+        state.validators = address_codec.ss58_encode_many(validator_keys)
+        parent_hotkeys = address_codec.ss58_encode_many(parent_keys)
+        public_keys = dict(zip(state.validators + parent_hotkeys, validator_keys + parent_keys))
+        for hotkey in state.validators:
+            state.stakes[hotkey] = float(rng.randint(2000, 200000))
+        for hotkey in parent_hotkeys:
+            state.stakes[hotkey] = float(rng.randint(1, 5000))
+
+        stake_prefix = storage_prefix(PALLET, "TotalHotkeyStake")
+        keys_prefix = storage_prefix(PALLET, "Keys")
+        neuron_keys = list(validator_keys)
+        for netuid in range(1, subnets + 1):
+            miner_keys = [rng.randbytes(32) for _ in range(miners)]
+            neuron_keys.extend(miner_keys)
+            for public_key in miner_keys:
+                state.storage[stake_prefix + public_key.hex()] = cls.encode_stake(rng.randint(0, 999))
+            neurons = validator_keys + miner_keys
+            state.storage[storage_prefix(PALLET, "NetworksAdded") + u16_key(netuid)] = '0x01'
+            state.storage[storage_prefix(PALLET, "SubnetworkN") + u16_key(netuid)] = '0x' + u16_key(len(neurons))
+            for uid, public_key in enumerate(neurons):
+                state.storage[keys_prefix + u16_key(netuid) + u16_key(uid)] = '0x' + public_key.hex()
+
+        candidates = state.validators + parent_hotkeys
+        limit = validators * subnets * (len(candidates) - 1)
+        while len(state.edges) < min(edges, limit):
+            child = rng.choice(state.validators)
+            parent = rng.choice(candidates)
+            if parent != child:
+                state.edges.setdefault((parent, child, rng.randint(1, subnets)), rng.randint(1, 100) / 100)
+        for hotkey, stake in state.stakes.items():
+            state.storage[stake_prefix + public_keys[hotkey].hex()] = cls.encode_stake(stake)
+        state.set_parent_keys(state.edges, public_keys)
+        owner_prefix = storage_prefix(PALLET, "Owner")
+        for public_key in neuron_keys:
+            coldkey = rng.randbytes(32)
+            state.storage[owner_prefix + address_codec.blake2_128concat(public_key).hex()] = '0x' + coldkey.hex()
+            state.coldkeys[address_codec.ss58_encode(public_key)] = address_codec.ss58_encode(coldkey)
+        return state
+
+    @staticmethod
+    def encode_stake(stake: float) -> str:
+        """Encode a TotalHotkeyStake value from TAO."""
+        return '0x' + int(stake * 10**9).to_bytes(8, 'little').hex()
+
+    def set_parent_keys(self, edges: Dict[Tuple[str, str, int], float], public_keys: Dict[str, bytes]) -> None:
+        """Write the ParentKeys entries of the (child, net UID) pairs that have edges."""
+        parents: Dict[Tuple[str, int], List[Tuple[float, bytes]]] = {}
+        for (parent, child, netuid), proportion in edges.items():
+            parents.setdefault((child, netuid), []).append((proportion, public_keys[parent]))
+        prefix = storage_prefix(PALLET, "ParentKeys")
+        for (child, netuid), entries in parents.items():
+            key = prefix + address_codec.blake2_128concat(public_keys[child]).hex() + u16_key(netuid)
+            self.storage[key] = encode_parent_keys(entries)
+        self._sorted_keys = None
+
+    @classmethod
+    async def record_async(cls, sdk_call: RPCRequest, page_size: int = 1000) -> "ChainState":
+        """Copy every storage item in ``STORAGE_ENTRIES`` from a live node at its finalized block."""
+        block_number, block_hash = await sdk_call.pin_block_async()
+        runtime_version = await sdk_call.get_runtime_version_async(block_hash)
+        metadata = await sdk_call.get_metadata_async(block_hash)
+        storage: Dict[str, str] = {}
+        for name in STORAGE_ENTRIES:
+            keys = await sdk_call.get_keys_paged_async(storage_prefix(PALLET, name), page_size, block_hash)
+            values = await sdk_call.query_storage_at_async(keys, block_hash)
+            storage.update((key, value) for key, value in values.items() if value is not None)
+            logging.info(f"Recorded {len(keys)} {name} entries at block {block_number}")
+        return cls(storage, block_number, runtime_version["specVersion"], metadata)
+
+    @classmethod
+    def record(cls, endpoint: str, page_size: int = 1000) -> "ChainState":
+        """Record the storage read by the monitor from a live node (blocking)."""
+        sdk_call = RPCRequest(endpoint, FULL_PROPORTION, page_size)
+        return sdk_call.client.run(cls.record_async(sdk_call, page_size))
+
+    @classmethod
+    def load(cls, path: str) -> "ChainState":
+        """Read a state saved with ``save``."""
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data["storage"], data["block_number"], data["spec_version"], data.get("metadata"))
+
+    def save(self, path: str) -> None:
+        """Write the storage, block number, spec version and metadata to a JSON file."""
+        with open(path, "w") as f:
+            json.dump({
+                "block_number": self.block_number, "spec_version": self.spec_version,
+                "metadata": self._metadata, "storage": self.storage
+            }, f)
+
+    @property
+    def block_hash(self) -> str:
+        """Hash of the current block, derived from its number."""
+        return '0x' + hashlib.blake2b(self.block_number.to_bytes(8, 'little'), digest_size=32).hexdigest()
+
+    @property
+    def metadata(self) -> str:
+        """SCALE encoded runtime metadata, as hex."""
+        if self._metadata is None:
+            self._metadata = build_metadata()
+        return self._metadata
+
+    def block_number_of(self, block_hash: Optional[str]) -> int:
+        """Return the number of a block by hash, or of the latest block for None."""
+        if block_hash is None:
+            return self.block_number
+        block_number = self.block_numbers.get(block_hash)
+        if block_number is None:
+            raise UnknownBlock(block_hash)
+        return block_number
+
+    def storage_at(self, block_number: int) -> Dict[str, str]:
+        """Return the storage as it was at a block."""
+        if block_number == self.block_number:
+            return self.storage
+        storage = dict(self.storage)
+        for number in range(self.block_number, block_number, -1):
+            for key, value in self._undo[number].items():
+                if value is None:
+                    storage.pop(key, None)
+                else:
+                    storage[key] = value
+        return storage
+
+    def keys_paged(
+        self, prefix: str, count: int, start_key: Optional[str] = None, block_number: Optional[int] = None
+    ) -> List[str]:
+        """Return up to ``count`` keys under a prefix that sort after ``start_key``, at a block (default latest)."""
+        if block_number is None or block_number == self.block_number:
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self.storage)
+            sorted_keys = self._sorted_keys
+        else:
+            sorted_keys = sorted(self.storage_at(block_number))
+        start = bisect.bisect_right(sorted_keys, start_key) if start_key else bisect.bisect_left(sorted_keys, prefix)
+        keys = []
+        for key in itertools.islice(sorted_keys, start, None):
+            if len(keys) == count or not key.startswith(prefix):
+                break
+            keys.append(key)
+        return keys
+
+    def update(self, changes: Dict[str, Optional[str]]) -> None:
+        """Apply storage changes (None deletes a key) in a new block."""
+        self._undo[self.block_number + 1] = {key: self.storage.get(key) for key in changes}
+        for key, value in changes.items():
+            if value is None:
+                self.storage.pop(key, None)
+            else:
+                self.storage[key] = value
+        self.block_number += 1
+        self.block_numbers[self.block_hash] = self.block_number
+        self._sorted_keys = None
+
+
+class FakeSubstrateNode:
+    """Local JSON-RPC WebSocket server standing in for a subtensor node.
+
+    It serves the calls the monitor and the watcher make (``state_queryStorageAt``,
+    ``state_getKeysPaged``, ``state_subscribeStorage``, runtime version, metadata and
+    finalized head) from a ``ChainState``, on its own event loop in a background thread.
+    Reads at a block hash see the storage of that block; unknown hashes are an error.
+    Every response can be delayed by ``latency`` plus up to ``jitter`` seconds, and a
+    fraction of requests can fail with a JSON-RPC error or a dropped connection; failures
+    can also be queued for the next requests with ``inject_failures``.
+    """
+
+    def __init__(
+        self, chain: ChainState, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+        jitter: float = 0.0, error_rate: float = 0.0, disconnect_rate: float = 0.0, seed: int = 0
+    ) -> None:
+        """
+        Initialize the node; ``start`` begins serving.
+        :param chain: State to serve.
+        :param port: Port to listen on; 0 picks a free one.
+        :param latency: Seconds every response is delayed by.
+        :param jitter: Maximum extra random delay per response, in seconds.
+        :param error_rate: Fraction of requests answered with a JSON-RPC error.
+        :param disconnect_rate: Fraction of requests that close the connection instead of answering.
+        :param seed: Seed of the jitter and failure draws.
+        """
+        self.chain = chain
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.disconnect_rate = disconnect_rate
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+        self._injected: List[Tuple[Optional[str], bool]] = []
+        self._subscriptions: Dict[str, Tuple[object, List[str]]] = {}
+        self._subscription_ids = itertools.count(1)
+        self._server = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-substrate-node", daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        """WebSocket URL of the node."""
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Start serving and return the endpoint."""
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        logging.info(f"Fake substrate node listening on {self.endpoint}")
+        return self.endpoint
+
+    def stop(self) -> None:
+        """Close all connections and stop the server."""
+        async def _stop():
+            self._server.close()
+            await self._server.wait_closed()
+        asyncio.run_coroutine_threadsafe(_stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self) -> "FakeSubstrateNode":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def inject_failures(self, count: int = 1, method: Optional[str] = None, disconnect: bool = False) -> None:
+        """Fail the next ``count`` requests (of ``method``, if given) with an error or a dropped connection."""
+        self._injected.extend([(method, disconnect)] * count)
+
+    def update(self, changes: Dict[str, Optional[str]]) -> None:
+        """Apply storage changes in a new block and notify subscribers of the keys that changed."""
+        asyncio.run_coroutine_threadsafe(self._update(changes), self._loop).result()
+
+    async def _start(self) -> None:
+        """Open the listening socket on the node loop."""
+        self._server = await websockets.serve(self._handle, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _update(self, changes: Dict[str, Optional[str]]) -> None:
+        """Apply changes and push ``state_storage`` notifications, on the node loop."""
+        self.chain.update(changes)
+        for subscription_id, (ws, keys) in list(self._subscriptions.items()):
+            changed = [[key, self.chain.storage.get(key)] for key in keys if key in changes]
+            if changed:
+                await self._notify(ws, subscription_id, changed)
+
+    async def _handle(self, ws) -> None:
+        """Serve one connection; requests are answered concurrently, as a node does."""
+        tasks = set()
+        try:
+            async for message in ws:
+                task = asyncio.ensure_future(self._respond(ws, json.loads(message)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for subscription_id, (subscriber, _) in list(self._subscriptions.items()):
+                if subscriber is ws:
+                    del self._subscriptions[subscription_id]
+
+    async def _respond(self, ws, request: Dict) -> None:
+        """Answer one request after the configured delay, or fail it."""
+        method, params = request["method"], request.get("params", [])
+        self.requests[method] += 1
+        delay = self.latency + self._random.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        failure = self._next_failure(method)
+        try:
+            if failure == "disconnect":
+                await ws.close()
+                return
+            if failure == "error":
+                await ws.send(json.dumps({
+                    "jsonrpc": "2.0", "id": request["id"], "error": {"code": -32000, "message": "Injected failure"}
+                }))
+                return
+            try:
+                response = {"jsonrpc": "2.0", "id": request["id"], "result": self._result(ws, method, params)}
+            except UnknownBlock as e:
+                response = {"jsonrpc": "2.0", "id": request["id"],
+                            "error": {"code": 4003, "message": f"Client error: UnknownBlock: {e}"}}
+            except KeyError:
+                response = {"jsonrpc": "2.0", "id": request["id"],
+                            "error": {"code": -32601, "message": f"Method not found: {method}"}}
+            await ws.send(json.dumps(response))
+            if method == "state_subscribeStorage":
+                keys = params[0]
+                await self._notify(ws, response["result"], [[key, self.chain.storage.get(key)] for key in keys])
+        except websockets.ConnectionClosed:
+            pass
+
+    def _next_failure(self, method: str) -> Optional[str]:
+        """Return "error", "disconnect" or None for a request, consuming injected failures first."""
+        for i, (failing_method, disconnect) in enumerate(self._injected):
+            if failing_method is None or failing_method == method:
+                del self._injected[i]
+                return "disconnect" if disconnect else "error"
+        if self.disconnect_rate and self._random.random() < self.disconnect_rate:
+            return "disconnect"
+        if self.error_rate and self._random.random() < self.error_rate:
+            return "error"
+        return None
+
+    def _result(self, ws, method: str, params: List):
+        """Compute the result of a JSON-RPC call; raises KeyError for unknown methods."""
+        chain = self.chain
+
+        def at(index: int) -> int:
+            return chain.block_number_of(params[index] if len(params) > index else None)
+
+        if method == "state_queryStorageAt":
+            block_number = at(1)
+            storage = chain.storage_at(block_number)
+            block_hash = params[1] if len(params) > 1 and params[1] is not None else chain.block_hash
+            return [{"block": block_hash, "changes": [[key, storage.get(key)] for key in params[0]]}]
+        if method == "state_getKeysPaged":
+            prefix, count = params[0], params[1]
+            return chain.keys_paged(prefix, count, params[2] if len(params) > 2 else None, at(3))
+        if method == "state_getStorage":
+            return chain.storage_at(at(1)).get(params[0])
+        if method == "state_subscribeStorage":
+            subscription_id = f"sub-{next(self._subscription_ids)}"
+            self._subscriptions[subscription_id] = (ws, list(params[0]))
+            return subscription_id
+        if method == "state_unsubscribeStorage":
+            return self._subscriptions.pop(params[0], None) is not None
+        if method == "chain_getFinalizedHead":
+            return chain.block_hash
+        if method == "chain_getHeader":
+            block_number = chain.block_numbers.get(params[0]) if params else chain.block_number
+            return None if block_number is None else {"number": hex(block_number), "parentHash": "0x" + "00" * 32}
+        if method == "state_getRuntimeVersion":
+            at(0)
+            return {"specName": "node-subtensor", "specVersion": chain.spec_version}
+        if method == "state_getMetadata":
+            at(0)
+            return chain.metadata
+        raise KeyError(method)
+
+    async def _notify(self, ws, subscription_id: str, changes: List[List[Optional[str]]]) -> None:
+        """Send a ``state_storage`` notification for a subscription."""
+        await ws.send(json.dumps({
+            "jsonrpc": "2.0", "method": "state_storage",
+            "params": {"subscription": subscription_id, "result": {"block": self.chain.block_hash, "changes": changes}}
+        }))
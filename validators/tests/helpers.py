@@ -0,0 +1,62 @@
+import shutil
+import sqlite3
+import tempfile
+from django.db import connection, connections
+from validators.models import HotkeyModel, ChildHotkeyModel
+from find_parentkeys.database_manage.db_manage import DataBaseManager
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.storage_keys import storage_prefix
+from validators.tests.fake_node import ChainState, FakeSubstrateNode
+
+
+class StoredGraphMixin:
+    """Reads the stored hotkeys and edges back in the shape of a snapshot."""
+
+    def stored_graph(self):
+        stakes = dict(HotkeyModel.objects.values_list('hotkey', 'stake'))
+        edges = {
+            (parent, child, netuid): proportion
+            for parent, child, netuid, proportion in ChildHotkeyModel.objects.values_list(
+                'parent__hotkey', 'child__hotkey', 'netuid', 'proportion'
+            )
+        }
+        return stakes, edges
+
+
+class FakeNodeMixin:
+    """Serves a small synthetic chain from a local node for one test, with a scratch directory."""
+
+    def start_node(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.chain = ChainState.synthetic(validators=16, subnets=3, edges=40, miners=4)
+        self.node = FakeSubstrateNode(self.chain)
+        self.node.start()
+        self.addCleanup(self.node.stop)
+
+    def stake_key(self, hotkey):
+        return storage_prefix('SubtensorModule', 'TotalHotkeyStake') + address_codec.ss58_to_hex(hotkey)
+
+    def set_stake(self, hotkey, stake):
+        self.node.update({self.stake_key(hotkey): ChainState.encode_stake(stake)})
+
+
+class SQLiteFileMixin:
+    """Points the default connection at a migrated database file for one test, as a deployment does."""
+
+    def use_database_file(self, path):
+        settings_dict = connection.settings_dict
+        test_name = settings_dict['NAME']
+        # Closing the in-memory test database would destroy it, so it stays open while the file is used
+        keep_alive = sqlite3.connect(test_name, uri=True)
+        connections.close_all()
+        settings_dict['NAME'] = path
+
+        def restore():
+            connections.close_all()
+            settings_dict['NAME'] = test_name
+            connection.ensure_connection()
+            keep_alive.close()
+
+        self.addCleanup(restore)
+        DataBaseManager().migrate_db()
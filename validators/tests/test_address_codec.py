@@ -0,0 +1,50 @@
+import numpy as np
+from django.test import SimpleTestCase
+from find_parentkeys.utils import address_codec
+
+# Alice's well-known development public key and its addresses
+ALICE = bytes.fromhex('d43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d')
+ALICE_ADDRESSES = {
+    42: '5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY',
+    0: '15oF4uVJwmo4TdGW7VfQxNLavjCXviqxT9S1MgbjMNHr6Sp5',
+    2: 'HNZata7iMYWmk5RvZRTiAsSDhV8366zq2YGb3tLH5Upf74F',
+    255: 'yGHXkYLYqxijLKKfd9Q2CB9shRVu8rPNBS53wvwGTutYg4zTg',
+}
+
+
+class AddressCodecTests(SimpleTestCase):
+    """SS58 and Blake2_128Concat encoding against known Substrate vectors."""
+
+    def test_encode_known_addresses(self):
+        for ss58_format, address in ALICE_ADDRESSES.items():
+            self.assertEqual(address_codec.ss58_encode(ALICE, ss58_format), address)
+
+    def test_decode_round_trip(self):
+        for address in ALICE_ADDRESSES.values():
+            self.assertEqual(address_codec.ss58_decode(address), ALICE)
+        self.assertEqual(address_codec.ss58_to_hex(ALICE_ADDRESSES[42]), ALICE.hex())
+        self.assertEqual(address_codec.hex_to_ss58('0x' + ALICE.hex()), ALICE_ADDRESSES[42])
+
+    def test_bad_checksum_and_length_are_errors(self):
+        address = ALICE_ADDRESSES[42]
+        with self.assertRaises(ValueError):
+            address_codec.ss58_decode(address[:-1] + ('Z' if address[-1] != 'Z' else 'Y'))
+        with self.assertRaises(ValueError):
+            address_codec.ss58_decode(address[:-2])
+        with self.assertRaises(ValueError):
+            address_codec.ss58_encode(ALICE[:31])
+
+    def test_blake2_128concat_matches_system_account_key(self):
+        # Key fragment of System.Account for Alice: blake2_128 digest followed by the public key
+        self.assertEqual(address_codec.blake2_128concat(ALICE).hex(), 'de1e86a9a8c739864cf3cc5ec2bea59f' + ALICE.hex())
+        self.assertEqual(address_codec.ss58_to_blake2_128concat(ALICE_ADDRESSES[42]),
+                         address_codec.blake2_128concat(ALICE))
+
+    def test_encode_many_accepts_every_input_shape(self):
+        keys = [ALICE, bytes(32)]
+        expected = [address_codec.ss58_encode(key) for key in keys]
+        self.assertEqual(address_codec.ss58_encode_many(keys), expected)
+        self.assertEqual(address_codec.ss58_encode_many(b''.join(keys)), expected)
+        self.assertEqual(address_codec.ss58_encode_many(np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(2, 32)),
+                         expected)
+        self.assertEqual(address_codec.ss58_decode_many(expected).tobytes(), b''.join(keys))
@@ -0,0 +1,18 @@
+from django.test import SimpleTestCase
+from find_parentkeys.utils.change_set import ChangeDetector
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+
+
+class ChangeDetectorTests(SimpleTestCase):
+    """Baselines only move when the detected changes are committed."""
+
+    def test_uncommitted_changes_are_reported_again(self):
+        detector = ChangeDetector(stake_threshold=1.0)
+        self.assertIsNone(detector.detect(GraphSnapshot({'a': 10.0}, {}, 1, '0x01')))
+        detector.commit()
+        changed = GraphSnapshot({'a': 20.0}, {}, 2, '0x02')
+        self.assertEqual(detector.detect(changed).stakes_changed, {'a': (10.0, 20.0)})
+        # The write failed, so the baseline did not move
+        self.assertEqual(detector.detect(changed).stakes_changed, {'a': (10.0, 20.0)})
+        detector.commit()
+        self.assertEqual(len(detector.detect(changed)), 0)
@@ -0,0 +1,52 @@
+from unittest import skipUnless
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from validators.models import HotkeyModel, ChildHotkeyModel, SnapshotModel
+from find_parentkeys.database_manage.copy_writer import CopyGraphWriter
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+from validators.tests.helpers import StoredGraphMixin
+
+
+@skipUnless(connection.vendor == 'postgresql', "COPY merge needs the PostgreSQL backend (DB_BACKEND=postgres)")
+class CopyGraphWriterTests(StoredGraphMixin, TransactionTestCase):
+    """Merging snapshots into PostgreSQL through COPY staging tables."""
+
+    def test_merge_into_empty_tables(self):
+        snapshot = GraphSnapshot(
+            {'a': 10.0, 'b': 20.0, 'c': 30.0}, {('a', 'b', 1): 0.5, ('a', 'c', 3): 0.25}, 100, '0x01'
+        )
+        counts = CopyGraphWriter().merge_snapshot(snapshot)
+        self.assertEqual(tuple(counts), (3, 0, 2, 0, 0))
+        self.assertEqual(self.stored_graph(), (snapshot.stakes, snapshot.edges))
+        self.assertEqual(list(SnapshotModel.objects.values_list('block_number', flat=True)), [100])
+
+    def test_merge_applies_only_changes(self):
+        writer = CopyGraphWriter()
+        writer.merge_snapshot(GraphSnapshot(
+            {'a': 10.0, 'b': 20.0, 'c': 30.0}, {('a', 'b', 1): 0.5, ('a', 'c', 3): 0.25, ('b', 'c', 1): 0.1}
+        ))
+        ids = dict(HotkeyModel.objects.values_list('hotkey', 'id'))
+        edge_id = ChildHotkeyModel.objects.get(parent__hotkey='a', child__hotkey='b', netuid=1).id
+
+        current = GraphSnapshot({'a': 10.0, 'b': 25.0, 'd': 5.0}, {('a', 'b', 1): 0.5, ('a', 'd', 1): 0.75})
+        counts = writer.merge_snapshot(current)
+        # b changed stake and d is new; c and its edges are removed, a->b is unchanged
+        self.assertEqual(tuple(counts), (2, 1, 1, 0, 2))
+        self.assertEqual(self.stored_graph(), (current.stakes, current.edges))
+        self.assertEqual(HotkeyModel.objects.get(hotkey='a').id, ids['a'])
+        self.assertEqual(HotkeyModel.objects.get(hotkey='b').id, ids['b'])
+        self.assertEqual(ChildHotkeyModel.objects.get(parent__hotkey='a', child__hotkey='b', netuid=1).id, edge_id)
+
+    def test_merge_updates_proportions(self):
+        writer = CopyGraphWriter()
+        writer.merge_snapshot(GraphSnapshot({'a': 1.0, 'b': 2.0}, {('a', 'b', 1): 0.5}))
+        counts = writer.merge_snapshot(GraphSnapshot({'a': 1.0, 'b': 2.0}, {('a', 'b', 1): 0.75}))
+        self.assertEqual(tuple(counts), (0, 0, 0, 1, 0))
+        self.assertEqual(self.stored_graph()[1], {('a', 'b', 1): 0.75})
+
+    def test_merge_twice_in_one_transaction(self):
+        writer = CopyGraphWriter()
+        with transaction.atomic():
+            writer.merge_snapshot(GraphSnapshot({'a': 1.0, 'b': 2.0}, {('a', 'b', 1): 0.5}))
+            writer.merge_snapshot(GraphSnapshot({'a': 1.0, 'c': 3.0}, {('a', 'c', 2): 0.25}))
+        self.assertEqual(self.stored_graph(), ({'a': 1.0, 'c': 3.0}, {('a', 'c', 2): 0.25}))
@@ -0,0 +1,146 @@
+import os
+from datetime import timedelta
+from unittest import skipUnless
+from django.db import connection
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase
+from validators.models import HotkeyModel, SnapshotModel, ChangeModel
+from find_parentkeys.database_manage.db_manage import DataBaseManager
+from find_parentkeys.parentkey_monitor.monitor_parentkey import ParentkeyMonitor
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.change_set import STAKE_CHANGED
+from find_parentkeys.utils.storage_keys import storage_prefix
+from find_parentkeys.utils.subnet_fetcher import SubnetFetchError
+from validators.tests.fake_node import FULL_PROPORTION
+from validators.tests.helpers import FakeNodeMixin, SQLiteFileMixin, StoredGraphMixin
+
+
+class CycleTestsMixin(FakeNodeMixin, StoredGraphMixin):
+    """Full monitor cycles against the local stand-in node, run once per ``DB_REFRESH_MODE``."""
+
+    refresh_mode = None
+
+    def setUp(self):
+        self.start_node()
+        self.monitor = ParentkeyMonitor({
+            'CHAIN_ENDPOINT': self.node.endpoint,
+            'FULL_PROPORTION': FULL_PROPORTION,
+            'DATABASE_DIR': self.directory,
+            'DB_REFRESH_MODE': self.refresh_mode,
+            'ARCHIVE_SNAPSHOTS': False,
+        })
+
+    def expected_stakes(self):
+        hotkeys = set(self.chain.validators) | {parent for parent, _, _ in self.chain.edges}
+        return {hotkey: self.chain.stakes[hotkey] for hotkey in hotkeys}
+
+    def test_cycle_stores_chain_graph(self):
+        self.monitor.monitor_parentkeys()
+        self.assertEqual(self.stored_graph(), (self.expected_stakes(), self.chain.edges))
+        self.assertEqual(SnapshotModel.objects.get().block_hash, self.chain.block_hash)
+        self.assertEqual(self.node.requests['state_getMetadata'], 1)
+
+    def test_cycle_records_changes(self):
+        self.monitor.monitor_parentkeys()
+        hotkey = self.chain.validators[0]
+        old_stake = self.chain.stakes[hotkey]
+        self.set_stake(hotkey, old_stake + 100)
+        self.monitor.monitor_parentkeys()
+        self.assertEqual(HotkeyModel.objects.get(hotkey=hotkey).stake, old_stake + 100)
+        change = ChangeModel.objects.get()
+        self.assertEqual((change.kind, change.hotkey, change.old_value, change.new_value),
+                         (STAKE_CHANGED, hotkey, old_stake, old_stake + 100))
+        self.assertEqual(change.block_number, self.chain.block_number)
+
+    def test_history_is_kept_across_cycles(self):
+        self.monitor.monitor_parentkeys()
+        hotkey = self.chain.validators[0]
+        old_stake = self.chain.stakes[hotkey]
+        self.set_stake(hotkey, old_stake + 100)
+        self.monitor.monitor_parentkeys()
+        change_block = self.chain.block_number
+        self.node.update({})
+        self.monitor.monitor_parentkeys()
+        change = ChangeModel.objects.get()
+        self.assertEqual((change.hotkey, change.old_value, change.new_value, change.block_number),
+                         (hotkey, old_stake, old_stake + 100, change_block))
+        self.assertEqual(list(SnapshotModel.objects.order_by('id').values_list('block_number', flat=True)),
+                         [change_block - 1, change_block, change_block + 1])
+        self.assertEqual(HotkeyModel.objects.get(hotkey=hotkey).stake, old_stake + 100)
+
+    def test_history_outside_retention_is_dropped(self):
+        self.monitor.monitor_parentkeys()
+        hotkey = self.chain.validators[0]
+        self.set_stake(hotkey, self.chain.stakes[hotkey] + 100)
+        self.monitor.monitor_parentkeys()
+        expired = timezone.now() - timedelta(days=31)
+        SnapshotModel.objects.filter(block_number=self.chain.block_number - 1).update(created_at=expired)
+        ChangeModel.objects.update(created_at=expired)
+        self.node.update({})
+        self.monitor.monitor_parentkeys()
+        self.assertFalse(ChangeModel.objects.exists())
+        self.assertEqual(list(SnapshotModel.objects.order_by('id').values_list('block_number', flat=True)),
+                         [self.chain.block_number - 1, self.chain.block_number])
+
+    def test_failed_cycle_keeps_previous_state(self):
+        self.monitor.monitor_parentkeys()
+        hotkey = self.chain.validators[0]
+        self.set_stake(hotkey, 1.5e6)
+        self.node.inject_failures(method='state_queryStorageAt')
+        with self.assertRaises(SubnetFetchError):
+            self.monitor.monitor_parentkeys()
+        self.assertEqual(HotkeyModel.objects.get(hotkey=hotkey).stake, self.chain.stakes[hotkey])
+        self.monitor.monitor_parentkeys()
+        self.assertEqual(HotkeyModel.objects.get(hotkey=hotkey).stake, 1.5e6)
+
+    def test_cycle_drops_keys_of_departed_hotkeys(self):
+        departed = address_codec.ss58_encode(bytes(32))
+        self.monitor.key_index.map_key(storage_prefix('SubtensorModule', 'TotalHotkeyStake'), departed)
+        self.monitor.monitor_parentkeys()
+        self.assertNotIn(departed, self.monitor.key_index)
+        self.assertIn(self.chain.validators[0], self.monitor.key_index)
+
+    def test_dropped_connection_reconnects(self):
+        self.node.inject_failures(method='chain_getHeader', disconnect=True)
+        with self.assertRaises(ConnectionError):
+            self.monitor.monitor_parentkeys()
+        self.assertFalse(HotkeyModel.objects.exists())
+        self.monitor.monitor_parentkeys()
+        self.assertEqual(self.stored_graph(), (self.expected_stakes(), self.chain.edges))
+
+
+class IncrementalCycleTests(CycleTestsMixin, TestCase):
+    """Cycles applied as deltas (or merged, on PostgreSQL) in the test database."""
+
+    refresh_mode = 'incremental'
+
+
+@skipUnless(connection.vendor == 'sqlite', "Rebuild mode swaps SQLite files")
+class RebuildCycleTests(SQLiteFileMixin, CycleTestsMixin, TransactionTestCase):
+    """Cycles in the default rebuild mode, swapping a new database file in every time."""
+
+    refresh_mode = 'rebuild'
+
+    def setUp(self):
+        super().setUp()
+        self.use_database_file(os.path.join(self.directory, 'db.sqlite3'))
+
+    def test_swap_replaces_configured_database(self):
+        self.monitor.monitor_parentkeys()
+        live_path = connection.settings_dict['NAME']
+        with DataBaseManager().build_and_swap(keep=(SnapshotModel,)):
+            HotkeyModel.objects.create(hotkey='swapped', stake=1.0)
+        self.assertEqual(connection.settings_dict['NAME'], live_path)
+        self.assertEqual(list(HotkeyModel.objects.values_list('hotkey', flat=True)), ['swapped'])
+        self.assertEqual(SnapshotModel.objects.count(), 1)
+        self.assertFalse(os.path.exists(live_path + '.build'))
+
+    def test_failed_build_keeps_live_database(self):
+        self.monitor.monitor_parentkeys()
+        stored = self.stored_graph()
+        with self.assertRaises(RuntimeError):
+            with DataBaseManager().build_and_swap():
+                HotkeyModel.objects.create(hotkey='partial', stake=1.0)
+                raise RuntimeError("build failed")
+        self.assertEqual(self.stored_graph(), stored)
+        self.assertFalse(os.path.exists(connection.settings_dict['NAME'] + '.build'))
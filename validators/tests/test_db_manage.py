@@ -0,0 +1,30 @@
+from unittest import mock
+from django.db import connection
+from django.test import TestCase
+from find_parentkeys.database_manage.db_manage import DataBaseManager, code_schema_fingerprint, schema_fingerprint
+
+
+class MigrateDbTests(TestCase):
+    """``migrate_db`` only runs migrations when the applied set differs from the shipped one."""
+
+    def setUp(self):
+        patcher = mock.patch('find_parentkeys.database_manage.db_manage.call_command')
+        self.call_command = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fingerprint_ignores_order(self):
+        self.assertEqual(schema_fingerprint([('a', '0001'), ('b', '0002')]),
+                         schema_fingerprint([('b', '0002'), ('a', '0001')]))
+        self.assertNotEqual(schema_fingerprint([('a', '0001')]), schema_fingerprint([('a', '0002')]))
+
+    def test_current_schema_skips_migrate(self):
+        manager = DataBaseManager()
+        self.assertEqual(manager.applied_schema_fingerprint(), code_schema_fingerprint())
+        manager.migrate_db()
+        self.call_command.assert_not_called()
+
+    def test_changed_schema_migrates(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM django_migrations WHERE app = 'validators'")
+        DataBaseManager().migrate_db()
+        self.call_command.assert_called_once_with('migrate', verbosity=0)
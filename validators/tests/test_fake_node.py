@@ -0,0 +1,59 @@
+import os
+import asyncio
+from django.test import SimpleTestCase
+from find_parentkeys.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.rpc_client import RPCError, get_rpc_client
+from validators.tests.fake_node import FULL_PROPORTION, ChainState
+from validators.tests.helpers import FakeNodeMixin
+
+
+class FakeSubstrateNodeTests(FakeNodeMixin, SimpleTestCase):
+    """The stand-in node serves storage per block, notifies subscribers and can be recorded."""
+
+    def setUp(self):
+        self.start_node()
+        self.sdk_call = RPCRequest(self.node.endpoint, FULL_PROPORTION)
+
+    def test_reads_see_the_requested_block(self):
+        hotkey = self.chain.validators[0]
+        key = self.stake_key(hotkey)
+        old_value = self.chain.storage[key]
+        old_block, old_hash = self.sdk_call.pin_block()
+        added = key[:-2] + 'ff'
+        self.node.update({key: ChainState.encode_stake(42), added: ChainState.encode_stake(1)})
+        self.assertEqual(self.sdk_call.query_storage_at([key, added], old_hash), {key: old_value, added: None})
+        self.assertEqual(self.sdk_call.query_storage_at([key])[key], ChainState.encode_stake(42))
+        prefix = key[:66]
+        self.assertNotIn(added, self.sdk_call.get_keys_paged(prefix, block_hash=old_hash))
+        self.assertIn(added, self.sdk_call.get_keys_paged(prefix))
+        self.assertEqual(self.sdk_call.pin_block(), (old_block + 1, self.chain.block_hash))
+
+    def test_unknown_block_is_an_error(self):
+        with self.assertRaises(RPCError):
+            self.sdk_call.query_storage_at([self.stake_key(self.chain.validators[0])], '0x' + '11' * 32)
+
+    def test_storage_subscription_notifies_changes(self):
+        client = get_rpc_client(self.node.endpoint)
+        key = self.stake_key(self.chain.validators[0])
+        old_value = self.chain.storage[key]
+
+        async def subscribe_and_update():
+            subscription_id = await client.subscribe('state_subscribeStorage', [[key]])
+            initial = await client.next_notification(subscription_id, 5)
+            await asyncio.to_thread(self.node.update, {key: ChainState.encode_stake(42)})
+            update = await client.next_notification(subscription_id, 5)
+            await client.unsubscribe('state_unsubscribeStorage', subscription_id)
+            return initial, update
+
+        initial, update = asyncio.run(subscribe_and_update())
+        self.assertEqual(initial['changes'], [[key, old_value]])
+        self.assertEqual(update['changes'], [[key, ChainState.encode_stake(42)]])
+        self.assertEqual(update['block'], self.chain.block_hash)
+
+    def test_record_round_trip(self):
+        recorded = ChainState.record(self.node.endpoint, page_size=50)
+        self.assertEqual(recorded.storage, self.chain.storage)
+        self.assertEqual((recorded.block_number, recorded.spec_version), (self.chain.block_number, 100))
+        path = os.path.join(self.directory, 'chain.json')
+        recorded.save(path)
+        self.assertEqual(ChainState.load(path).storage, self.chain.storage)
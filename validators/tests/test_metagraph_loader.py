@@ -0,0 +1,42 @@
+import os
+from django.test import SimpleTestCase
+from find_childkey.utils.get_validator import get_subnet_validators
+from find_parentkeys.utils.get_parentkey import RPCRequest
+from find_parentkeys.utils.metagraph_loader import MetagraphLoader
+from find_parentkeys.utils.runtime_metadata import RuntimeResolver
+from validators.tests.fake_node import FULL_PROPORTION
+from validators.tests.helpers import FakeNodeMixin
+
+
+class MetagraphLoaderTests(FakeNodeMixin, SimpleTestCase):
+    """Subnet columns read from storage by the lite loader against the local stand-in node."""
+
+    def setUp(self):
+        self.start_node()
+        sdk_call = RPCRequest(self.node.endpoint, FULL_PROPORTION)
+        runtime = RuntimeResolver(os.path.join(self.directory, 'runtime_metadata.json'))
+        runtime.resolve(sdk_call)
+        self.loader = MetagraphLoader(sdk_call, runtime)
+
+    def test_subnets(self):
+        self.assertEqual(self.loader.get_subnets(), [1, 2, 3])
+
+    def test_load_reads_hotkeys_and_stakes(self):
+        metagraph = self.loader.load(1)
+        self.assertEqual(len(metagraph), 16 + 4)
+        self.assertEqual(metagraph.uids.tolist(), list(range(20)))
+        self.assertEqual(metagraph.hotkeys[:16].tolist(), self.chain.validators)
+        self.assertEqual(metagraph.stakes[:16].tolist(), [self.chain.stakes[hotkey] for hotkey in self.chain.validators])
+        self.assertIsNone(metagraph.coldkeys)
+
+    def test_load_reads_coldkeys_on_request(self):
+        metagraph = self.loader.load(2, coldkeys=True)
+        self.assertEqual(metagraph.coldkeys.tolist(),
+                         [self.chain.coldkeys[hotkey] for hotkey in metagraph.hotkeys.tolist()])
+
+    def test_childkey_validators_come_with_coldkeys(self):
+        validators = get_subnet_validators(3, self.loader)
+        self.assertEqual([validator['hotkey'] for validator in validators], self.chain.validators)
+        for validator in validators:
+            self.assertEqual(validator['coldkey'], self.chain.coldkeys[validator['hotkey']])
+            self.assertEqual((validator['stake'], validator['net_uid']), (self.chain.stakes[validator['hotkey']], 3))
@@ -0,0 +1,26 @@
+import numpy as np
+from django.test import SimpleTestCase
+from find_parentkeys.utils.registration_index import RegistrationIndex
+
+
+class RegistrationIndexTests(SimpleTestCase):
+    """ParentKeys pairs pruned to the subnets each hotkey is registered on."""
+
+    def setUp(self):
+        self.index = RegistrationIndex()
+        self.index.add(1, np.array(['a', 'b'], dtype=object))
+        self.index.add(2, ['b'])
+        self.index.add(5, ['a'])
+
+    def test_pairs_are_limited_to_registered_monitored_subnets(self):
+        self.assertEqual(self.index.pairs(['a', 'b'], [1, 2, 3]), [('a', 1), ('b', 1), ('b', 2)])
+        self.assertEqual(self.index.netuids('a'), [1, 5])
+
+    def test_unknown_hotkeys_keep_every_subnet(self):
+        self.assertEqual(self.index.pairs(['c'], [1, 2, 3]), [('c', 1), ('c', 2), ('c', 3)])
+        self.assertEqual(self.index.netuids('c'), [])
+
+    def test_membership_and_iteration(self):
+        self.assertIn('a', self.index)
+        self.assertNotIn('c', self.index)
+        self.assertEqual((sorted(self.index), len(self.index)), (['a', 'b'], 2))
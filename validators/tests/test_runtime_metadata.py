@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+from find_parentkeys.utils.runtime_metadata import STORAGE_ITEMS, RuntimeResolver
+from find_parentkeys.utils.storage_keys import storage_prefix
+from validators.tests.fake_node import build_metadata
+
+
+class RuntimeResolverTests(SimpleTestCase):
+    """Storage items resolved from encoded runtime metadata."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.metadata = build_metadata()
+
+    def test_prefixes_match_the_item_names(self):
+        resolver = RuntimeResolver('unused.json')
+        resolver.items = resolver.decode_metadata(self.metadata)
+        for name, (pallet, item, _, _) in STORAGE_ITEMS.items():
+            self.assertEqual(resolver.prefix(name), storage_prefix(pallet, item))
+
+    def test_unexpected_value_type_is_an_error(self):
+        resolver = RuntimeResolver('unused.json', {
+            "TotalHotkeyStake": ("SubtensorModule", "TotalHotkeyStake", ["Identity"], "u128"),
+        })
+        with self.assertRaisesMessage(ValueError, "value type u64, expected u128"):
+            resolver.decode_metadata(self.metadata)
+
+    def test_unexpected_hashers_are_an_error(self):
+        resolver = RuntimeResolver('unused.json', {
+            "ParentKeys": ("SubtensorModule", "ParentKeys", ["Identity", "Identity"], "Vec<(u64, AccountId32)>"),
+        })
+        with self.assertRaisesMessage(ValueError, "key hashers"):
+            resolver.decode_metadata(self.metadata)
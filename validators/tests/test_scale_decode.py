@@ -0,0 +1,76 @@
+import random
+from django.test import SimpleTestCase
+from scalecodec.base import RuntimeConfiguration, ScaleBytes
+from scalecodec.type_registry import load_type_registry_preset
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.scale_decode import decode_compact, decode_parent_keys_array, decode_parent_keys_many
+from validators.tests.fake_node import FULL_PROPORTION, encode_parent_keys
+
+
+def old_parse_parent_keys(parent_hex):
+    """The per-entry hex slicing parser the bulk decoder replaced; only handles one-byte lengths."""
+    entries = []
+    for i in range(4, len(parent_hex), 80):
+        entry = parent_hex[i:i + 80]
+        proportion = int(''.join(reversed([entry[j:j + 2] for j in range(0, 16, 2)])), 16)
+        entries.append((address_codec.hex_to_ss58(entry), round(proportion / FULL_PROPORTION, 4)))
+    return entries
+
+
+class ScaleDecodeTests(SimpleTestCase):
+    """The NumPy ParentKeys decoder against the old parser and the reference SCALE codec."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.runtime_config = RuntimeConfiguration()
+        cls.runtime_config.update_type_registry(load_type_registry_preset("core"))
+        cls.runtime_config.update_type_registry(load_type_registry_preset("legacy"))
+
+    def payload(self, count, seed=0):
+        rng = random.Random(seed)
+        return encode_parent_keys([(rng.randint(1, 100) / 100, rng.randbytes(32)) for _ in range(count)])
+
+    def decoded(self, records):
+        return [
+            (address_codec.ss58_encode(bytes(account)), round(int(proportion) / FULL_PROPORTION, 4))
+            for proportion, account in zip(records['proportion'].tolist(), records['account'])
+        ]
+
+    def test_compact_modes_match_the_reference_codec(self):
+        for value in (0, 1, 63, 64, 16383, 16384, 2**30 - 1, 2**30, 2**64 - 1):
+            encoded = self.runtime_config.create_scale_object('Compact<u128>').encode(value).data
+            self.assertEqual(decode_compact(encoded + b'\xff'), (value, len(encoded)), value)
+
+    def test_matches_old_parser_on_one_byte_lengths(self):
+        values = [self.payload(count, seed) for seed, count in enumerate((0, 1, 7, 63))]
+        records, counts = decode_parent_keys_many(values)
+        self.assertEqual(counts.tolist(), [0, 1, 7, 63])
+        self.assertEqual(self.decoded(records), [entry for value in values for entry in old_parse_parent_keys(value)])
+
+    def test_multi_byte_lengths_match_the_reference_codec(self):
+        values = [self.payload(64, 1), self.payload(3, 2), self.payload(16384, 3)]
+        records, counts = decode_parent_keys_many(values)
+        self.assertEqual(counts.tolist(), [64, 3, 16384])
+        expected = []
+        for value in values:
+            scale_object = self.runtime_config.create_scale_object('Vec<(u64, AccountId)>', data=ScaleBytes(value))
+            expected.extend(
+                (address_codec.hex_to_ss58(account), round(proportion / FULL_PROPORTION, 4))
+                for proportion, account in scale_object.decode()
+            )
+        self.assertEqual(self.decoded(records), expected)
+
+    def test_single_value_and_bytes_input(self):
+        value = self.payload(70, 4)
+        self.assertEqual(self.decoded(decode_parent_keys_array(value)),
+                         self.decoded(decode_parent_keys_many([bytes.fromhex(value[2:])])[0]))
+
+    def test_malformed_values_are_errors(self):
+        value = self.payload(2)
+        with self.assertRaises(ValueError):
+            decode_parent_keys_many([value[:-2]])
+        with self.assertRaises(ValueError):
+            decode_parent_keys_many([value + '00'])
+        with self.assertRaises(ValueError):
+            decode_parent_keys_array(value[:-2])
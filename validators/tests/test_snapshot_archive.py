@@ -0,0 +1,70 @@
+import os
+import time
+import shutil
+import tempfile
+from django.test import SimpleTestCase
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+from find_parentkeys.utils.snapshot_archive import SnapshotArchive
+
+
+class SnapshotArchiveTests(SimpleTestCase):
+    """Appending, compacting, expiring and reading back archived snapshots."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def snapshot(self, block_number):
+        return GraphSnapshot(
+            {'a': 10.0 + block_number, 'b': 20.0}, {('a', 'b', 1): 0.5, ('b', 'c', 2): block_number / 100},
+            block_number
+        )
+
+    def test_snapshot_at_rebuilds_archived_block(self):
+        archive = SnapshotArchive(self.directory)
+        self.assertTrue(archive.append(self.snapshot(5)))
+        self.assertFalse(archive.append(self.snapshot(5)))
+        restored = archive.snapshot_at(5)
+        expected = self.snapshot(5)
+        self.assertEqual((restored.stakes, restored.edges, restored.block_number),
+                         ({**expected.stakes, 'c': 0.0}, expected.edges, 5))
+        self.assertIsNone(archive.snapshot_at(6))
+
+    def test_compaction_merges_single_cycle_segments(self):
+        archive = SnapshotArchive(self.directory, compact_segments=3)
+        for block_number in (1, 2, 3):
+            archive.append(self.snapshot(block_number))
+        self.assertEqual(archive.segment_names(), ['000000000001-000000000003'])
+        self.assertEqual(archive.snapshot_at(2).edges[('b', 'c', 2)], 0.02)
+        blocks, _, stakes = archive.stake_history('a')
+        self.assertEqual((blocks.tolist(), stakes.tolist()), ([1, 2, 3], [11.0, 12.0, 13.0]))
+
+    def test_retention_drops_expired_snapshots(self):
+        archive = SnapshotArchive(self.directory, retention_days=1, compact_segments=2)
+        now = time.time()
+        archive.append(self.snapshot(1), timestamp=now - 3 * 86400)
+        self.assertEqual(len(archive), 0)
+        archive.append(self.snapshot(2), timestamp=now - 0.5 * 86400)
+        archive.append(self.snapshot(3), timestamp=now)
+        self.assertEqual(archive.segment_names(), ['000000000002-000000000003'])
+        # The compacted segment is partly expired a day later and is rewritten without block 2
+        archive.retention_days = 0.25
+        archive.apply_retention()
+        self.assertEqual(archive.blocks['block_number'].tolist(), [3])
+        self.assertEqual(archive.snapshot_at(3).stakes['a'], 13.0)
+
+    def test_sources_left_by_an_interrupted_merge_are_removed(self):
+        archive = SnapshotArchive(self.directory)
+        archive.append(self.snapshot(1))
+        archive.append(self.snapshot(2))
+        source = os.path.join(self.directory, '000000000001-000000000001')
+        backup = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, backup, True)
+        shutil.copytree(source, os.path.join(backup, 'source'))
+        archive.compact()
+        # As if the process died after the merged segment was renamed into place
+        shutil.move(os.path.join(backup, 'source'), source)
+        os.makedirs(os.path.join(self.directory, '.000000000003-000000000003.tmp'))
+        archive = SnapshotArchive(self.directory)
+        self.assertEqual(os.listdir(self.directory), ['000000000001-000000000002'])
+        self.assertEqual(archive.blocks['block_number'].tolist(), [1, 2])
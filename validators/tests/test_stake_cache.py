@@ -0,0 +1,45 @@
+from unittest import mock
+from django.test import SimpleTestCase
+from find_parentkeys.utils.stake_cache import StakeCache
+
+
+class StakeCacheTests(SimpleTestCase):
+    """Expiry, LRU eviction and per-block keys of the stake cache."""
+
+    def setUp(self):
+        patcher = mock.patch('find_parentkeys.utils.stake_cache.time.monotonic', return_value=100.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_are_keyed_by_block(self):
+        cache = StakeCache()
+        cache.put('a', '0x01', 5.0)
+        self.assertEqual(cache.get('a', '0x01'), 5.0)
+        self.assertIsNone(cache.get('a', '0x02'))
+        self.assertEqual(cache.get_many(['a', 'b'], '0x01'), ({'a': 5.0}, ['b']))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_entries_expire_after_ttl(self):
+        cache = StakeCache(ttl=10)
+        cache.put('a', '0x01', 5.0)
+        self.clock.return_value = 110.0
+        self.assertEqual(cache.get('a', '0x01'), 5.0)
+        self.clock.return_value = 110.5
+        self.assertIsNone(cache.get('a', '0x01'))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = StakeCache(max_size=2)
+        cache.put_many({'a': 1.0, 'b': 2.0}, '0x01')
+        cache.get('a', '0x01')
+        cache.put('c', '0x01', 3.0)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b', '0x01'))
+        self.assertEqual((cache.get('a', '0x01'), cache.get('c', '0x01')), (1.0, 3.0))
+
+    def test_clear(self):
+        cache = StakeCache()
+        cache.put('a', '0x01', 5.0)
+        cache.get('a', '0x01')
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+from find_parentkeys.utils.graph_snapshot import GraphSnapshot
+from find_parentkeys.utils.stake_graph import StakeGraph
+
+
+class StakeGraphTests(SimpleTestCase):
+    """Effective stake and edge lookups over the in-memory graph."""
+
+    def setUp(self):
+        # c has two parents on subnet 1; a delegates on two subnets; d only appears as a child
+        self.graph = StakeGraph(GraphSnapshot(
+            {'a': 100.0, 'b': 40.0, 'c': 10.0},
+            {('a', 'c', 1): 0.5, ('b', 'c', 1): 0.25, ('a', 'b', 2): 0.1, ('c', 'd', 2): 1.0},
+            7
+        ))
+
+    def test_effective_stake_with_multiple_parents(self):
+        self.assertEqual(self.graph.effective_stake_map(1), {'a': 50.0, 'b': 30.0, 'c': 70.0, 'd': 0.0})
+        self.assertEqual(self.graph.parents('c', 1), {'a': 0.5, 'b': 0.25})
+
+    def test_effective_stake_per_subnet(self):
+        self.assertEqual(self.graph.effective_stake_map(2), {'a': 90.0, 'b': 50.0, 'c': 0.0, 'd': 10.0})
+        # A subnet without edges leaves every hotkey with its own stake
+        self.assertEqual(self.graph.effective_stake_map(3), {'a': 100.0, 'b': 40.0, 'c': 10.0, 'd': 0.0})
+        for net_uid in (1, 2, 3):
+            for hotkey, stake in self.graph.effective_stake_map(net_uid).items():
+                self.assertAlmostEqual(self.graph.effective_stake(hotkey, net_uid), stake)
+        self.assertEqual(sorted(self.graph.all_children('a')), [('b', 2, 0.1), ('c', 1, 0.5)])
+
+    def test_empty_graph(self):
+        graph = StakeGraph(GraphSnapshot())
+        self.assertEqual(len(graph), 0)
+        self.assertEqual(len(graph.effective_stakes(1)), 0)
+        self.assertEqual(graph.effective_stake_map(1), {})
+        self.assertEqual((graph.children('a', 1), graph.parents('a', 1), graph.all_parents('a')), ({}, {}, []))
+        self.assertNotIn('a', graph)
@@ -0,0 +1,48 @@
+import os
+import tempfile
+from django.test import SimpleTestCase
+from find_parentkeys.utils import address_codec
+from find_parentkeys.utils.storage_keys import StorageKeyIndex, storage_prefix, twox128, u16_from_key, u16_key
+
+ALICE = '5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY'
+
+
+class StorageKeysTests(SimpleTestCase):
+    """Storage key building and decoding, including net UIDs that do not fit in one byte."""
+
+    def test_twox128_matches_known_prefix(self):
+        self.assertEqual(twox128('System'), '26aa394eea5630e07c48ae0c9558cef7')
+        self.assertEqual(storage_prefix('System', 'Account'), '0x26aa394eea5630e07c48ae0c9558cef7b99d880ec681799c0cf30e8886371da9')
+
+    def test_u16_keys_are_little_endian(self):
+        self.assertEqual(u16_key(1), '0100')
+        self.assertEqual(u16_key(256), '0001')
+        self.assertEqual(u16_key(300), '2c01')
+        for value in (0, 15, 16, 255, 256, 300, 65535):
+            self.assertEqual(u16_from_key('0xabcd' + u16_key(value)), value)
+
+    def test_double_map_key_round_trip_above_255(self):
+        index = StorageKeyIndex()
+        prefix = storage_prefix('SubtensorModule', 'ParentKeys')
+        key = index.double_map_key(prefix, ALICE, 300)
+        self.assertEqual(key, prefix + address_codec.ss58_to_blake2_128concat(ALICE).hex() + '2c01')
+        self.assertEqual(index.lookup(key), (ALICE, 300))
+        # A key returned by the node that this index did not build decodes to the same entry
+        self.assertEqual(StorageKeyIndex().decode_double_map_key(prefix, key), (ALICE, 300))
+
+    def test_retain_and_persist_fragments(self):
+        index = StorageKeyIndex()
+        prefix = storage_prefix('SubtensorModule', 'TotalHotkeyStake')
+        other = address_codec.ss58_encode(bytes(32))
+        alice_key = index.map_key(prefix, ALICE)
+        other_key = index.map_key(prefix, other)
+        index.retain({ALICE})
+        self.assertEqual((ALICE in index, other in index), (True, False))
+        self.assertEqual((index.lookup(alice_key), index.lookup(other_key)), ((ALICE, None), None))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'storage_keys.json')
+            index.save(path)
+            loaded = StorageKeyIndex()
+            loaded.load(path)
+            self.assertEqual(loaded.fragment(ALICE), index.fragment(ALICE))
+            self.assertEqual(len(loaded), 1)
@@ -0,0 +1,32 @@
+import asyncio
+from django.test import SimpleTestCase
+from find_parentkeys.utils.subnet_fetcher import SubnetFetcher, SubnetFetchError
+
+
+async def fetch(netuid):
+    """Fetch that fails on subnet 2, hangs on subnet 3 and returns the net UID otherwise."""
+    if netuid == 2:
+        raise RuntimeError("boom")
+    if netuid == 3:
+        await asyncio.sleep(10)
+    return netuid * 10
+
+
+class SubnetFetcherTests(SimpleTestCase):
+    """Per-subnet failures, timeouts and the failure budget."""
+
+    def test_failures_within_budget_are_skipped(self):
+        fetcher = SubnetFetcher(workers=2, timeout=0.05, max_failures=2)
+        self.assertEqual(asyncio.run(fetcher.fetch_async([1, 2, 3, 4], fetch)), {1: 10, 4: 40})
+        self.assertEqual(fetcher.failures, {2: "RuntimeError: boom", 3: "timed out after 0.05s"})
+
+    def test_too_many_failures_raise(self):
+        fetcher = SubnetFetcher(timeout=0.05, max_failures=1)
+        with self.assertRaises(SubnetFetchError) as raised:
+            asyncio.run(fetcher.fetch_async([1, 2, 3], fetch))
+        self.assertEqual(sorted(raised.exception.failures), [2, 3])
+
+    def test_default_budget_tolerates_no_failure(self):
+        with self.assertRaises(SubnetFetchError):
+            asyncio.run(SubnetFetcher().fetch_async([1, 2], fetch))
+        self.assertEqual(asyncio.run(SubnetFetcher().fetch_async([1, 4], fetch)), {1: 10, 4: 40})
@@ -0,0 +1,36 @@
+import numpy as np
+from django.test import SimpleTestCase
+from find_parentkeys.utils.validator_selection import ValidatorSelector
+
+
+class ValidatorSelectorTests(SimpleTestCase):
+    """Subnet and validator selection rules."""
+
+    stakes = np.array([500.0, 1000.0, 1000.5, 5000.0, 2000.0, 5000.0])
+
+    def test_threshold_is_exclusive(self):
+        self.assertEqual(ValidatorSelector().select(self.stakes).tolist(), [2, 3, 4, 5])
+        self.assertEqual(ValidatorSelector(stake_threshold=2000).select(self.stakes).tolist(), [3, 5])
+        self.assertEqual(ValidatorSelector().select(np.empty(0)).tolist(), [])
+
+    def test_top_n_keeps_highest_stakes_in_uid_order(self):
+        self.assertEqual(ValidatorSelector(top_n=2).select(self.stakes).tolist(), [3, 5])
+        self.assertEqual(ValidatorSelector(top_n=3).select(self.stakes).tolist(), [3, 4, 5])
+        self.assertEqual(ValidatorSelector(top_n=10).select(self.stakes).tolist(), [2, 3, 4, 5])
+
+    def test_select_hotkeys(self):
+        hotkeys = ['a', 'b', 'c', 'd', 'e', 'f']
+        self.assertEqual(ValidatorSelector(top_n=1).select_hotkeys(hotkeys, self.stakes).tolist(), ['d'])
+
+    def test_subnets_skip_root_unless_included(self):
+        netuids = [0, 1, 2, 3, 4]
+        self.assertEqual(ValidatorSelector().select_subnets(netuids), [1, 2, 3, 4])
+        self.assertEqual(ValidatorSelector(subnet_include=[0, 2, 9]).select_subnets(netuids), [0, 2])
+        self.assertEqual(ValidatorSelector(subnet_exclude=[3]).select_subnets(netuids), [1, 2, 4])
+        self.assertEqual(ValidatorSelector(subnet_include=[2, 3], subnet_exclude=[3]).select_subnets(netuids), [2])
+        self.assertEqual(ValidatorSelector(subnet_include=[]).select_subnets(netuids), [1, 2, 3, 4])
+
+    def test_merge_deduplicates_across_subnets(self):
+        merged = ValidatorSelector().merge([np.array(['b', 'a'], dtype=object), np.array(['a', 'c'], dtype=object)])
+        self.assertEqual(merged.tolist(), ['a', 'b', 'c'])
+        self.assertEqual(ValidatorSelector().merge([]).tolist(), [])
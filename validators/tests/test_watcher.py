@@ -0,0 +1,60 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import TransactionTestCase
+from validators.models import SnapshotModel, ChangeModel
+from find_parentkeys.parentkey_monitor.watch_parentkey import ParentkeyWatcher
+from find_parentkeys.utils.change_set import STAKE_CHANGED
+from validators.tests.fake_node import FULL_PROPORTION
+from validators.tests.helpers import FakeNodeMixin, StoredGraphMixin
+
+
+class WatcherTests(FakeNodeMixin, StoredGraphMixin, TransactionTestCase):
+    """Storage notifications applied by the watcher against the local stand-in node."""
+
+    def setUp(self):
+        self.start_node()
+        self.watcher = ParentkeyWatcher({
+            'CHAIN_ENDPOINT': self.node.endpoint,
+            'FULL_PROPORTION': FULL_PROPORTION,
+            'DATABASE_DIR': self.directory,
+            'ARCHIVE_SNAPSHOTS': False,
+            'WATCH_REFRESH_INTERVAL': 3600,
+        })
+
+    def watch_until(self, update, done):
+        """Run the watcher, apply ``update`` on the node once it is subscribed, and stop when ``done`` holds."""
+        async def watch():
+            task = asyncio.create_task(self.watcher.watch_async())
+            try:
+                while not self.watcher.subscriptions:
+                    await asyncio.sleep(0.01)
+                await asyncio.to_thread(update)
+                for _ in range(500):
+                    if done():
+                        return
+                    await asyncio.sleep(0.01)
+                self.fail("The watcher did not apply the change")
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                # The watcher's queries ran on the sync_to_async thread, which holds its own connection
+                await sync_to_async(connections.close_all)()
+
+        asyncio.run(watch())
+
+    def test_stake_notification_updates_rows_at_its_block(self):
+        hotkey = self.chain.validators[0]
+        old_stake = self.chain.stakes[hotkey]
+        self.watch_until(
+            lambda: self.set_stake(hotkey, old_stake + 100),
+            lambda: self.watcher.snapshot.block_number == self.chain.block_number
+        )
+        expected = {hotkey: self.chain.stakes[hotkey] for hotkey in self.watcher.snapshot.stakes}
+        expected[hotkey] = old_stake + 100
+        self.assertEqual(self.stored_graph(), (expected, self.chain.edges))
+        change = ChangeModel.objects.get()
+        self.assertEqual((change.kind, change.hotkey, change.new_value), (STAKE_CHANGED, hotkey, old_stake + 100))
+        self.assertEqual(change.block_number, self.chain.block_number)
+        latest = SnapshotModel.objects.latest('id')
+        self.assertEqual((latest.block_number, latest.block_hash), (self.chain.block_number, self.chain.block_hash))